@@ -5,7 +5,7 @@ from RevitServices.Persistence import DocumentManager
 from RevitServices.Transactions import TransactionManager
 
 clr.AddReference('RevitAPI')
-from Autodesk.Revit.DB import FilteredElementCollector, BuiltInCategory, Transaction, Toposolid, Floor, XYZ, Options, Solid, Face, ElementId
+from Autodesk.Revit.DB import FilteredElementCollector, BuiltInCategory, BuiltInParameter, Transaction, Toposolid, Floor, XYZ, Options, Solid, Face, ElementId
 
 clr.AddReference("System")
 from System.Collections.Generic import List
@@ -14,6 +14,19 @@ clr.AddReference("RevitNodes")
 import Revit
 clr.ImportExtensions(Revit.GeometryConversion)
 
+from pyrevit import forms
+from palhetaflow.forros import contorno_do_esboco
+from palhetaflow.terreno import indexar_pontos, planejar_terraplenagem, pontos_de_borda, preparar_pontos, soldar_vertices
+from palhetaflow.tin import PE3_POR_M3, obter_malha
+
+# Solda de vértices repetidos (1 cm) e dizimação das áreas planas (células de 1 m, erro vertical até 3 cm), em pés
+TOLERANCIA_SOLDA = 0.01 / 0.3048
+TAMANHO_CELULA_DIZIMACAO = 1.0 / 0.3048
+TOLERANCIA_Z_DIZIMACAO = 0.03 / 0.3048
+
+# Espaçamento máximo (50 cm, em pés) dos pontos acrescentados no contorno do piso e na borda da faixa de transição
+ESPACAMENTO_PONTOS_BORDA = 0.5 / 0.3048
+
 # Obtendo a instância correta do Revit
 uiapp = __revit__  # Garantindo acesso ao PyRevit
 if not uiapp:
@@ -67,9 +80,92 @@ for obj in piso_geo:
 if not altura_piso_inferior:
     raise Exception("Não foi possível determinar a altura da face inferior do piso.")
 
+# Terraplenagem local: edita no lugar só os pontos sob o piso e na faixa de transição,
+# mantendo o Id do Toposolid, os elementos hospedados e as subdivisões
+def pontos_do_editor(editor):
+    vertices = list(editor.SlabShapeVertices)
+    return vertices, dict((i, (v.Position.X, v.Position.Y, v.Position.Z)) for i, v in enumerate(vertices))
+
+def terraplenagem_local(faixa_transicao):
+    editor = topografia.GetSlabShapeEditor()
+    vertices, pontos = pontos_do_editor(editor)
+    if not vertices:
+        raise Exception("A topografia não tem pontos editáveis.")
+
+    lacos = contorno_do_esboco(piso)
+    if not lacos:
+        caixa = piso.get_BoundingBox(None)
+        lacos = [[(caixa.Min.X, caixa.Min.Y), (caixa.Max.X, caixa.Min.Y), (caixa.Max.X, caixa.Max.Y), (caixa.Min.X, caixa.Max.Y)]]
+
+    # Estimativa de corte e aterro sob o piso, sobre a malha do terreno antes da edição
+    malha = obter_malha(topografia)
+    corte, aterro = malha.volume_corte_aterro_contorno(lacos, altura_piso_inferior, 0.5 / 0.3048)
+    print("Volume sob o piso: corte {:.2f} m³, aterro {:.2f} m³.".format(corte / PE3_POR_M3, aterro / PE3_POR_M3))
+
+    # Pontos no contorno do piso e na borda externa da faixa, na cota atual do terreno; os que caem
+    # sobre um vértice existente (ou fora da malha) não são acrescentados
+    contorno, borda_faixa = pontos_de_borda(lacos, faixa_transicao, ESPACAMENTO_PONTOS_BORDA)
+    candidatos = [(x, y, z) for (x, y), z in zip(contorno + borda_faixa, malha.cotas_em(contorno + borda_faixa))
+                  if z is not None]
+    existentes = set(pontos.values())
+    novos = [p for p in soldar_vertices(list(existentes) + candidatos, TOLERANCIA_SOLDA) if p not in existentes]
+
+    # Os deslocamentos dos vértices são medidos a partir do topo padrão do Toposolid (nível + deslocamento).
+    # ProjectElevation está nas coordenadas internas, como as posições dos vértices; Elevation depende
+    # da base de elevação do tipo de nível (ponto base do projeto ou de levantamento)
+    nivel = doc.GetElement(topografia.LevelId)
+    param_deslocamento = topografia.get_Parameter(BuiltInParameter.TOPOSOLID_HEIGHTABOVELEVEL_PARAM)
+    referencia = nivel.ProjectElevation + (param_deslocamento.AsDouble() if param_deslocamento and param_deslocamento.HasValue else 0.0)
+
+    t = Transaction(doc, "Terraplenagem Local sob o Piso")
+    t.Start()
+    try:
+        for x, y, z in novos:
+            editor.AddPoint(XYZ(x, y, z - referencia))
+
+        # A transição é calculada depois, sobre os vértices antigos e os acrescentados
+        vertices, pontos = pontos_do_editor(editor)
+        grade = indexar_pontos(pontos, max(faixa_transicao, 3.0))
+        novas_cotas = planejar_terraplenagem(pontos, grade, lacos, altura_piso_inferior, faixa_transicao)
+        if not novas_cotas:
+            t.RollBack()
+            print("Nenhum ponto da topografia sob o piso ou na faixa de transição.")
+            return
+
+        for indice_vertice, z_novo in novas_cotas.items():
+            editor.ModifySubElement(vertices[indice_vertice], z_novo - referencia)
+        t.Commit()
+        print("Terraplenagem local concluída: {} pontos acrescentados, {} de {} pontos ajustados.".format(
+            len(novos), len(novas_cotas), len(vertices)))
+    except Exception as e:
+        t.RollBack()
+        print("Erro ao modificar a topografia:", str(e))
+
+modo = forms.alert("Como deseja ajustar a topografia?",
+                   options=["Terraplenagem local", "Nivelar todo o terreno"])
+if not modo:
+    raise SystemExit
+
+if modo == "Terraplenagem local":
+    faixa_str = forms.ask_for_string(
+        default="200",
+        title="Terraplenagem local",
+        prompt="Largura da faixa de transição em volta do piso (em centímetros):"
+    )
+    if faixa_str is None:
+        raise SystemExit
+    try:
+        faixa_transicao = float(faixa_str.replace(",", ".")) / 30.48
+    except ValueError:
+        forms.alert("Valor inválido para a faixa de transição.", exitscript=True)
+    if faixa_transicao <= 0:
+        forms.alert("A faixa de transição deve ser maior que zero.", exitscript=True)
+    terraplenagem_local(faixa_transicao)
+    raise SystemExit
+
 # Obtendo os pontos da superfície do Toposolid
 topo_geo = topografia.get_Geometry(opt)
-pontos_originais = List[XYZ]()  # Criando lista do tipo correto
+vertices = []
 
 for obj in topo_geo:
     if isinstance(obj, Solid):
@@ -77,17 +173,23 @@ for obj in topo_geo:
             if face.FaceNormal.Z > 0.99:  # Pegando a face superior
                 mesh = face.Triangulate()  # Obtendo a malha da superfície
                 for vertice in mesh.Vertices:
-                    pontos_originais.Add(XYZ(vertice.X, vertice.Y, vertice.Z))
+                    vertices.append((vertice.X, vertice.Y, vertice.Z))
 
-if pontos_originais.Count == 0:
+if not vertices:
     raise Exception("Nenhum ponto encontrado na topografia.")
 
-pontos_atualizados = List[XYZ]()  # Lista correta para `Toposolid.Create()`
+# Os pontos vão para a altura da face inferior do piso antes do preparo: com todos na mesma
+# cota, cada célula interna da dizimação fica plana e se reduz a um ponto; só a borda fica inteira
+nivelados = [(x, y, altura_piso_inferior) for x, y, _ in vertices]
 
-# Ajustando os pontos da topografia para ficarem na altura da face inferior do piso
-for ponto in pontos_originais:
-    novo_ponto = XYZ(ponto.X, ponto.Y, altura_piso_inferior)  # Nivelamento do terreno
-    pontos_atualizados.Add(novo_ponto)
+# Soldando os vértices repetidos entre triângulos e dizimando as áreas planas
+preparo = preparar_pontos(nivelados, TOLERANCIA_SOLDA, TAMANHO_CELULA_DIZIMACAO, TOLERANCIA_Z_DIZIMACAO)
+print("Pontos da topografia: {} originais, {} repetidos removidos, {} removidos na dizimação, {} mantidos.".format(
+    preparo.total_original, preparo.duplicados, preparo.dizimados, len(preparo.pontos)))
+
+pontos_atualizados = List[XYZ]()  # Lista correta para `Toposolid.Create()`
+for x, y, z in preparo.pontos:
+    pontos_atualizados.Add(XYZ(x, y, z))
 
 # Obtendo corretamente os elementos para recriação
 toposolid_type_id = topografia.GetTypeId()  # Corrigido
@@ -6,9 +6,12 @@ clr.AddReference('RevitNodes')
 
 from RevitServices.Persistence import DocumentManager
 from Autodesk.Revit.DB import (
-    FilteredElementCollector, BuiltInCategory, ElementCategoryFilter, 
-    JoinGeometryUtils, Transaction
+    FilteredElementCollector, BuiltInCategory, ElementCategoryFilter, ElementMulticategoryFilter,
+    BoundingBoxIntersectsFilter, ElementIntersectsSolidFilter, JoinGeometryUtils, Options, Outline,
+    Solid, Transaction
 )
+from System.Collections.Generic import List
+from pyrevit import forms
 
 # Obtém o documento ativo corretamente
 uiapp = __revit__  
@@ -26,18 +29,12 @@ filtros_elementos = {
     "Vigas/Quadros": BuiltInCategory.OST_StructuralFraming,
     "Fundações": BuiltInCategory.OST_StructuralFoundation
 }
+filtro_categorias = ElementMulticategoryFilter(List[BuiltInCategory](filtros_elementos.values()))
 
 # Buscar TopoSurface (Revit antigo) e TopoSolid (Revit 2024+)
 topo_categories = [BuiltInCategory.OST_Topography, BuiltInCategory.OST_Toposolid]
 filtro_topografia = [ElementCategoryFilter(cat) for cat in topo_categories]
 
-# Coleta os elementos estruturais do modelo
-elementos_modelo = {}
-for nome, categoria in filtros_elementos.items():
-    elementos_modelo[nome] = list(
-        FilteredElementCollector(doc).WherePasses(ElementCategoryFilter(categoria)).WhereElementIsNotElementType().ToElements()
-    )
-
 # Coleta os sólidos topográficos
 topografias = []
 for filtro in filtro_topografia:
@@ -49,27 +46,65 @@ for filtro in filtro_topografia:
 if not topografias:
     raise Exception("Nenhum sólido topográfico encontrado no modelo.")
 
-topografia = topografias[0]  # Seleciona o primeiro sólido topográfico encontrado
+# Verificação pela caixa envolvente (rápida) ou também pelo sólido do terreno (precisa)
+modo = forms.alert("Como verificar quais elementos tocam cada topografia?",
+                   options=["Caixa envolvente", "Caixa envolvente + sólido"])
+if not modo:
+    raise SystemExit
+usar_solido = modo == "Caixa envolvente + sólido"
+
+total_elementos = FilteredElementCollector(doc).WherePasses(filtro_categorias).WhereElementIsNotElementType().GetElementCount()
+
+# Função para obter o maior sólido da topografia (para o ElementIntersectsSolidFilter)
+def obter_solido(topo):
+    maior = None
+    for obj in topo.get_Geometry(Options()) or []:
+        if isinstance(obj, Solid) and obj.Volume > 0 and (maior is None or obj.Volume > maior.Volume):
+            maior = obj
+    return maior
+
+# Função para listar só os elementos que tocam a topografia
+def elementos_que_tocam(topo):
+    caixa = topo.get_BoundingBox(None)
+    if caixa is None:
+        return []
+    coletor = FilteredElementCollector(doc).WherePasses(filtro_categorias).WhereElementIsNotElementType() \
+        .WherePasses(BoundingBoxIntersectsFilter(Outline(caixa.Min, caixa.Max)))
+    if usar_solido:
+        solido = obter_solido(topo)
+        if solido:
+            coletor = coletor.WherePasses(ElementIntersectsSolidFilter(solido))
+    return list(coletor.ToElements())
+
+unidos = ja_unidos = falhas = candidatos = 0
 
 # Inicia a transação
 t = Transaction(doc, "Unir Elementos Estruturais com Topografia")
 t.Start()
 
 try:
-    def unir_elementos(elementos, topo):
-        """Tenta unir cada elemento da lista com o sólido topográfico."""
-        for elem in elementos:
+    # Cada topografia é unida só aos elementos que a tocam de fato
+    for topografia in topografias:
+        for elem in elementos_que_tocam(topografia):
+            candidatos += 1
+            if JoinGeometryUtils.AreElementsJoined(doc, topografia, elem):
+                ja_unidos += 1
+                continue
             try:
-                JoinGeometryUtils.JoinGeometry(doc, topo, elem)
-            except:
-                pass  # Ignora erros individuais sem interromper o processo
-
-    # Aplica a união de todos os elementos estruturais com a topografia
-    for elementos in elementos_modelo.values():
-        unir_elementos(elementos, topografia)
+                JoinGeometryUtils.JoinGeometry(doc, topografia, elem)
+                unidos += 1
+            except Exception:
+                falhas += 1
 
     # Finaliza a transação corretamente
     t.Commit()
 
-except:
+except Exception as e:
     t.RollBack()  # Desfaz a transação em caso de erro
+    forms.alert("Erro ao unir os elementos com a topografia: {}".format(e), exitscript=True)
+
+print("Topografias analisadas: {}".format(len(topografias)))
+print("Elementos unidos: {}".format(unidos))
+print("Já unidos: {}".format(ja_unidos))
+print("Pares elemento/topografia ignorados (sem sobreposição): {}".format(max(total_elementos * len(topografias) - candidatos, 0)))
+print("Falhas ao unir: {}".format(falhas))
@@ -17,6 +17,10 @@ from Autodesk.Revit.DB import *
 from Autodesk.Revit.UI import *
 from System.Windows.Forms import MessageBox
 from pyrevit import forms
+from palhetaflow.contornos import Segmento, obter_contornos, curva_revit
+from palhetaflow.revestimento import (
+    IndiceBloqueios, gerar_eixos_acabamento, recortar_eixos, trechos_compartilhados, trechos_dos_elementos
+)
 
 # Obtém o documento ativo
 uidoc = __revit__.ActiveUIDocument if hasattr(__revit__, 'ActiveUIDocument') else None
@@ -96,26 +100,74 @@ ambientes_selecionados_nomes = forms.SelectFromList.show(
 if not ambientes_selecionados_nomes:
     ambientes_selecionados_nomes = list(rooms.keys())
 
+# Função para obter a largura da porta pelo tipo ou, se não houver, pela instância
+def obter_largura_porta(porta):
+    for elemento in (porta.Symbol, porta):
+        param = elemento.get_Parameter(BuiltInParameter.DOOR_WIDTH)
+        if param and param.HasValue and param.AsDouble() > 0:
+            return param.AsDouble()
+    return None
+
+# Vãos das portas por nível: trecho da largura da porta sobre o eixo da parede hospedeira.
+# Cortam o rodapé dos dois lados da parede (meia espessura da hospedeira + rodapé).
+def obter_vaos_portas():
+    vaos_por_nivel = {}
+    portas = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_Doors).WhereElementIsNotElementType()
+    for porta in portas:
+        hospedeira = porta.Host
+        if not isinstance(hospedeira, Wall) or not isinstance(hospedeira.Location, LocationCurve) \
+                or not isinstance(hospedeira.Location.Curve, Line) or not isinstance(porta.Location, LocationPoint):
+            continue
+        largura = obter_largura_porta(porta)
+        if not largura:
+            continue
+        centro = porta.Location.Point
+        eixo = hospedeira.Location.Curve.Direction
+        inicio = (centro.X - eixo.X * largura / 2, centro.Y - eixo.Y * largura / 2)
+        fim = (centro.X + eixo.X * largura / 2, centro.Y + eixo.Y * largura / 2)
+        alcance = hospedeira.Width / 2 + wall_thickness
+        vaos_por_nivel.setdefault(porta.LevelId.IntegerValue, []).append((inicio, fim, alcance))
+    return dict((nivel, IndiceBloqueios(vaos)) for nivel, vaos in vaos_por_nivel.items())
+
+vaos_por_nivel = obter_vaos_portas()
+
+# Separadores de ambiente não são paredes: não recebem rodapé em nenhum dos lados
+ids_separadores = set(e.Id.IntegerValue for e in FilteredElementCollector(doc)
+                      .OfCategory(BuiltInCategory.OST_RoomSeparationLines).WhereElementIsNotElementType())
+
+# Calcula os eixos de todos os ambientes antes de abrir a transação:
+# trechos colineares unidos, vãos de portas e separadores cortados e limites
+# já atendidos por um ambiente vizinho (mesmo trecho da mesma parede, na outra face) descartados.
+eixos_por_ambiente = []
+segmentos_vistos = set()
+total_compartilhados = 0
+total_separadores = 0
+for room_name in sorted(ambientes_selecionados_nomes):
+    room = rooms[room_name]
+    room_boundary = obter_contornos(room)
+    eixos = gerar_eixos_acabamento(room_boundary, wall_thickness / 2, comprimento_minimo=app.ShortCurveTolerance)
+
+    separadores = trechos_dos_elementos(room_boundary, ids_separadores)
+    compartilhados = trechos_compartilhados(room_boundary, segmentos_vistos, ignorar=ids_separadores)
+    total_compartilhados += len(compartilhados)
+    total_separadores += len(separadores)
+    bloqueios = [IndiceBloqueios([(s.inicio, s.fim, wall_thickness) for s in compartilhados + separadores])]
+    if room.LevelId.IntegerValue in vaos_por_nivel:
+        bloqueios.append(vaos_por_nivel[room.LevelId.IntegerValue])
+
+    eixos_por_ambiente.append((room, recortar_eixos(eixos, bloqueios, app.ShortCurveTolerance)))
+
 # Criar paredes "cebola" ao redor das existentes
 with Transaction(doc, "Aplicar Revestimento") as t:
     t.Start()
     try:
         paredes_criadas = []
-        for room_name in ambientes_selecionados_nomes:
-            room = rooms[room_name]
-            room_boundary = room.GetBoundarySegments(SpatialElementBoundaryOptions())
-        
-            if room_boundary:
-                for segments in room_boundary:
-                    for segment in segments:
-                        wall_curve = segment.GetCurve()
-                        deslocamento = wall_thickness / 2
-                        
-                        offset_direction = wall_curve.Direction.CrossProduct(XYZ.BasisZ).Normalize() * -deslocamento
-                        offset_curve = Line.CreateBound(wall_curve.GetEndPoint(0) + offset_direction, wall_curve.GetEndPoint(1) + offset_direction)
-                        
-                        new_wall = Wall.Create(doc, offset_curve, selected_wall_type_obj.Id, room.LevelId, definir_altura_parede, 0, False, False)
-                        new_wall.get_Parameter(BuiltInParameter.WALL_BASE_OFFSET).Set(0)
+        for room, eixos in eixos_por_ambiente:
+            for eixo in eixos:
+                wall_curve = curva_revit(Segmento(*eixo))
+                new_wall = Wall.Create(doc, wall_curve, selected_wall_type_obj.Id, room.LevelId, definir_altura_parede, 0, False, False)
+                new_wall.get_Parameter(BuiltInParameter.WALL_BASE_OFFSET).Set(0)
+                paredes_criadas.append(new_wall)
 
         t.Commit()
 
@@ -123,3 +175,8 @@ with Transaction(doc, "Aplicar Revestimento") as t:
         t.RollBack()
         MessageBox.Show("Erro ao aplicar o revestimento: " + str(e), "Erro")
         raise SystemExit
+
+print("Rodapés criados: {}".format(len(paredes_criadas)))
+print("Vãos de portas considerados: {}".format(sum(len(v) for v in vaos_por_nivel.values())))
+print("Limites compartilhados entre ambientes ignorados: {}".format(total_compartilhados))
+print("Trechos de separadores de ambiente ignorados: {}".format(total_separadores))
@@ -1,60 +1,131 @@
 # -*- coding: utf-8 -*-
 
-from pyrevit import script
+from pyrevit import script, forms
 from Autodesk.Revit.DB import (
-    FilteredElementCollector, BuiltInCategory, XYZ, BoundingBoxXYZ, 
-    Transaction, ElementTransformUtils
+    FilteredElementCollector, BuiltInCategory, BuiltInParameter, XYZ, Line,
+    LocationCurve, LocationPoint, Transaction, ElementTransformUtils
 )
+from palhetaflow.geometria2d import avanco_ate_face
+from palhetaflow.indice_espacial import IndiceSegmentos, caixa_do_elemento
 
 # Obter o documento ativo
 doc = __revit__.ActiveUIDocument.Document
 
+CM_POR_PE = 30.48
+
 # Obter todas as portas do modelo
 portas = list(FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_Doors).WhereElementIsNotElementType())
 
-# Função otimizada para calcular a menor distância entre bounding boxes
-def calcular_menor_distancia(bb1, bb2):
-    distancias = [
-        (abs(bb1.Min.X - bb2.Max.X), XYZ(bb2.Max.X - bb1.Min.X, 0, 0)),
-        (abs(bb1.Max.X - bb2.Min.X), XYZ(bb2.Min.X - bb1.Max.X, 0, 0)),
-        (abs(bb1.Min.Y - bb2.Max.Y), XYZ(0, bb2.Max.Y - bb1.Min.Y, 0)),
-        (abs(bb1.Max.Y - bb2.Min.Y), XYZ(0, bb2.Min.Y - bb1.Max.Y, 0))
-    ]
-    return min(distancias, key=lambda x: x[0])[1]  # Retorna a direção do deslocamento
+# Distância máxima (em cm) que a porta pode andar até encostar na parede mais próxima
+limite_str = forms.ask_for_string(
+    default="200",
+    title="Boneca",
+    prompt="Distância máxima para mover a porta até a parede mais próxima (em centímetros):"
+)
+if limite_str is None:
+    raise SystemExit
+
+try:
+    limite_ft = float(limite_str.replace(",", ".")) / CM_POR_PE
+except ValueError:
+    forms.alert("Valor inválido para a distância máxima.", exitscript=True)
+
+# Função para obter a largura da porta pelo tipo ou, se não houver, pela instância
+def obter_largura_porta(porta):
+    for elemento in (porta.Symbol, porta):
+        param = elemento.get_Parameter(BuiltInParameter.DOOR_WIDTH)
+        if param and param.HasValue and param.AsDouble() > 0:
+            return param.AsDouble()
+    return None
+
+# Função para indexar os eixos das paredes (linhas de localização) em planta
+def indexar_paredes(paredes):
+    indice = IndiceSegmentos(max(limite_ft, 1.0))
+    dados_paredes = {}
+    for parede in paredes:
+        if not isinstance(parede.Location, LocationCurve):
+            continue
+        caixa = caixa_do_elemento(parede)
+        if not caixa:
+            continue
+        # Paredes curvas são divididas em trechos retos
+        pontos = list(parede.Location.Curve.Tessellate())
+        for i in range(len(pontos) - 1):
+            indice.inserir((parede.Id.IntegerValue, i),
+                           (pontos[i].X, pontos[i].Y), (pontos[i + 1].X, pontos[i + 1].Y))
+        dados_paredes[parede.Id.IntegerValue] = (parede.Width / 2, caixa[2], caixa[5])
+    return indice, dados_paredes
+
+# Função que calcula o deslocamento da porta até encostar na parede mais próxima
+def calcular_deslocamento(porta, indice, dados_paredes, meia_espessura_max):
+    hospedeira = porta.Host
+    if not hospedeira or not isinstance(hospedeira.Location, LocationCurve) \
+            or not isinstance(hospedeira.Location.Curve, Line):
+        return None, "sem parede hospedeira reta"
+    if not isinstance(porta.Location, LocationPoint):
+        return None, "sem ponto de inserção"
+
+    largura = obter_largura_porta(porta)
+    if not largura:
+        return None, "sem largura definida"
+
+    centro = porta.Location.Point
+    eixo = hospedeira.Location.Curve.Direction
+    melhor = None  # (avanço, sentido, id da parede)
+
+    # Testa os dois batentes, cada um andando para o seu lado ao longo da parede hospedeira
+    for sentido in (1, -1):
+        direcao = (eixo.X * sentido, eixo.Y * sentido)
+        batente = (centro.X + direcao[0] * largura / 2, centro.Y + direcao[1] * largura / 2)
+
+        for _, (id_parede, indice_trecho) in indice.proximos(batente, limite_ft + meia_espessura_max):
+            if id_parede == hospedeira.Id.IntegerValue:
+                continue
+            meia_espessura, z_min, z_max = dados_paredes[id_parede]
+            if not (z_min - 1.0 <= centro.Z <= z_max):
+                continue  # Parede de outro pavimento
+
+            inicio, fim = indice.segmentos[(id_parede, indice_trecho)]
+            avanco = avanco_ate_face(batente, direcao, inicio, fim, meia_espessura, meia_espessura)
+            if avanco is None or avanco < 0 or avanco > limite_ft:
+                continue
+            if melhor is None or avanco < melhor[0]:
+                melhor = (avanco, sentido, id_parede)
+
+    if melhor is None:
+        return None, "nenhuma parede dentro do limite"
+
+    avanco, sentido, id_parede = melhor
+    if avanco < 1e-3:
+        return None, "já encostada na parede"
+    return (XYZ(eixo.X * sentido * avanco, eixo.Y * sentido * avanco, 0), avanco, id_parede), "movida"
 
 if portas:
     paredes = list(FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_Walls).WhereElementIsNotElementType())
+    indice, dados_paredes = indexar_paredes(paredes)
+    meia_espessura_max = max([d[0] for d in dados_paredes.values()] or [0.0])
+
+    motivos = {}
 
     t = Transaction(doc, "Alinhar Portas com Paredes Mais Próximas")
     t.Start()
 
     for porta in portas:
-        porta_bounding_box = porta.get_BoundingBox(None)
-        if not porta_bounding_box:
-            continue
-        
-        parede_hospedeira = porta.Host if hasattr(porta, 'Host') else None
-        menor_distancia = float('inf')
-        parede_proxima = None
-        deslocamento_final = XYZ(0, 0, 0)
-
-        for parede in paredes:
-            if parede_hospedeira and parede.Id == parede_hospedeira.Id:
-                continue
-            
-            parede_bounding_box = parede.get_BoundingBox(None)
-            if parede_bounding_box:
-                deslocamento = calcular_menor_distancia(porta_bounding_box, parede_bounding_box)
-                distancia = deslocamento.GetLength()
-                if distancia < menor_distancia:
-                    menor_distancia = distancia
-                    parede_proxima = parede
-                    deslocamento_final = deslocamento
-
-        if parede_proxima and menor_distancia * 30.48 <= 200:
+        resultado, motivo = calcular_deslocamento(porta, indice, dados_paredes, meia_espessura_max)
+        if resultado:
+            deslocamento, avanco, id_parede = resultado
             try:
-                ElementTransformUtils.MoveElement(doc, porta.Id, deslocamento_final)
-            except:
-                pass  # Em caso de erro, continua sem interromper o loop
+                ElementTransformUtils.MoveElement(doc, porta.Id, deslocamento)
+                print("Porta {} movida {:.1f} cm até a parede {}.".format(
+                    porta.Id.IntegerValue, avanco * CM_POR_PE, id_parede))
+            except Exception as e:
+                motivo = "erro ao mover"
+                print("Erro ao mover a porta {}: {}".format(porta.Id.IntegerValue, e))
+        motivos[motivo] = motivos.get(motivo, 0) + 1
 
     t.Commit()
+
+    # Resumo: quantas portas foram movidas e por que as demais ficaram no lugar
+    print("Portas analisadas: {}".format(len(portas)))
+    for motivo, quantidade in sorted(motivos.items()):
+        print("  {}: {}".format(motivo, quantidade))
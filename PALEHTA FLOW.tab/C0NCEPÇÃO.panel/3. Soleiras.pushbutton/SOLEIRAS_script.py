@@ -1,12 +1,16 @@
 # -*- coding: utf-8 -*-
 from pyrevit import revit, DB, forms
+from palhetaflow.instancias import CacheParametros
+
+# Largura do tipo de parede pelo parâmetro interno (funciona em qualquer idioma)
+parametros = CacheParametros({"Width": (DB.BuiltInParameter.WALL_ATTR_WIDTH_PARAM, "Width", "Largura")})
 
 def get_wall_width(wall):
     """ Obtém a largura real da parede de forma confiável, independentemente da orientação."""
     if isinstance(wall, DB.Wall):
         wall_type = wall.Document.GetElement(wall.GetTypeId())
         if wall_type:
-            width_param = wall_type.LookupParameter("Width")
+            width_param = parametros.obter(wall_type, "Width")
             if width_param and width_param.HasValue:
                 return width_param.AsDouble()
         
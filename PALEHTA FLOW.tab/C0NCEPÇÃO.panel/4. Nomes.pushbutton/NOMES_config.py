@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Shift+clique no botão "Nomes": liga ou desliga a atualização automática das placas
+from pyrevit import forms, script
+
+from palhetaflow.atualizador_placas import OPCAO_ATIVO, SECAO_CONFIG, registrar, remover
+
+config = script.get_config(SECAO_CONFIG)
+ativo = config.get_option(OPCAO_ATIVO, False)
+
+mensagem = "A atualização automática das placas está {}.\n\n" \
+           "Com ela ligada, o texto da placa é recalculado sempre que uma porta é inserida, " \
+           "espelhada ou movida, ou quando o nome de um ambiente muda.".format("LIGADA" if ativo else "DESLIGADA")
+opcao = forms.alert(mensagem, options=["Desligar" if ativo else "Ligar", "Cancelar"])
+
+if opcao in ("Ligar", "Desligar"):
+    ativo = opcao == "Ligar"
+    setattr(config, OPCAO_ATIVO, ativo)
+    script.save_config()
+
+    id_addin = __revit__.Application.ActiveAddInId
+    if ativo:
+        registrar(id_addin)
+    else:
+        remover(id_addin)
+    print("Atualização automática das placas {}.".format("ligada" if ativo else "desligada"))
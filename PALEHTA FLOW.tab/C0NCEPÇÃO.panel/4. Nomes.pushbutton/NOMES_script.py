@@ -1,37 +1,20 @@
 # -*- coding: utf-8 -*-
 from pyrevit import revit, DB
+from palhetaflow.instancias import EscritorParametros
+from palhetaflow.placas import atualizar_placas, cache_placas, fase_placas
 
 # Verificar se o documento do Revit está disponível
 doc = revit.doc
 if not doc:
     raise SystemExit
 
-# Obtém a fase ativa do projeto
-phases = list(doc.Phases)
-if not phases:
+# Obtém a fase ativa do projeto (a última fase, a mesma usada pelo atualizador automático)
+phase = fase_placas(doc)
+if phase is None:
     raise SystemExit
-phase = phases[-1]  # Pega a última fase do projeto
 
-# Função para obter o nome do ambiente externo da porta
-def get_external_room(door):
-    room = door.ToRoom[phase] if door.ToRoom else None  # Garante que está acessando na fase correta
-    if room:
-        param = room.LookupParameter("Nome")
-        room_name = param.AsString() if param else None
-
-        # Se não encontrou pelo LookupParameter, tenta pelo BuiltInParameter
-        if not room_name:
-            room_name = room.get_Parameter(DB.BuiltInParameter.ROOM_NAME).AsString() if room.get_Parameter(DB.BuiltInParameter.ROOM_NAME) else "SAÍDA"
-
-        return room_name
-    return "SAÍDA"
-
-# Função para verificar se a porta está espelhada e atualizar o parâmetro "INVERTER O TEXTO"
-def check_mirrored_door(door):
-    mirrored = door.Mirrored  # Verifica se a porta está espelhada
-    param = door.LookupParameter("INVERTER O TEXTO")
-    if param:
-        param.Set(0 if mirrored else 1)  # Desmarca se espelhada, mantém se não espelhada
+# Só grava os valores que mudaram: uma nova execução sem mudanças não altera nenhuma porta
+escritor = EscritorParametros(cache_placas())
 
 # Coletar todas as portas do projeto
 doors_collector = DB.FilteredElementCollector(doc) \
@@ -42,16 +25,11 @@ doors_collector = DB.FilteredElementCollector(doc) \
 t = DB.Transaction(doc, "Atualizar Texto da Placa")
 t.Start()
 try:
-    for door in doors_collector:
-        param = door.LookupParameter("TEXTO DA PLACA")
-        if param:
-            room_name = get_external_room(door)
-            param.Set(room_name)
-        
-        # Verifica se a porta está espelhada e ajusta o parâmetro "INVERTER O TEXTO"
-        check_mirrored_door(door)
+    # "TEXTO DA PLACA" com o nome do ambiente externo e "INVERTER O TEXTO" conforme o espelhamento
+    atualizar_placas(doors_collector, phase, escritor)
 
     t.Commit()
+    print("Placas das portas: {}".format(escritor.resumo()))
 except Exception as e:
     t.RollBack()
 finally:
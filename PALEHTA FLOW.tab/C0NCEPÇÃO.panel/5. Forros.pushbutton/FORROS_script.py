@@ -5,13 +5,10 @@ from Autodesk.Revit.DB import (
     BuiltInCategory,
     BuiltInParameter,
     Ceiling,
-    CeilingType,
-    Level,
-    XYZ,
-    CurveLoop,
-    SpatialElementBoundaryOptions
+    CeilingType
 )
 from pyrevit import revit, forms
+from palhetaflow.contornos import obter_contornos, criar_curve_loop
 
 # Obtém o documento ativo e a vista ativa no Revit
 doc = revit.doc
@@ -96,9 +93,6 @@ if ambientes_selecionados_nomes:
 else:
     dicionario_ambientes_selecionados = dicionario_ambientes
 
-# Configuração para obter os limites dos ambientes
-boundary_options = SpatialElementBoundaryOptions()
-
 # Função para criar forros nos ambientes detectados
 def criar_forros_nos_ambientes():
     t = Transaction(doc, "Criação de forros nos ambientes")
@@ -109,15 +103,13 @@ def criar_forros_nos_ambientes():
             # Obtém o nível do ambiente
             nivel = doc.GetElement(ambiente.LevelId)
             
-            # Obtém as bordas do ambiente (linhas de contorno)
-            limites = ambiente.GetBoundarySegments(boundary_options)
+            # Obtém as bordas do ambiente (linhas de contorno) do cache compartilhado
+            limites = obter_contornos(ambiente)
             if not limites:
                 continue
             
             # Cria um CurveLoop para definir a área do forro
-            curva_loop = CurveLoop()
-            for segmento in limites[0]:  # Usa o primeiro conjunto de limites
-                curva_loop.Append(segmento.GetCurve())
+            curva_loop = criar_curve_loop(limites[0])  # Usa o primeiro conjunto de limites
 
             # Criar o forro dentro do ambiente
             novo_forro = Ceiling.Create(doc, [curva_loop], tipo_escolhido.Id, nivel.Id)
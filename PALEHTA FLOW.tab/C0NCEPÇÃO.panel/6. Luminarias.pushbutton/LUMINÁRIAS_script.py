@@ -4,17 +4,85 @@ clr.AddReference("RevitServices")
 clr.AddReference("RevitAPI")
 clr.AddReference("RevitNodes")
 
-from Autodesk.Revit.DB import FilteredElementCollector, BuiltInCategory, XYZ, Transaction, Structure, Options, BuiltInParameter
-from pyrevit import revit, forms, UI
-import math
+from Autodesk.Revit.DB import FilteredElementCollector, BuiltInCategory, XYZ, Transaction, BuiltInParameter, ElementId, LocationCurve, LocationPoint
+from pyrevit import revit, forms, script, UI
+from palhetaflow.contornos import obter_contornos
+from palhetaflow.forros import obter_info_forro
+from palhetaflow.iluminancia import ALTURA_PLANO_TRABALHO, Ambiente, Luminaria, calcular_projeto, salvar_exportacao
+from palhetaflow.instancias import CacheParametros, criar_instancias_em_lote
+from palhetaflow.layout_luminarias import Obstaculos, distribuir_luminarias
 
 # Obter documento ativo do Revit
 doc = revit.doc
 uidoc = revit.uidoc
 
-# Perguntar ao usuário se deseja selecionar forros ou aplicar em todos
+# Definições padrão
+lux_padrao = 400  # Iluminação necessária (lux)
+fluxo_luminoso_luminaria = 2400  # Lumens por luminária
+
+# Verificação ponto a ponto das luminárias já inseridas, ambiente por ambiente
+def verificar_iluminancia():
+    output = script.get_output()
+
+    # Cada luminária é atribuída ao ambiente que contém o seu ponto no plano de trabalho
+    luminarias_por_ambiente = {}
+    for luminaria in FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_LightingFixtures).WhereElementIsNotElementType():
+        if not isinstance(luminaria.Location, LocationPoint):
+            continue
+        nivel = doc.GetElement(luminaria.LevelId)
+        if not nivel:
+            continue
+        ponto = luminaria.Location.Point
+        ambiente = doc.GetRoomAtPoint(XYZ(ponto.X, ponto.Y, nivel.Elevation + ALTURA_PLANO_TRABALHO))
+        if ambiente:
+            luminarias_por_ambiente.setdefault(ambiente.Id.IntegerValue, []).append(
+                Luminaria(ponto.X, ponto.Y, ponto.Z, fluxo_luminoso_luminaria, None))
+
+    ambientes = []
+    for ambiente in FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_Rooms).WhereElementIsNotElementType():
+        if ambiente.Area <= 0 or not ambiente.Level:
+            continue
+        # Arcos entram pelo início e pelo ponto médio
+        lacos = []
+        for laco in obter_contornos(ambiente):
+            pontos = []
+            for segmento in laco:
+                pontos.append(segmento.inicio[:2])
+                if segmento.meio is not None:
+                    pontos.append(segmento.meio[:2])
+            lacos.append(pontos)
+        nome = u"{} - {}".format(ambiente.get_Parameter(BuiltInParameter.ROOM_NUMBER).AsString(),
+                                 ambiente.get_Parameter(BuiltInParameter.ROOM_NAME).AsString())
+        ambientes.append(Ambiente(ambiente.Id.IntegerValue, nome, lacos, ambiente.Level.Elevation + ALTURA_PLANO_TRABALHO,
+                                  luminarias_por_ambiente.get(ambiente.Id.IntegerValue, [])))
+
+    # Lista exportada para repetir o cálculo fora do Revit (python -m palhetaflow.iluminancia)
+    caminho = script.get_document_data_file("iluminancia", "json")
+    salvar_exportacao(caminho, ambientes)
+
+    linhas = []
+    for ambiente, resultado in calcular_projeto(ambientes):
+        if resultado is None:
+            continue
+        linhas.append([output.linkify(ElementId(ambiente.id)), ambiente.nome, len(ambiente.luminarias),
+                       "{:.0f}".format(resultado.media), "{:.0f}".format(resultado.minima),
+                       "{:.2f}".format(resultado.uniformidade),
+                       "OK" if resultado.media >= lux_padrao else "Abaixo de {} lux".format(lux_padrao)])
+
+    output.print_md("## Iluminância no plano de trabalho")
+    output.print_table(
+        table_data=linhas,
+        columns=["Ambiente", "Nome", "Luminárias", "Média (lux)", "Mínima (lux)", "Uniformidade", "Situação"]
+    )
+    print("Lista exportada em: {}".format(caminho))
+
+# Perguntar ao usuário se deseja selecionar forros, aplicar em todos ou verificar a iluminância
 opcao = forms.alert("Você deseja selecionar os forros manualmente ou aplicar em todos?",
-                    options=["Selecionar Forros", "Aplicar em Todos"])
+                    options=["Selecionar Forros", "Aplicar em Todos", "Verificar Iluminância"])
+
+if opcao == "Verificar Iluminância":
+    verificar_iluminancia()
+    raise SystemExit
 
 # Se o usuário escolheu "Selecionar Forros", permitir seleção manual
 if opcao == "Selecionar Forros":
@@ -47,92 +115,101 @@ if not escolha:
 
 tipo_luminaria = tipos_nomes[escolha]
 
-# Definições padrão
-lux_padrao = 400  # Iluminação necessária (lux)
-fluxo_luminoso_luminaria = 2400  # Lumens por luminária
+# Folga entre as luminárias e as vigas, e faixa acima do forro onde uma viga atrapalha (em pés)
+FOLGA_VIGAS = 0.15 / 0.3048
+ALTURA_ENTREFORRO = 1.5 / 0.3048
+LARGURA_VIGA_PADRAO = 0.20 / 0.3048
 
-# Criar transação
-with Transaction(doc, "Inserir Luminárias") as t:
-    t.Start()
-    
-    for forro in forros:
-        # Criar uma instância de Options para acessar a geometria
-        opt = Options()
-        forro_geom = forro.get_Geometry(opt)
-
-        # Verificar se a geometria foi encontrada
-        if not forro_geom:
+# Vigas em planta com as cotas inferior e superior, para descartar luminárias embaixo delas
+def obter_vigas():
+    vigas = []
+    for viga in FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_StructuralFraming).WhereElementIsNotElementType():
+        if not isinstance(viga.Location, LocationCurve):
             continue
-
-        # Obter os limites do forro
-        elemento_bbox = forro_geom.GetBoundingBox()
-        if not elemento_bbox:
+        caixa = viga.get_BoundingBox(None)
+        if not caixa:
             continue
+        param_largura = viga.Symbol.get_Parameter(BuiltInParameter.STRUCTURAL_SECTION_COMMON_WIDTH)
+        largura = param_largura.AsDouble() if param_largura and param_largura.HasValue and param_largura.AsDouble() > 0 else LARGURA_VIGA_PADRAO
+        pontos = list(viga.Location.Curve.Tessellate())
+        for i in range(len(pontos) - 1):
+            vigas.append(((pontos[i].X, pontos[i].Y), (pontos[i + 1].X, pontos[i + 1].Y), largura / 2, caixa.Min.Z, caixa.Max.Z))
+    return vigas
+
+vigas = obter_vigas()
+
+# Pontos das luminárias agrupados por nível e altura do forro: {(id do nível, altura): (nível, [pontos])}
+grupos_luminarias = {}
+
+# Calcular as posições de todas as luminárias antes de abrir a transação
+for forro in forros:
+    # Contorno, área, deslocamento e nível lidos do esboço e dos BuiltInParameter (com cache por forro)
+    info = obter_info_forro(forro)
+    if not info:
+        continue
+
+    # Converter a área de pés² para m² e a altura do forro de pés para metros
+    area_forro = info.area * 0.092903
+    altura_forro = info.deslocamento * 0.3048
+
+    # Evitar forros sem área em planta
+    if info.caixa[3] - info.caixa[0] <= 0 or info.caixa[4] - info.caixa[1] <= 0:
+        print("⚠️ Forro ID {} ignorado: largura ou comprimento inválido.".format(forro.Id.IntegerValue))
+        continue
+
+    # Obter o nível do forro
+    nivel_forro_elemento = doc.GetElement(ElementId(info.id_nivel))
+    if not nivel_forro_elemento:
+        continue
+
+    # Calcular a quantidade de luminárias necessária
+    fluxo_necessario = area_forro * lux_padrao
+    qtd_luminarias = max(1, round(fluxo_necessario / fluxo_luminoso_luminaria))
+
+    # Vigas que ocupam o entreforro: começam abaixo do topo do entreforro e terminam acima da
+    # face do forro (inclui as que atravessam o forro). Cotas internas, como as das caixas.
+    z_forro = nivel_forro_elemento.ProjectElevation + altura_forro / 0.3048
+    obstaculos = Obstaculos([v[:3] for v in vigas if v[3] <= z_forro + ALTURA_ENTREFORRO and v[4] >= z_forro],
+                            FOLGA_VIGAS)
+
+    # Grade alinhada ao forro, só com os pontos dentro do contorno real e longe das vigas
+    pontos_forro = distribuir_luminarias(info.contorno, int(qtd_luminarias), obstaculos)
+    if not pontos_forro:
+        print("⚠️ Forro ID {} ignorado: nenhuma posição livre para luminárias.".format(forro.Id.IntegerValue))
+        continue
+
+    # Guardar os pontos das luminárias deste forro
+    grupo = grupos_luminarias.setdefault((nivel_forro_elemento.Id, altura_forro), (nivel_forro_elemento, []))
+    z = altura_forro / 0.3048  # Converter para pés
+    for x, y in pontos_forro:
+        grupo[1].append(XYZ(x, y, z))
 
-        min_point = elemento_bbox.Min
-        max_point = elemento_bbox.Max
-
-        # Obter a área do forro e converter de pés² para m²
-        param_area = forro.LookupParameter(u"Área")
-        area_forro = param_area.AsDouble() * 0.092903 if param_area and param_area.HasValue else 0
-
-        # Obter a altura do forro e converter de pés para metros
-        param_altura_deslocamento = forro.LookupParameter(u"Altura do deslocamento do nível")
-        altura_forro = param_altura_deslocamento.AsDouble() * 0.3048 if param_altura_deslocamento and param_altura_deslocamento.HasValue else 0
-
-        # Obter a largura e comprimento do forro e converter de pés para metros
-        largura = (max_point.X - min_point.X) * 0.3048  
-        comprimento = (max_point.Y - min_point.Y) * 0.3048  
-
-        # Evitar divisões por zero
-        if largura <= 0 or comprimento <= 0:
-            print("⚠️ Forro ID {} ignorado: largura ou comprimento inválido.".format(forro.Id.IntegerValue))
-            continue
-
-        # Obter o nível do forro
-        param_nivel = forro.LookupParameter(u"Nível")
-        nivel_forro_elemento = doc.GetElement(param_nivel.AsElementId()) if param_nivel and param_nivel.HasValue else None
-
-        if not nivel_forro_elemento:
-            continue
+# Criar transação
+with Transaction(doc, "Inserir Luminárias") as t:
+    t.Start()
 
-        # Calcular a quantidade de luminárias necessária
-        fluxo_necessario = area_forro * lux_padrao
-        qtd_luminarias = max(1, round(fluxo_necessario / fluxo_luminoso_luminaria))
-
-        # Determinar número de colunas e linhas automaticamente
-        num_colunas = max(1, int(math.sqrt(qtd_luminarias * (largura / comprimento))))
-        num_linhas = max(1, int(math.ceil(qtd_luminarias / num_colunas)))
-
-        # Calcular espaçamentos
-        espacamento_x = largura / (num_colunas + 1)
-        espacamento_y = comprimento / (num_linhas + 1)
-
-        # Inserir as luminárias no forro
-        for i in range(1, num_linhas + 1):
-            for j in range(1, num_colunas + 1):
-                x = min_point.X + (espacamento_x * j / 0.3048)  # Converter de metros para pés
-                y = min_point.Y + (espacamento_y * i / 0.3048)  # Converter de metros para pés
-                z = altura_forro / 0.3048  # Converter para pés
-                posicao = XYZ(x, y, z)
-
-                try:
-                    luminaria_instancia = doc.Create.NewFamilyInstance(posicao, tipo_luminaria, nivel_forro_elemento, Structure.StructuralType.NonStructural)
-                    
-                    # Ajustar a elevação da luminária para coincidir com a altura do deslocamento do nível do forro
-                    param_elevacao = luminaria_instancia.LookupParameter("Elevação do nível")
-                    if param_elevacao and not param_elevacao.IsReadOnly:
-                        param_elevacao.Set(altura_forro / 0.3048)  # Converter para pés
-
-                    # Definir valores fixos para "Elevação do Ponto" e "Altura Rebaixo"
-                    param_elevacao_ponto = luminaria_instancia.LookupParameter("Elevação do Ponto")
-                    if param_elevacao_ponto and not param_elevacao_ponto.IsReadOnly:
-                        param_elevacao_ponto.Set(0.1 / 0.3048)  # Converter para pés
-
-                    param_altura_rebaixo = luminaria_instancia.LookupParameter("Altura Rebaixo")
-                    if param_altura_rebaixo and not param_altura_rebaixo.IsReadOnly:
-                        param_altura_rebaixo.Set(0)
-                except:
-                    pass
+    # "Elevação do nível" pelo parâmetro interno; os demais são da família
+    parametros = CacheParametros({"Elevação do nível": (BuiltInParameter.INSTANCE_ELEVATION_PARAM, "Elevação do nível")})
+    perdidos = []
+    for (_, altura_forro), (nivel_forro_elemento, pontos) in grupos_luminarias.items():
+        # Uma única chamada cria todas as luminárias do nível com a mesma altura de forro
+        ids_luminarias = criar_instancias_em_lote(
+            doc, [(posicao, tipo_luminaria, nivel_forro_elemento, 0.0) for posicao in pontos], perdidos)
+
+        for luminaria_id in ids_luminarias:
+            luminaria_instancia = doc.GetElement(luminaria_id)
+            try:
+                # Ajustar a elevação da luminária para coincidir com a altura do deslocamento do nível do forro
+                parametros.definir(luminaria_instancia, "Elevação do nível", altura_forro / 0.3048)  # Converter para pés
+
+                # Definir valores fixos para "Elevação do Ponto" e "Altura Rebaixo"
+                parametros.definir(luminaria_instancia, "Elevação do Ponto", 0.1 / 0.3048)  # Converter para pés
+                parametros.definir(luminaria_instancia, "Altura Rebaixo", 0)
+            except:
+                pass
     
     t.Commit()
+
+# Pontos dos níveis que o Revit recusou, para conferência
+for ponto in perdidos:
+    print("⚠️ Luminária não inserida em X={:.2f} m, Y={:.2f} m.".format(ponto.X * 0.3048, ponto.Y * 0.3048))
@@ -17,6 +17,8 @@ from Autodesk.Revit.DB import *
 from Autodesk.Revit.UI import *
 from System.Windows.Forms import MessageBox
 from pyrevit import forms
+from palhetaflow.contornos import Segmento, obter_contornos, curva_revit
+from palhetaflow.revestimento import IndiceBloqueios, gerar_eixos_acabamento, recortar_eixos, trechos_dos_elementos
 
 # Obtém o documento ativo
 uidoc = __revit__.ActiveUIDocument if hasattr(__revit__, 'ActiveUIDocument') else None
@@ -113,33 +115,41 @@ except ValueError:
 
 paredes_novas = []
 
+# Espessura do tipo escolhido: o eixo da parede fica a meia espessura do contorno
+wall_thickness = selected_wall_type_obj.get_Parameter(BuiltInParameter.WALL_ATTR_WIDTH_PARAM).AsDouble()
+deslocamento = wall_thickness / 2
+comprimento_minimo = app.ShortCurveTolerance
+
+# Separadores de ambiente não são paredes: não recebem revestimento em nenhum dos lados
+ids_separadores = set(e.Id.IntegerValue for e in FilteredElementCollector(doc)
+                      .OfCategory(BuiltInCategory.OST_RoomSeparationLines).WhereElementIsNotElementType())
+
+# Calcula todos os eixos (trechos colineares unidos, retas e arcos deslocados,
+# cantos resolvidos, separadores cortados) antes de abrir a transação
+eixos_por_ambiente = []
+for room_chave in ambientes_selecionados_nomes:
+    room = rooms[room_chave]
+    room_boundary = obter_contornos(room)
+    eixos = gerar_eixos_acabamento(room_boundary, deslocamento, comprimento_minimo=comprimento_minimo)
+    separadores = trechos_dos_elementos(room_boundary, ids_separadores)
+    if separadores:
+        bloqueios = IndiceBloqueios([(s.inicio, s.fim, wall_thickness) for s in separadores])
+        eixos = recortar_eixos(eixos, [bloqueios], comprimento_minimo)
+    eixos_por_ambiente.append((room, eixos))
+
 # Inicia a transação para criar as paredes
 t = Transaction(doc, "Criar Paredes Novas")
 t.Start()
 
 try:
-    for room_chave in ambientes_selecionados_nomes:
-        room = rooms[room_chave]
-        room_boundary = room.GetBoundarySegments(SpatialElementBoundaryOptions())
-
-        if room_boundary:
-            for segments in room_boundary:
-                for segment in segments:
-                    wall_curve = segment.GetCurve()
-                    if not wall_curve:
-                        continue
-                    
-                    wall_thickness = selected_wall_type_obj.get_Parameter(BuiltInParameter.WALL_ATTR_WIDTH_PARAM).AsDouble()
-                    deslocamento = wall_thickness / 2
-                    
-                    # Calcula o deslocamento para a posição correta da parede
-                    offset_direction = wall_curve.Direction.CrossProduct(XYZ.BasisZ).Normalize() * -deslocamento
-                    offset_curve = Line.CreateBound(wall_curve.GetEndPoint(0) + offset_direction, wall_curve.GetEndPoint(1) + offset_direction)
-                    
-                    # Cria a parede
-                    new_wall = Wall.Create(doc, offset_curve, selected_wall_type_obj.Id, room.LevelId, definir_altura_parede, 0, False, False)
-                    new_wall.get_Parameter(BuiltInParameter.WALL_BASE_OFFSET).Set(0)
-                    paredes_novas.append(new_wall)
+    for room, eixos in eixos_por_ambiente:
+        for eixo in eixos:
+            wall_curve = curva_revit(Segmento(*eixo))
+
+            # Cria a parede
+            new_wall = Wall.Create(doc, wall_curve, selected_wall_type_obj.Id, room.LevelId, definir_altura_parede, 0, False, False)
+            new_wall.get_Parameter(BuiltInParameter.WALL_BASE_OFFSET).Set(0)
+            paredes_novas.append(new_wall)
 
     t.Commit()
 
@@ -3,10 +3,12 @@ from Autodesk.Revit.DB import (
     FilteredElementCollector,
     Transaction,
     JoinGeometryUtils,
-    BuiltInCategory,
-    BoundingBoxXYZ
+    BuiltInCategory
 )
-from pyrevit import revit
+from pyrevit import revit, forms
+from palhetaflow.indice_espacial import caixa_do_elemento, caixas_se_tocam, criar_grade
+from palhetaflow.registro import carregar_registro, salvar_registro, versao_elemento
+from palhetaflow.unioes import chave_par, ordenar_par, planejar_unioes
 
 # Obtém o documento ativo no Revit
 doc = revit.doc
@@ -20,10 +22,21 @@ CATEGORIAS_UNIVEIS = [
     BuiltInCategory.OST_Roofs  # Telhados
 ]
 
-# Lista de categorias específicas para ajuste de ordem
-CATEGORIA_PISOS = BuiltInCategory.OST_Floors
-CATEGORIA_PILARES = BuiltInCategory.OST_StructuralColumns
-CATEGORIA_VIGAS = BuiltInCategory.OST_StructuralFraming
+# Nome do registro por documento com as versões dos elementos já unidos
+NOME_REGISTRO = "unir_todos"
+
+# Prioridade de corte por categoria: o maior valor corta o menor
+# (telhados ficam sem prioridade e mantêm a ordem definida pelo Revit)
+PRIORIDADE_CORTE = {
+    int(BuiltInCategory.OST_StructuralColumns): 4,  # Pilares
+    int(BuiltInCategory.OST_StructuralFraming): 3,  # Vigas
+    int(BuiltInCategory.OST_Floors): 2,  # Pisos
+    int(BuiltInCategory.OST_Walls): 1  # Paredes
+}
+
+# Uniões existentes só são desfeitas se as caixas estiverem afastadas mais que
+# esta folga (em pés): caixas que quase se tocam mantêm a união feita pelo usuário
+FOLGA_DESUNIR = 1 / 30.48
 
 # Função para obter elementos por categoria
 def obter_elementos(categoria):
@@ -32,83 +45,167 @@ def obter_elementos(categoria):
                 .WhereElementIsNotElementType()
                 .ToElements())
 
-# Função para verificar se os Bounding Boxes dos elementos realmente se tocam
-def bounding_boxes_intersect(bbox1, bbox2):
-    if bbox1 is None or bbox2 is None:
-        return False
-    if bbox1.Min.X > bbox2.Max.X or bbox1.Max.X < bbox2.Min.X:
-        return False
-    if bbox1.Min.Y > bbox2.Max.Y or bbox1.Max.Y < bbox2.Min.Y:
-        return False
-    if bbox1.Min.Z > bbox2.Max.Z or bbox1.Max.Z < bbox2.Min.Z:
-        return False
-    return True
-
-# 1️⃣ Função para unir todos os elementos que podem ser unidos
-def unir_todos_os_elementos():
+# Função para ler as uniões existentes entre os elementos gerenciados
+# (se ``ids`` for informado, só as uniões que envolvem esses elementos)
+def obter_unioes_existentes(elementos_por_id, ids=None):
+    unioes = set()
+    for id_elem in (elementos_por_id if ids is None else ids):
+        for id_unido in JoinGeometryUtils.GetJoinedElements(doc, elementos_por_id[id_elem]):
+            id_unido = id_unido.IntegerValue
+            if id_unido in elementos_por_id:
+                unioes.add(frozenset((id_elem, id_unido)))
+    return unioes
+
+# Função para salvar a versão atual de cada elemento após a execução, junto
+# com os pares cujas uniões o usuário decidiu manter (só os que ainda existem)
+def salvar_versoes(elementos_por_id, recusados):
+    versoes = {}
+    for id_elem, elem in elementos_por_id.items():
+        versoes[str(id_elem)] = versao_elemento(elem)
+    existentes = [chave for chave in recusados
+                  if all(int(id_elem) in elementos_por_id for id_elem in chave.split("-"))]
+    salvar_registro(NOME_REGISTRO, {"versoes": versoes, "recusados": sorted(existentes)})
+
+# 1️⃣ Função que planeja e aplica todas as uniões em uma única transação
+def unir_todos_os_elementos(versoes_anteriores=None, recusados=None):
+    recusados = set(recusados or ())
     elementos = []
     for categoria in CATEGORIAS_UNIVEIS:
         elementos += obter_elementos(categoria)
 
+    # Lê o bounding box de cada elemento uma única vez
+    elementos_por_id = {}
+    caixas = {}
+    prioridades = {}
+    for elem in elementos:
+        caixa = caixa_do_elemento(elem)
+        if caixa:
+            id_elem = elem.Id.IntegerValue
+            elementos_por_id[id_elem] = elem
+            caixas[id_elem] = caixa
+            prioridades[id_elem] = PRIORIDADE_CORTE.get(elem.Category.Id.IntegerValue)
+
+    # Índice espacial: só os elementos que dividem uma célula da grade são comparados
+    grade = criar_grade(caixas)
+
+    total = len(caixas)
+    print("Elementos analisados: {}".format(total))
+    print("Pares possíveis (todos contra todos): {}".format(total * (total - 1) // 2))
+
+    if versoes_anteriores is None:
+        # Passada completa: todos os pares de caixas que se tocam
+        alterados = None
+        pares_candidatos = list(grade.pares())
+    else:
+        # Passada incremental: elementos novos ou alterados e os seus vizinhos
+        alterados = [id_elem for id_elem, elem in elementos_por_id.items()
+                     if versoes_anteriores.get(str(id_elem)) != versao_elemento(elem)]
+        print("Elementos novos ou alterados desde a última execução: {}".format(len(alterados)))
+        pares_candidatos = list(grade.pares_com(alterados))
+
+    print("Pares candidatos (caixas que se tocam): {}".format(len(pares_candidatos)))
+
+    # 2️⃣ Compara o grafo desejado com as uniões que já existem no modelo
+    def esta_cortando(id_cortador, id_cortado):
+        return JoinGeometryUtils.IsCuttingElementInJoin(
+            doc, elementos_por_id[id_cortador], elementos_por_id[id_cortado])
+
+    # Pares que o usuário já escolheu manter não são perguntados de novo
+    def manter(id1, id2):
+        return (chave_par(id1, id2) in recusados or
+                caixas_se_tocam(caixas[id1], caixas[id2], FOLGA_DESUNIR))
+
+    plano = planejar_unioes(pares_candidatos,
+                            obter_unioes_existentes(elementos_por_id, alterados),
+                            prioridades,
+                            esta_cortando,
+                            manter)
+
+    print("Uniões já corretas: {}".format(plano.mantidas))
+    print("Uniões a criar: {} | desfazer: {} | inverter ordem: {}".format(
+        len(plano.unir), len(plano.desunir), len(plano.inverter)))
+
+    # Desfazer uniões feitas pelo usuário só com confirmação; a escolha de
+    # manter fica no registro e vale para as próximas execuções
+    if plano.desunir:
+        escolha = forms.alert(
+            "{} uniões existentes unem elementos que não se tocam.\n"
+            "Deseja desfazer essas uniões?\n"
+            "(Se mantidas, não serão perguntadas novamente.)".format(len(plano.desunir)),
+            options=["Desfazer uniões", "Manter uniões"]
+        )
+        if not escolha:
+            return
+        if escolha != "Desfazer uniões":
+            plano.mantidas += len(plano.desunir)
+            recusados.update(chave_par(id1, id2) for id1, id2 in plano.desunir)
+            plano.desunir = []
+
+    if not plano.total_escritas():
+        print("Nada a alterar: o modelo já está unido corretamente.")
+        salvar_versoes(elementos_por_id, recusados)
+        return
+
+    # 3️⃣ Aplica somente as diferenças
+    unioes_criadas = 0
+    unioes_desfeitas = 0
+    unioes_invertidas = 0
+    falhas = 0
     t = Transaction(doc, "Unir Todos os Elementos")
     t.Start()
-    for i in range(len(elementos)):
-        for j in range(i + 1, len(elementos)):
-            elem1 = elementos[i]
-            elem2 = elementos[j]
-
-            bbox1 = elem1.get_BoundingBox(None)
-            bbox2 = elem2.get_BoundingBox(None)
-
-            # Verifica se os elementos estão próximos antes de unir
-            if bounding_boxes_intersect(bbox1, bbox2):
-                try:
-                    if not JoinGeometryUtils.AreElementsJoined(doc, elem1, elem2):
-                        JoinGeometryUtils.JoinGeometry(doc, elem1, elem2)
-                except:
-                    pass  # Ignora erros
-    t.Commit()
 
-# 2️⃣ Função para corrigir a ordem da união (pilares/vigas cortam pisos)
-def corrigir_ordem_uniao(lista_cortadores, lista_cortados, nome_transacao):
-    t = Transaction(doc, nome_transacao)
-    t.Start()
-    for cortador in lista_cortadores:
-        for cortado in lista_cortados:
-            try:
-                # Obtém os bounding boxes dos elementos
-                bbox1 = cortador.get_BoundingBox(None)
-                bbox2 = cortado.get_BoundingBox(None)
-
-                # Se os elementos não se tocam, não tenta unir (evita o aviso do Revit)
-                if not bounding_boxes_intersect(bbox1, bbox2):
-                    continue
-
-                # 1️⃣ Se os elementos já estão unidos, primeiro remove a união
-                if JoinGeometryUtils.AreElementsJoined(doc, cortado, cortador):
-                    JoinGeometryUtils.UnjoinGeometry(doc, cortado, cortador)  # Remove a união na ordem errada
-                
-                # 2️⃣ Agora une novamente na ordem correta (cortador primeiro, cortado depois)
-                if not JoinGeometryUtils.AreElementsJoined(doc, cortador, cortado):
-                    JoinGeometryUtils.JoinGeometry(doc, cortador, cortado)
-
-                # 3️⃣ Garante que a união não está invertida
+    for id1, id2 in plano.desunir:
+        try:
+            JoinGeometryUtils.UnjoinGeometry(doc, elementos_por_id[id1], elementos_por_id[id2])
+            unioes_desfeitas += 1
+        except Exception as e:
+            falhas += 1
+            print("Erro ao desfazer união entre {} e {}: {}".format(id1, id2, e))
+
+    for id_cortador, id_cortado in plano.unir:
+        cortador = elementos_por_id[id_cortador]
+        cortado = elementos_por_id[id_cortado]
+        try:
+            JoinGeometryUtils.JoinGeometry(doc, cortador, cortado)
+            # O Revit escolhe a ordem ao unir; corrige só se houver prioridade definida
+            if (ordenar_par(id_cortador, id_cortado, prioridades) and
+                    not JoinGeometryUtils.IsCuttingElementInJoin(doc, cortador, cortado)):
                 JoinGeometryUtils.SwitchJoinOrder(doc, cortador, cortado)
+            unioes_criadas += 1
+        except Exception as e:
+            # Em geral, elementos cujas caixas se tocam, mas a geometria não
+            falhas += 1
+            print("Erro ao unir {} e {}: {}".format(id_cortador, id_cortado, e))
+
+    for id_cortador, id_cortado in plano.inverter:
+        try:
+            JoinGeometryUtils.SwitchJoinOrder(doc, elementos_por_id[id_cortador], elementos_por_id[id_cortado])
+            unioes_invertidas += 1
+        except Exception as e:
+            falhas += 1
+            print("Erro ao corrigir união entre {} e {}: {}".format(id_cortador, id_cortado, e))
 
-            except Exception as e:
-                print("Erro ao corrigir união entre {} e {}: {}".format(cortador.Id, cortado.Id, e))
     t.Commit()
 
-# Executa a união de todos os elementos
-unir_todos_os_elementos()
-
-# Obtém os elementos divididos por categorias específicas para corrigir a ordem
-pisos = obter_elementos(CATEGORIA_PISOS)
-pilares = obter_elementos(CATEGORIA_PILARES)
-vigas = obter_elementos(CATEGORIA_VIGAS)
-
-# 3️⃣ Ajustar a união para que Pilares cortem Pisos
-corrigir_ordem_uniao(pilares, pisos, "Ajustar União: Pilares cortam Pisos")
-
-# 4️⃣ Ajustar a união para que Vigas cortem Pisos
-corrigir_ordem_uniao(vigas, pisos, "Ajustar União: Vigas cortam Pisos")
+    print("Uniões criadas: {} | desfeitas: {} | invertidas: {} | erros: {}".format(
+        unioes_criadas, unioes_desfeitas, unioes_invertidas, falhas))
+
+    # As uniões alteram a versão dos elementos, por isso o registro é salvo depois
+    salvar_versoes(elementos_por_id, recusados)
+
+# Se já houve uma execução neste documento, pergunta se processa só as alterações
+registro = carregar_registro(NOME_REGISTRO)
+versoes_anteriores = None
+recusados = registro.get("recusados", []) if registro else []
+if registro and registro.get("versoes"):
+    escolha = forms.alert(
+        "Deseja unir apenas os elementos novos ou alterados desde a última execução?",
+        options=["Somente alterações", "Processar tudo"]
+    )
+    if not escolha:
+        raise SystemExit
+    if escolha == "Somente alterações":
+        versoes_anteriores = registro["versoes"]
+
+# Executa a união dos elementos
+unir_todos_os_elementos(versoes_anteriores, recusados)
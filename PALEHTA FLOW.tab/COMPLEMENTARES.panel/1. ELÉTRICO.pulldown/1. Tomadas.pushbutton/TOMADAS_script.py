@@ -11,12 +11,26 @@ from pyrevit import revit, forms
 from Autodesk.Revit.DB import *
 from Autodesk.Revit.UI.Selection import ObjectType
 from System.Windows.Forms import Form, ListBox, Button, DialogResult, DockStyle, SelectionMode
+from palhetaflow.arvore_r import ArvoreR
+from palhetaflow.contornos import obter_contornos, curva_revit
+from palhetaflow.indice_espacial import caixa_do_elemento
+from palhetaflow.instancias import criar_instancias_em_lote
+from palhetaflow.intervalos import intervalos_livres, distribuir_pontos
 
 # Obter documento do Revit
 doc = revit.doc
 uidoc = revit.uidoc
 view = doc.ActiveView  # Vista ativa
 
+# Folga mínima entre as tomadas e portas, janelas e pilares (em metros)
+FOLGA_ABERTURAS = 0.15
+
+# Largura da tomada ao longo da parede (em metros); trechos livres menores ficam sem tomada
+LARGURA_TOMADA = 0.10
+
+# Quantidade de tomadas criadas por transação (uma regeneração por bloco)
+TAMANHO_BLOCO = 500
+
 # ---------------------- FUNÇÕES ----------------------
 
 def selecionar_familia_tomada():
@@ -45,16 +59,7 @@ def selecionar_familia_tomada():
         forms.alert("Nenhuma tomada foi selecionada.", exitscript=True)
         return None
 
-    familia_selecionada = tipos_nomes[escolha]
-
-    t = Transaction(doc, "Ativar Família de Tomada")
-    t.Start()
-    if not familia_selecionada.IsActive:
-        familia_selecionada.Activate()
-        doc.Regenerate()
-    t.Commit()
-
-    return familia_selecionada
+    return tipos_nomes[escolha]
 
 def obter_todos_ambientes():
     """Obtém todos os ambientes válidos do projeto."""
@@ -94,19 +99,85 @@ def obter_nivel_do_ambiente(ambiente):
     nivel_id = ambiente.LevelId
     return doc.GetElement(nivel_id)  # Retorna o próprio elemento de nível
 
+def obter_largura_abertura(abertura):
+    """Obtém a largura de uma porta ou janela pelo tipo ou, se não houver, pela instância."""
+    for elemento in (abertura.Symbol, abertura):
+        for parametro_id in (BuiltInParameter.DOOR_WIDTH, BuiltInParameter.WINDOW_WIDTH):
+            param = elemento.get_Parameter(parametro_id)
+            if param and param.HasValue and param.AsDouble() > 0:
+                return param.AsDouble()
+    return 0.0
+
+def obter_aberturas_por_parede():
+    """Agrupa portas e janelas pela parede hospedeira: {id da parede: [(ponto, largura)]}."""
+    aberturas = {}
+    for categoria in (BuiltInCategory.OST_Doors, BuiltInCategory.OST_Windows):
+        for abertura in (FilteredElementCollector(doc)
+                         .OfCategory(categoria)
+                         .WhereElementIsNotElementType()):
+            hospedeiro = getattr(abertura, "Host", None)
+            if hospedeiro is None or not isinstance(abertura.Location, LocationPoint):
+                continue
+            aberturas.setdefault(hospedeiro.Id.IntegerValue, []).append(
+                (abertura.Location.Point, obter_largura_abertura(abertura)))
+    return aberturas
+
+def obter_indice_pilares():
+    """Carrega as caixas dos pilares uma única vez numa R-tree."""
+    itens = []
+    for pilar in (FilteredElementCollector(doc)
+                  .OfCategory(BuiltInCategory.OST_StructuralColumns)
+                  .WhereElementIsNotElementType()):
+        caixa = caixa_do_elemento(pilar)
+        if caixa:
+            itens.append((caixa, caixa))
+    return ArvoreR(itens)
+
+def posicao_ao_longo(linha, ponto):
+    """Distância, ao longo da linha de contorno, da projeção do ponto a partir do início."""
+    if isinstance(linha, Line):
+        inicio = linha.GetEndPoint(0)
+        return (ponto - inicio).DotProduct(linha.Direction)
+    projecao = linha.Project(ponto)
+    return linha.ComputeNormalizedParameter(projecao.Parameter) * linha.Length
+
+def calcular_intervalos_bloqueados(linha, id_parede, aberturas_por_parede, indice_pilares, folga_ft):
+    """Trechos da linha ocupados por portas e janelas da parede e por pilares encostados."""
+    bloqueados = []
+
+    for ponto, largura in aberturas_por_parede.get(id_parede, []):
+        centro = posicao_ao_longo(linha, ponto)
+        bloqueados.append((centro - largura / 2 - folga_ft, centro + largura / 2 + folga_ft))
+
+    inicio = linha.GetEndPoint(0)
+    fim = linha.GetEndPoint(1)
+    caixa_linha = (min(inicio.X, fim.X), min(inicio.Y, fim.Y), min(inicio.Z, fim.Z) - 1,
+                   max(inicio.X, fim.X), max(inicio.Y, fim.Y), max(inicio.Z, fim.Z) + 1)
+    for caixa in indice_pilares.consultar(caixa_linha, folga_ft):
+        centro = XYZ((caixa[0] + caixa[3]) / 2, (caixa[1] + caixa[4]) / 2, inicio.Z)
+        meia_diagonal = math.hypot(caixa[3] - caixa[0], caixa[4] - caixa[1]) / 2
+        if linha.Distance(centro) > meia_diagonal + folga_ft:
+            continue
+        posicoes = [posicao_ao_longo(linha, XYZ(x, y, inicio.Z))
+                    for x in (caixa[0], caixa[3]) for y in (caixa[1], caixa[4])]
+        bloqueados.append((min(posicoes) - folga_ft, max(posicoes) + folga_ft))
+
+    return bloqueados
+
 def obter_perimetro_paredes(ambiente):
     """Obtém as bordas das paredes do ambiente e direciona vetores para dentro do ambiente"""
-    opt = SpatialElementBoundaryOptions()
-    limites = ambiente.GetBoundarySegments(opt)
+    limites = obter_contornos(ambiente)
     linhas_paredes = []
     vetores_internos = []
+    ids_paredes = []
 
     centro_ambiente = ambiente.Location.Point
 
     for limite in limites:
         for segmento in limite:
-            linha = segmento.GetCurve()
+            linha = curva_revit(segmento)
             linhas_paredes.append(linha)
+            ids_paredes.append(segmento.id_elemento)
 
             vetor_direcao = (linha.GetEndPoint(1) - linha.GetEndPoint(0)).Normalize()
             vetor_perpendicular = XYZ(-vetor_direcao.Y, vetor_direcao.X, 0)
@@ -119,66 +190,122 @@ def obter_perimetro_paredes(ambiente):
 
             vetores_internos.append(vetor_perpendicular)
 
-    return linhas_paredes, vetores_internos
+    return linhas_paredes, vetores_internos, ids_paredes
+
+def dividir_pontos_nas_paredes(linhas, espaco_entre_tomadas, offset=0.7, bloqueios=None):
+    """Divide as paredes em pontos equidistantes onde as tomadas serão inseridas, evitando cantos com offset.
 
-def dividir_pontos_nas_paredes(linhas, espaco_entre_tomadas, offset=0.7):
-    """Divide as paredes em pontos equidistantes onde as tomadas serão inseridas, evitando cantos com offset"""
+    ``bloqueios`` traz, para cada linha, os intervalos ocupados por portas,
+    janelas e pilares; as tomadas só são distribuídas nos trechos livres em
+    que cabem inteiras (``LARGURA_TOMADA``).
+    """
     pontos = []
     normais = []
     offset_ft = UnitUtils.ConvertToInternalUnits(offset, UnitTypeId.Meters)
+    meia_largura_ft = UnitUtils.ConvertToInternalUnits(LARGURA_TOMADA, UnitTypeId.Meters) / 2
 
-    for linha in linhas:
+    for indice, linha in enumerate(linhas):
         comprimento = linha.Length
         
         if comprimento <= 2 * offset_ft:
             continue
 
-        qtd_tomadas = max(1, int((comprimento - 2 * offset_ft) / espaco_entre_tomadas))
+        bloqueados = bloqueios[indice] if bloqueios else []
+        livres = intervalos_livres(bloqueados, offset_ft, comprimento - offset_ft)
 
-        for i in range(qtd_tomadas + 1):
-            parametro = offset_ft / comprimento + (float(i) / qtd_tomadas) * ((comprimento - 2 * offset_ft) / comprimento)
-            ponto = linha.Evaluate(parametro, True)
-            vetor_direcao = (linha.GetEndPoint(1) - linha.GetEndPoint(0)).Normalize()
-            vetor_perpendicular = XYZ(-vetor_direcao.Y, vetor_direcao.X, 0)
+        vetor_direcao = (linha.GetEndPoint(1) - linha.GetEndPoint(0)).Normalize()
+        vetor_perpendicular = XYZ(-vetor_direcao.Y, vetor_direcao.X, 0)
+
+        for posicao in distribuir_pontos(livres, espaco_entre_tomadas, meia_largura_ft):
+            ponto = linha.Evaluate(posicao / comprimento, True)
             pontos.append(ponto)
             normais.append(vetor_perpendicular)
 
     return pontos, normais
 
-def inserir_tomadas(familia, pontos, normais, nivel, altura=0.3):
-    """Insere tomadas nos pontos gerados ao longo das paredes e alinha corretamente"""
-    if not familia or not familia.IsActive:
-        forms.alert("Família de tomada inválida. O script será encerrado.", exitscript=True)
-        return
-
-    altura_ft = UnitUtils.ConvertToInternalUnits(altura, UnitTypeId.Meters)
-    t = Transaction(doc, "Inserir Tomadas")
-    t.Start()
-    
-    for i in range(len(pontos)):
-        ponto = XYZ(pontos[i].X, pontos[i].Y, altura_ft)
+def calcular_angulo_tomada(vetor_parede):
+    """Ângulo de rotação (em torno do eixo Z) que alinha a tomada à parede"""
+    referencia = XYZ(1, 0, 0)
+    angulo = vetor_parede.AngleTo(referencia)
 
-        tomada = doc.Create.NewFamilyInstance(ponto, familia, nivel, Structure.StructuralType.NonStructural)
+    if vetor_parede.Y < 0:
+        angulo = -angulo
 
-        # Definir a Elevação do Nível como 0
-        param_elevacao = tomada.get_Parameter(BuiltInParameter.INSTANCE_ELEVATION_PARAM)
-        if param_elevacao and not param_elevacao.IsReadOnly:
-            param_elevacao.Set(0)
+    return angulo - math.pi / 2
 
-        # Alinhar a tomada à parede
-        vetor_parede = normais[i]
-        referencia = XYZ(1, 0, 0)
-        angulo = vetor_parede.AngleTo(referencia)
-
-        if vetor_parede.Y < 0:
-            angulo = -angulo
+def planejar_tomadas(familia, pontos, normais, nivel, altura=0.3):
+    """Monta os dados de criação (ponto, família, nível, rotação) sem escrever no modelo"""
+    altura_ft = UnitUtils.ConvertToInternalUnits(altura, UnitTypeId.Meters)
 
-        angulo -= math.pi / 2
+    # A rotação e o nível já vão nos dados de criação
+    itens = []
+    for ponto_parede, vetor_parede in zip(pontos, normais):
+        ponto = XYZ(ponto_parede.X, ponto_parede.Y, altura_ft)
+        itens.append((ponto, familia, nivel, calcular_angulo_tomada(vetor_parede)))
+    return itens
 
-        eixo_rotacao = Line.CreateBound(ponto, ponto + XYZ(0, 0, 1))
-        ElementTransformUtils.RotateElement(doc, tomada.Id, eixo_rotacao, angulo)
+def executar_transacao(nome, acao):
+    """Roda ``acao()`` numa transação, desfazendo-a se algo der errado"""
+    t = Transaction(doc, nome)
+    t.Start()
+    try:
+        acao()
+        t.Commit()
+    finally:
+        if t.HasStarted() and not t.HasEnded():
+            t.RollBack()
+
+def ativar_familia(familia):
+    """Ativa o tipo da tomada, se necessário"""
+    if not familia.IsActive:
+        familia.Activate()
+        doc.Regenerate()
 
-    t.Commit()
+def inserir_tomadas(itens, perdidos):
+    """Insere um bloco de tomadas já planejadas numa única transação"""
+    def inserir():
+        for tomada_id in criar_instancias_em_lote(doc, itens, perdidos):
+            # Definir a Elevação do Nível como 0
+            param_elevacao = doc.GetElement(tomada_id).get_Parameter(BuiltInParameter.INSTANCE_ELEVATION_PARAM)
+            if param_elevacao and not param_elevacao.IsReadOnly:
+                param_elevacao.Set(0)
+
+    executar_transacao("Inserir Tomadas", inserir)
+
+def inserir_tomadas_em_blocos(familia, itens):
+    """Ativa a família e insere todas as tomadas em blocos dentro de um único TransactionGroup (um passo de desfazer)"""
+    total = len(itens)
+    grupo = TransactionGroup(doc, "Inserir Tomadas")
+    grupo.Start()
+
+    cancelado = False
+    perdidos = []
+    try:
+        executar_transacao("Ativar Família de Tomada", lambda: ativar_familia(familia))
+        with forms.ProgressBar(title="Inserindo tomadas ({value} de {max_value})", cancellable=True) as barra:
+            for inicio in range(0, total, TAMANHO_BLOCO):
+                # O cancelamento só é verificado entre blocos, nunca no meio de uma transação
+                if barra.cancelled:
+                    cancelado = True
+                    break
+                inserir_tomadas(itens[inicio:inicio + TAMANHO_BLOCO], perdidos)
+                barra.update_progress(min(inicio + TAMANHO_BLOCO, total), total)
+    except Exception as e:
+        # Nada fica pela metade: os blocos já confirmados são desfeitos junto com o grupo
+        grupo.RollBack()
+        forms.alert("Erro ao inserir tomadas: {}. Nenhuma tomada foi criada.".format(e))
+        return 0
+
+    if cancelado:
+        grupo.RollBack()
+        forms.alert("Inserção cancelada. Nenhuma tomada foi criada.")
+        return 0
+
+    grupo.Assimilate()
+    # Pontos dos níveis que o Revit recusou, para conferência
+    for ponto in perdidos:
+        print("Tomada não inserida em X={:.2f} m, Y={:.2f} m".format(ponto.X * 0.3048, ponto.Y * 0.3048))
+    return total - len(perdidos)
 
 # ---------------------- EXECUÇÃO DO SCRIPT ----------------------
 
@@ -193,9 +320,23 @@ else:
             prompt="Digite a distância entre as tomadas (em metros):"
         ))
         espaco_entre_tomadas_ft = UnitUtils.ConvertToInternalUnits(espaco_entre_tomadas, UnitTypeId.Meters)
+        folga_ft = UnitUtils.ConvertToInternalUnits(FOLGA_ABERTURAS, UnitTypeId.Meters)
+
+        # Portas, janelas e pilares são lidos uma única vez para todos os ambientes
+        aberturas_por_parede = obter_aberturas_por_parede()
+        indice_pilares = obter_indice_pilares()
 
+        # Planejamento: pontos e normais de todos os ambientes antes de qualquer escrita
+        itens = []
         for ambiente in ambientes:
             nivel = obter_nivel_do_ambiente(ambiente)
-            linhas_paredes, vetores_internos = obter_perimetro_paredes(ambiente)
-            pontos, normais = dividir_pontos_nas_paredes(linhas_paredes, espaco_entre_tomadas_ft)
-            inserir_tomadas(familia_tomada, pontos, normais, nivel)
+            linhas_paredes, vetores_internos, ids_paredes = obter_perimetro_paredes(ambiente)
+            bloqueios = [calcular_intervalos_bloqueados(linha, id_parede, aberturas_por_parede, indice_pilares, folga_ft)
+                         for linha, id_parede in zip(linhas_paredes, ids_paredes)]
+            pontos, normais = dividir_pontos_nas_paredes(linhas_paredes, espaco_entre_tomadas_ft, bloqueios=bloqueios)
+            itens.extend(planejar_tomadas(familia_tomada, pontos, normais, nivel))
+
+        # Escrita: poucos blocos de transações agrupados num único passo de desfazer
+        if itens:
+            inseridas = inserir_tomadas_em_blocos(familia_tomada, itens)
+            print("Tomadas inseridas: {} em {} ambientes".format(inseridas, len(ambientes)))
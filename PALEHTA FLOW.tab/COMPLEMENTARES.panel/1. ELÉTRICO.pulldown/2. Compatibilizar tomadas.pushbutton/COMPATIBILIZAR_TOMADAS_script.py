@@ -6,82 +6,241 @@ clr.AddReference("RevitAPI")
 clr.AddReference("RevitAPIUI")
 clr.AddReference("System.Windows.Forms")
 
-from pyrevit import revit
+from pyrevit import revit, forms, script
 from Autodesk.Revit.DB import *
 from System.Windows.Forms import MessageBox
+from palhetaflow.indice_espacial import caixa_do_elemento
+from palhetaflow.interferencias import MotorInterferencias, CM_POR_PE
+from palhetaflow.intervalos import (
+    intervalos_livres, intervalo_projetado, posicao_livre_mais_proxima
+)
+import math
 
 # Obter documento do Revit
 doc = revit.doc
 uidoc = revit.uidoc
 view = doc.ActiveView  # Vista ativa
+output = script.get_output()
 
-# Obtém todos os pilares do projeto
-pilares = list(FilteredElementCollector(doc)
-               .OfCategory(BuiltInCategory.OST_StructuralColumns)
-               .WhereElementIsNotElementType()
-               .ToElements())
-
-# Obtém todos os dispositivos elétricos do projeto
-dispositivos_eletricos = list(FilteredElementCollector(doc)
-                              .OfCategory(BuiltInCategory.OST_ElectricalFixtures)
-                              .WhereElementIsNotElementType()
-                              .ToElements())
-
-# Obtém todas as portas do projeto
-portas = list(FilteredElementCollector(doc)
-              .OfCategory(BuiltInCategory.OST_Doors)
-              .WhereElementIsNotElementType()
-              .ToElements())
-
-# Obtém todas as janelas do projeto
-janelas = list(FilteredElementCollector(doc)
-               .OfCategory(BuiltInCategory.OST_Windows)
-               .WhereElementIsNotElementType()
-               .ToElements())
-
-# Função para verificar interseção de bounding boxes
-def verifica_intersecao(bbox1, bbox2):
-    if not bbox1 or not bbox2:
-        return False  # Evita erro se alguma bounding box for None
-    return (bbox1.Min.X <= bbox2.Max.X and bbox1.Max.X >= bbox2.Min.X and
-            bbox1.Min.Y <= bbox2.Max.Y and bbox1.Max.Y >= bbox2.Min.Y and
-            bbox1.Min.Z <= bbox2.Max.Z and bbox1.Max.Z >= bbox2.Min.Z)
-
-# Lista para armazenar os IDs dos dispositivos a serem deletados
-dispositivos_para_deletar = set()
-
-# Verifica a interseção entre pilares e dispositivos elétricos
-for pilar in pilares:
-    pilar_bbox = pilar.get_BoundingBox(None)
-    if pilar_bbox:
-        for dispositivo in dispositivos_eletricos:
-            dispositivo_bbox = dispositivo.get_BoundingBox(None)
-            if dispositivo_bbox and verifica_intersecao(pilar_bbox, dispositivo_bbox):
-                dispositivos_para_deletar.add(dispositivo.Id)
-
-# Verifica a interseção entre portas, janelas e dispositivos elétricos
-for elemento in portas + janelas:
-    elemento_bbox = elemento.get_BoundingBox(None)
-    if elemento_bbox:
-        for dispositivo in dispositivos_eletricos:
-            dispositivo_bbox = dispositivo.get_BoundingBox(None)
-            if dispositivo_bbox and verifica_intersecao(elemento_bbox, dispositivo_bbox):
-                dispositivos_para_deletar.add(dispositivo.Id)
-
-# Deleta os dispositivos elétricos que fazem interseção com os pilares, portas e janelas
-if dispositivos_para_deletar:
-    with Transaction(doc, "Deletar Dispositivos Elétricos em Interseção") as trans:
-        trans.Start()
-        elementos_excluidos = 0  # Contador de elementos deletados
-        for dispositivo_id in dispositivos_para_deletar:
-            elemento = doc.GetElement(dispositivo_id)
-            if elemento and not elemento.Pinned:  # Garante que o elemento existe e não está fixado
-                try:
-                    doc.Delete(dispositivo_id)
-                    elementos_excluidos += 1  # Incrementa o contador
-                except:
-                    pass  # Ignora erros sem imprimir mensagens
-        trans.Commit()
+# Categorias que não podem ter dispositivos elétricos por cima
+CATEGORIAS_OBSTACULOS = {
+    "Pilares": BuiltInCategory.OST_StructuralColumns,
+    "Portas": BuiltInCategory.OST_Doors,
+    "Janelas": BuiltInCategory.OST_Windows
+}
+
+# Função para obter elementos por categoria
+def obter_elementos(categoria):
+    return list(FilteredElementCollector(doc)
+                .OfCategory(categoria)
+                .WhereElementIsNotElementType()
+                .ToElements())
+
+# Pergunta a folga mínima entre dispositivos e obstáculos
+tolerancia_str = forms.ask_for_string(
+    default="0",
+    title="Folga Mínima",
+    prompt="Informe a folga mínima entre tomadas e pilares/portas/janelas (em centímetros):"
+)
+if tolerancia_str is None:
+    raise SystemExit
+
+try:
+    tolerancia_cm = float(tolerancia_str.replace(",", "."))
+except ValueError:
+    forms.alert("Valor inválido para a folga mínima.", exitscript=True)
+
+# Obtém os obstáculos (pilares, portas e janelas) com o bounding box lido uma única vez
+obstaculos = []
+for nome_categoria, categoria in CATEGORIAS_OBSTACULOS.items():
+    for elemento in obter_elementos(categoria):
+        caixa = caixa_do_elemento(elemento)
+        if caixa:
+            obstaculos.append((elemento.Id, nome_categoria, caixa))
+
+# Obtém todos os dispositivos elétricos do projeto, agrupados pela parede hospedeira
+dispositivos = []
+caixas_dispositivos = {}
+dispositivos_por_parede = {}
+for dispositivo in obter_elementos(BuiltInCategory.OST_ElectricalFixtures):
+    caixa = caixa_do_elemento(dispositivo)
+    if caixa:
+        dispositivos.append((dispositivo.Id, caixa))
+        caixas_dispositivos[dispositivo.Id] = caixa
+        hospedeiro = getattr(dispositivo, "Host", None)
+        if isinstance(hospedeiro, Wall):
+            dispositivos_por_parede.setdefault(hospedeiro.Id, []).append(dispositivo.Id)
+
+# Cada dispositivo é consultado uma única vez na R-tree de obstáculos
+motor = MotorInterferencias(obstaculos, tolerancia_cm)
+interferencias = motor.verificar_todos(dispositivos)
+
+if not interferencias:
+    MessageBox.Show("Nenhuma interferência encontrada entre {0} dispositivos elétricos e {1} obstáculos.".format(
+        len(dispositivos), len(obstaculos)), "Processo Concluído")
+    raise SystemExit
+
+# Relatório das interferências para revisão
+output.print_md("## Interferências de dispositivos elétricos")
+output.print_table(
+    table_data=[[output.linkify(i.id_dispositivo),
+                 output.linkify(i.id_obstaculo),
+                 i.categoria_obstaculo,
+                 "{:.1f}".format(i.sobreposicao * CM_POR_PE)]
+                for i in interferencias],
+    columns=["Dispositivo", "Obstáculo", "Categoria", "Sobreposição (cm)"]
+)
+
+dispositivos_com_interferencia = set(i.id_dispositivo for i in interferencias)
+
+escolha = forms.alert(
+    "{0} dispositivos elétricos têm interferência com pilares, portas ou janelas.\n"
+    "Confira o relatório antes de continuar.".format(len(dispositivos_com_interferencia)),
+    options=["Realocar dispositivos", "Excluir dispositivos", "Apenas relatório"]
+)
+if escolha not in ("Realocar dispositivos", "Excluir dispositivos"):
+    raise SystemExit
+
+raio_busca = None
+if escolha == "Realocar dispositivos":
+    raio_str = forms.ask_for_string(
+        default="60",
+        title="Raio de Busca",
+        prompt="Distância máxima para mover cada dispositivo ao longo da parede (em centímetros):"
+    )
+    if raio_str is None:
+        raise SystemExit
+    try:
+        raio_busca = float(raio_str.replace(",", ".")) / CM_POR_PE
+    except ValueError:
+        forms.alert("Valor inválido para o raio de busca.", exitscript=True)
+
+# Função que calcula, uma única vez por parede, os trechos ocupados ao longo da sua linha
+# (cada trecho guarda a faixa de altura do obstáculo, para comparar com a do dispositivo)
+def calcular_trechos_ocupados(parede):
+    curva = parede.Location.Curve if isinstance(parede.Location, LocationCurve) else None
+    if not isinstance(curva, Line):
+        return None  # Paredes curvas não são tratadas
+
+    inicio = curva.GetEndPoint(0)
+    fim = curva.GetEndPoint(1)
+    comprimento = math.hypot(fim.X - inicio.X, fim.Y - inicio.Y)
+    if comprimento <= 0:
+        return None
+
+    origem = (inicio.X, inicio.Y)
+    direcao = ((fim.X - inicio.X) / comprimento, (fim.Y - inicio.Y) / comprimento)
+    normal = (-direcao[1], direcao[0])
+    meia_espessura = parede.Width / 2 + motor.tolerancia
+
+    ocupados = []
+    caixa_parede = caixa_do_elemento(parede)
+    if caixa_parede:
+        # Obstáculos na faixa da parede (pilares encostados, portas e janelas hospedadas)
+        for _, _, caixa in motor.arvore.consultar(caixa_parede, motor.tolerancia):
+            normal_min, normal_max = intervalo_projetado(caixa, origem, normal)
+            if normal_max < -meia_espessura or normal_min > meia_espessura:
+                continue
+            t_min, t_max = intervalo_projetado(caixa, origem, direcao)
+            ocupados.append((t_min - motor.tolerancia, t_max + motor.tolerancia,
+                             caixa[2] - motor.tolerancia, caixa[5] + motor.tolerancia))
+
+    # Dispositivos sem interferência continuam ocupando o seu lugar na parede
+    for outro_id in dispositivos_por_parede.get(parede.Id, []):
+        if outro_id not in dispositivos_com_interferencia:
+            caixa = caixas_dispositivos[outro_id]
+            t_min, t_max = intervalo_projetado(caixa, origem, direcao)
+            ocupados.append((t_min, t_max, caixa[2], caixa[5]))
+
+    # Trechos livres por faixa de altura: calculados uma vez por parede para cada altura de dispositivo
+    return {"origem": origem, "direcao": direcao, "comprimento": comprimento, "ocupados": ocupados, "livres": {}}
+
+# Trechos livres da parede para um dispositivo entre z_min e z_max. Só bloqueiam os obstáculos
+# na altura do dispositivo (um peitoril acima da tomada não bloqueia); dispositivos na mesma
+# altura (o caso comum) reaproveitam a lista já montada para a parede.
+def trechos_livres(trechos, z_min, z_max):
+    faixa = (round(z_min, 4), round(z_max, 4))
+    if faixa not in trechos["livres"]:
+        bloqueados = [(t0, t1) for t0, t1, z0, z1 in trechos["ocupados"] if z1 >= z_min and z0 <= z_max]
+        trechos["livres"][faixa] = intervalos_livres(bloqueados, 0.0, trechos["comprimento"])
+    return trechos["livres"][faixa]
+
+# Marca um trecho como ocupado; só as faixas de altura que ele cruza são recalculadas depois
+def ocupar(trechos, t0, t1, z_min, z_max):
+    trechos["ocupados"].append((t0, t1, z_min, z_max))
+    for faixa in list(trechos["livres"]):
+        if faixa[1] >= z_min and faixa[0] <= z_max:
+            del trechos["livres"][faixa]
+
+# Função que tenta mover o dispositivo para o trecho livre mais próximo da sua parede.
+# Retorna True se moveu, False se não há posição livre dentro do raio de busca e
+# None se o dispositivo não pode ser realocado (não hospedado em parede reta).
+def realocar_dispositivo(elemento, trechos_por_parede):
+    parede = getattr(elemento, "Host", None)
+    if not isinstance(parede, Wall):
+        return None
+
+    if parede.Id not in trechos_por_parede:
+        trechos_por_parede[parede.Id] = calcular_trechos_ocupados(parede)
+    trechos = trechos_por_parede[parede.Id]
+    if not trechos:
+        return None
+
+    origem, direcao = trechos["origem"], trechos["direcao"]
+    caixa = caixas_dispositivos[elemento.Id]
+    z_min, z_max = caixa[2], caixa[5]
+    livres = trechos_livres(trechos, z_min, z_max)
+
+    t_min, t_max = intervalo_projetado(caixa, origem, direcao)
+    meia_largura = (t_max - t_min) / 2
+    centro_atual = (t_min + t_max) / 2
+
+    novo_centro = posicao_livre_mais_proxima(livres, centro_atual, meia_largura, raio_busca)
+    if novo_centro is None:
+        return False
+
+    deslocamento = novo_centro - centro_atual
+    ElementTransformUtils.MoveElement(doc, elemento.Id, XYZ(direcao[0] * deslocamento, direcao[1] * deslocamento, 0))
+    # O novo lugar deixa de estar livre para os próximos dispositivos da mesma parede
+    ocupar(trechos, novo_centro - meia_largura - motor.tolerancia, novo_centro + meia_largura + motor.tolerancia,
+           z_min, z_max)
+    return True
+
+# Realoca ou deleta os dispositivos elétricos que fazem interseção com os pilares, portas e janelas
+elementos_realocados = 0  # Contador de elementos movidos
+elementos_excluidos = 0  # Contador de elementos deletados
+nao_realocaveis = []  # Dispositivos que não estão em parede reta: ficam para revisão manual
+trechos_por_parede = {}
+with Transaction(doc, "Compatibilizar Dispositivos Elétricos") as trans:
+    trans.Start()
+    for dispositivo_id in dispositivos_com_interferencia:
+        elemento = doc.GetElement(dispositivo_id)
+        if not elemento or elemento.Pinned:  # Garante que o elemento existe e não está fixado
+            continue
+        try:
+            if escolha == "Realocar dispositivos":
+                resultado = realocar_dispositivo(elemento, trechos_por_parede)
+                if resultado:
+                    elementos_realocados += 1
+                    continue
+                if resultado is None:
+                    nao_realocaveis.append(dispositivo_id)
+                    continue
+            # Sem posição válida dentro do raio de busca: o dispositivo é removido
+            doc.Delete(dispositivo_id)
+            elementos_excluidos += 1  # Incrementa o contador
+        except:
+            pass  # Ignora erros sem imprimir mensagens
+    trans.Commit()
+
+if nao_realocaveis:
+    output.print_md("## Dispositivos não realocados (fora de parede reta)")
+    output.print_table(
+        table_data=[[output.linkify(id_dispositivo)] for id_dispositivo in nao_realocaveis],
+        columns=["Dispositivo"]
+    )
 
 # Mensagem de confirmação via MessageBox do Windows Forms
-MessageBox.Show("{0} dispositivos elétricos foram removidos.".format(elementos_excluidos), "Processo Concluído")
+MessageBox.Show("{0} dispositivos elétricos foram realocados, {1} foram removidos e {2} não puderam ser "
+                "realocados (veja o relatório).".format(
+    elementos_realocados, elementos_excluidos, len(nao_realocaveis)), "Processo Concluído")
@@ -5,63 +5,134 @@ clr.AddReference("RevitServices")
 from RevitServices.Persistence import DocumentManager
 
 clr.AddReference("RevitAPI")
-from Autodesk.Revit.DB import FilteredElementCollector, BuiltInCategory, XYZ, Transaction, Level
+from Autodesk.Revit.DB import FilteredElementCollector, BuiltInCategory, BuiltInParameter, XYZ, Transaction, Level
 
 # Importando a função correta para obter o documento do Revit
-from pyrevit import revit
+from pyrevit import revit, forms, script
+from palhetaflow.instancias import CacheParametros, EscritorParametros
+from palhetaflow.numeracao import numerar, ordenar_em_linhas, plano_escrita
+
+CM_POR_PE = 30.48
 
 # Obter documento do Revit
 doc = revit.doc
 uidoc = revit.uidoc
 view = doc.ActiveView  # Vista ativa
+output = script.get_output()
+
+# "Número" é o ROOM_NUMBER em qualquer idioma
+parametros = CacheParametros({"Número": (BuiltInParameter.ROOM_NUMBER, "Número")})
 
 # Coletar todos os ambientes do modelo
 rooms = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_Rooms).WhereElementIsNotElementType().ToElements()
 
 if not rooms:
     print("❌ Nenhum ambiente encontrado no projeto.")
-else:
-    # Coletar todos os níveis do modelo e organizar por elevação (do mais baixo para o mais alto)
-    levels = {lvl.Id: lvl for lvl in FilteredElementCollector(doc).OfClass(Level)}
-    sorted_levels = sorted(levels.values(), key=lambda lvl: lvl.Elevation)  # Ordenação por altura (Térreo primeiro)
-
-    # Criar um dicionário para armazenar os ambientes organizados por pavimento
-    rooms_by_level = {lvl.Name: [] for lvl in sorted_levels}
-
-    # Preencher o dicionário com os ambientes
-    for room in rooms:
-        level = room.Level
-        if level:
-            level_name = level.Name
-            centroid = room.Location.Point if room.Location else XYZ(0, 0, 0)
-            rooms_by_level[level_name].append((room, centroid))
-
-    # Ordenar os ambientes dentro de cada pavimento (Baixo para Cima, Esquerda para Direita)
-    for level_name in rooms_by_level:
-        rooms_by_level[level_name].sort(key=lambda x: (x[1].Y, x[1].X))  # Baixo para cima, Esquerda para Direita
-
-    # Criar uma transação para renomear os ambientes
-    trans = Transaction(doc, "Renumeração de Ambientes")
-    trans.Start()
-
-    try:
-        # Iniciar a contagem da numeração
-        room_numbering = 1
-
-        # Percorrer os pavimentos na ordem correta (Térreo para cima)
-        for level in sorted_levels:
-            level_name = level.Name
-            if level_name in rooms_by_level:
-                for room, _ in rooms_by_level[level_name]:
-                    param = room.LookupParameter("Número")
-                    if param:
-                        param.Set(str(room_numbering))
-                        room_numbering += 1
-
-        # Finaliza a transação corretamente
-        trans.Commit()
-        print("✅ Ambientes renumerados com sucesso!")
-
-    except Exception as e:
-        print("⚠ Erro durante a renumeração: {}".format(e))
-        trans.RollBack()  # Cancela a transação em caso de erro
+    raise SystemExit
+
+# Opções da numeração
+ordem = forms.alert(
+    "Como os ambientes de cada linha devem ser lidos?",
+    options=["Esquerda para direita", "Serpentina", "Cancelar"]
+)
+if ordem not in ("Esquerda para direita", "Serpentina"):
+    raise SystemExit
+
+modo = forms.alert(
+    "Como os ambientes devem ser numerados?",
+    options=["Contínua (1, 2, 3...)", "Por pavimento (101, 102...)", "Cancelar"]
+)
+if modo not in ("Contínua (1, 2, 3...)", "Por pavimento (101, 102...)"):
+    raise SystemExit
+
+tolerancia_str = forms.ask_for_string(
+    default="100",
+    title="Tolerância da Linha",
+    prompt="Ambientes com centros a até esta distância vertical ficam na mesma linha (em centímetros):"
+)
+if tolerancia_str is None:
+    raise SystemExit
+try:
+    tolerancia = float(tolerancia_str.replace(",", ".")) / CM_POR_PE
+except ValueError:
+    forms.alert("Valor inválido para a tolerância.", exitscript=True)
+
+# Coletar todos os níveis do modelo e organizar por elevação (do mais baixo para o mais alto)
+levels = {lvl.Id: lvl for lvl in FilteredElementCollector(doc).OfClass(Level)}
+sorted_levels = sorted(levels.values(), key=lambda lvl: lvl.Elevation)  # Ordenação por altura (Térreo primeiro)
+
+# Centros dos ambientes organizados por pavimento
+rooms_by_id = {}
+items_by_level = {lvl.Id: [] for lvl in sorted_levels}
+for room in rooms:
+    level = room.Level
+    if level and level.Id in items_by_level:
+        centroid = room.Location.Point if room.Location else XYZ(0, 0, 0)
+        rooms_by_id[room.Id.IntegerValue] = room
+        items_by_level[level.Id].append((room.Id.IntegerValue, centroid.X, centroid.Y))
+
+# Ordem de leitura por pavimento (Térreo para cima): linhas de baixo para cima
+grupos = []
+nomes_pavimentos = {}
+for level in sorted_levels:
+    if items_by_level[level.Id]:
+        chaves = ordenar_em_linhas(items_by_level[level.Id], tolerancia, ordem == "Serpentina")
+        grupos.append(chaves)
+        for chave in chaves:
+            nomes_pavimentos[chave] = level.Name
+
+novos = numerar(grupos, modo.startswith("Por pavimento"))
+
+atuais = {}
+for chave in novos:
+    param = parametros.obter(rooms_by_id[chave], "Número")
+    atuais[chave] = param.AsString() if param else None
+
+plano = plano_escrita(atuais, novos)
+if not plano:
+    print("✅ A numeração dos ambientes já está correta ({} ambientes).".format(len(novos)))
+    raise SystemExit
+
+# Prévia: antes e depois, só dos ambientes que mudam
+nomes = {}
+for chave, _, _ in plano:
+    param_nome = rooms_by_id[chave].get_Parameter(BuiltInParameter.ROOM_NAME)
+    nomes[chave] = param_nome.AsString() if param_nome else ""
+
+output.print_md("## Renumeração de ambientes")
+output.print_table(
+    table_data=[[nomes_pavimentos[chave], output.linkify(rooms_by_id[chave].Id), nomes[chave],
+                 atuais[chave] or "-", final]
+                for chave, _, final in plano],
+    columns=["Pavimento", "Ambiente", "Nome", "Número atual", "Novo número"]
+)
+
+confirmacao = forms.alert(
+    "{} de {} ambientes vão mudar de número.\nConfira a prévia antes de continuar.".format(len(plano), len(novos)),
+    options=["Renumerar", "Cancelar"]
+)
+if confirmacao != "Renumerar":
+    raise SystemExit
+
+# Criar uma transação para renomear os ambientes
+trans = Transaction(doc, "Renumeração de Ambientes")
+trans.Start()
+
+try:
+    # Fase 1: números temporários únicos nos ambientes que mudam, para não haver duplicados na troca
+    temporarios = EscritorParametros(parametros)
+    for chave, temporario, _ in plano:
+        temporarios.escrever(parametros.obter(rooms_by_id[chave], "Número"), temporario)
+
+    # Fase 2: números finais (só grava os que mudaram)
+    escritor = EscritorParametros(parametros)
+    for chave, final in novos.items():
+        escritor.escrever(parametros.obter(rooms_by_id[chave], "Número"), final)
+
+    # Finaliza a transação corretamente
+    trans.Commit()
+    print("✅ Ambientes renumerados com sucesso! ({})".format(escritor.resumo()))
+
+except Exception as e:
+    print("⚠ Erro durante a renumeração: {}".format(e))
+    trans.RollBack()  # Cancela a transação em caso de erro
@@ -8,14 +8,35 @@ from Autodesk.Revit.DB import *
 from RevitServices.Persistence import DocumentManager
 from RevitServices.Transactions import TransactionManager
 from pyrevit import revit
+from palhetaflow.contornos import obter_contornos
+from palhetaflow.instancias import EscritorParametros
+from palhetaflow.rotulos import polo_inacessibilidade
 
 # OBTER DOCUMENTO DO REVIT
 doc = revit.doc
 uidoc = revit.uidoc
 view = doc.ActiveView  # Vista ativa
 
+# PRECISO DA BUSCA DO CENTRO E DESLOCAMENTO MNIMO PARA MOVER (EM PS)
+PRECISAO_CENTRO = 2 / 30.48
+LIMIAR_MOVIMENTO = 5 / 30.48
+
 # FUNO PARA OBTER O CENTRO DO AMBIENTE
+# Ponto interno mais afastado das paredes (funciona em ambientes em L e em U);
+# sem contorno, usa o centro da caixa envolvente na vista
 def obter_centro_ambiente(room):
+    lacos = []
+    for laco in obter_contornos(room):
+        pontos = []
+        for segmento in laco:
+            pontos.append(segmento.inicio[:2])
+            if segmento.meio is not None:
+                pontos.append(segmento.meio[:2])
+        lacos.append(pontos)
+    polo = polo_inacessibilidade(lacos, PRECISAO_CENTRO)
+    if polo:
+        return XYZ(polo[0], polo[1], 0)  # O Z  mantido ao mover
+    
     bbox = room.BoundingBox[view]
     if bbox:
         centro_x = (bbox.Min.X + bbox.Max.X) / 2
@@ -42,22 +63,25 @@ def ajustar_posicao_ambiente_e_tag():
         t = Transaction(doc, "Ajustar posio dos ambientes e tags")
         t.Start()
         
+        # S MOVE O QUE EST A MAIS DE LIMIAR_MOVIMENTO DO CENTRO
+        escritor = EscritorParametros(tolerancia=LIMIAR_MOVIMENTO)
+        
         for room in rooms:
             centro = obter_centro_ambiente(room)
             if centro and isinstance(room.Location, LocationPoint):
-                room.Location.Point = centro  # Move o ponto de localizao
-                print("Ambiente '{}' ajustado para o centro.".format(room.get_Parameter(BuiltInParameter.ROOM_NAME).AsString()))
+                if escritor.mover(room, centro):  # Move o ponto de localizao
+                    print("Ambiente '{}' ajustado para o centro.".format(room.get_Parameter(BuiltInParameter.ROOM_NAME).AsString()))
             
             # AJUSTAR POSIO DA TAG SE EXISTIR
             room_id = room.Id.IntegerValue
-            if room_id in room_tags:
+            if centro and room_id in room_tags:
                 tag = room_tags[room_id]
-                tag.Location.Move(centro - tag.Location.Point)
-                print("Tag do ambiente '{}' ajustada para o centro.".format(room.get_Parameter(BuiltInParameter.ROOM_NAME).AsString()))
+                if escritor.mover(tag, centro):
+                    print("Tag do ambiente '{}' ajustada para o centro.".format(room.get_Parameter(BuiltInParameter.ROOM_NAME).AsString()))
         
         # FINALIZAR TRANSAO
         t.Commit()
-        print("Posio dos ambientes e tags ajustada com sucesso!")
+        print("Posio dos ambientes e tags ajustada com sucesso! ({})".format(escritor.resumo()))
     
     except Exception as e:
         print("Erro ao ajustar posio dos ambientes e tags: ", str(e))
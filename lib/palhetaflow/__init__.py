@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""Biblioteca compartilhada dos botões da extensão PALHETA FLOW.
+
+A pasta ``lib`` da extensão é adicionada ao ``sys.path`` pelo pyRevit, então
+os scripts importam os módulos com ``from palhetaflow import ...``.
+"""
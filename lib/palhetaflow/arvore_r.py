@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""R-tree estática montada por STR (Sort-Tile-Recursive) em Python puro.
+
+Os obstáculos são carregados de uma vez (sem inserções posteriores), o que
+permite empacotar os nós quase cheios e deixar as consultas rápidas mesmo com
+milhares de caixas. As caixas seguem o formato de ``indice_espacial``:
+``(min_x, min_y, min_z, max_x, max_y, max_z)``.
+"""
+import math
+
+from palhetaflow.indice_espacial import caixas_se_tocam, expandir_caixa
+
+
+def uniao_caixas(caixas):
+    """Menor caixa que contém todas as ``caixas``."""
+    caixas = list(caixas)
+    return (min(c[0] for c in caixas), min(c[1] for c in caixas), min(c[2] for c in caixas),
+            max(c[3] for c in caixas), max(c[4] for c in caixas), max(c[5] for c in caixas))
+
+
+def _centro(eixo):
+    return lambda entrada: entrada[0][eixo] + entrada[0][eixo + 3]
+
+
+def _empacotar_nivel(entradas, capacidade):
+    """Agrupa as entradas de um nível em nós usando fatias em X e depois em Y."""
+    total_nos = int(math.ceil(len(entradas) / float(capacidade)))
+    fatias = int(math.ceil(math.sqrt(total_nos)))
+    tamanho_fatia = fatias * capacidade
+
+    nos = []
+    entradas = sorted(entradas, key=_centro(0))
+    for inicio in range(0, len(entradas), tamanho_fatia):
+        fatia = sorted(entradas[inicio:inicio + tamanho_fatia], key=_centro(1))
+        for i in range(0, len(fatia), capacidade):
+            filhos = fatia[i:i + capacidade]
+            nos.append((uniao_caixas(e[0] for e in filhos), filhos, False))
+    return nos
+
+
+class ArvoreR(object):
+    """R-tree somente leitura para consultas de sobreposição de caixas."""
+
+    def __init__(self, itens, capacidade=16):
+        if capacidade < 2:
+            raise ValueError("A capacidade do nó deve ser pelo menos 2.")
+        # Folhas: (caixa, valor, True)
+        nivel = [(caixa, valor, True) for caixa, valor in itens]
+        self.total = len(nivel)
+        while len(nivel) > capacidade:
+            nivel = _empacotar_nivel(nivel, capacidade)
+        self.raiz = (uniao_caixas(e[0] for e in nivel), nivel, False) if nivel else None
+
+    def __len__(self):
+        return self.total
+
+    def consultar(self, caixa, tolerancia=0.0):
+        """Retorna os valores cujas caixas tocam ``caixa`` (com folga opcional)."""
+        if self.raiz is None:
+            return []
+        if tolerancia:
+            caixa = expandir_caixa(caixa, tolerancia)
+
+        resultado = []
+        pilha = [self.raiz]
+        while pilha:
+            caixa_no, filhos, _ = pilha.pop()
+            if not caixas_se_tocam(caixa, caixa_no):
+                continue
+            for filho in filhos:
+                if filho[2]:
+                    if caixas_se_tocam(caixa, filho[0]):
+                        resultado.append(filho[1])
+                else:
+                    pilha.append(filho)
+        return resultado
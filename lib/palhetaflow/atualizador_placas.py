@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""Atualizador (``IUpdater``) que mantém as placas das portas em dia.
+
+Opcional: é registrado pelo ``startup.py`` da extensão quando a opção está
+ligada (Shift+clique no botão "Nomes"). Dispara quando uma porta é inserida,
+espelhada, virada ou movida e quando o nome de um ambiente muda, e recalcula
+"TEXTO DA PLACA" e "INVERTER O TEXTO" só das portas afetadas, com as mesmas
+regras de ``palhetaflow.placas``.
+"""
+from System import Guid
+from Autodesk.Revit.DB import (BoundingBoxIntersectsFilter, BuiltInCategory, BuiltInParameter, ChangePriority,
+                               Element, ElementCategoryFilter, ElementId, FilteredElementCollector, IUpdater,
+                               Outline, UpdaterId, UpdaterRegistry, XYZ)
+
+from palhetaflow.instancias import EscritorParametros
+from palhetaflow.placas import atualizar_placas, cache_placas, fase_placas, portas_do_ambiente
+
+GUID_ATUALIZADOR = Guid("6f0b8a52-3c1e-4d8e-9a57-2f4b9c1d7e30")
+SECAO_CONFIG = "PALHETAFLOW_PLACAS"
+OPCAO_ATIVO = "atualizar_placas"
+
+# Folga em volta da caixa do ambiente para achar as portas das paredes dele
+FOLGA_PORTAS = 3.0
+
+
+def _portas_perto(doc, ambiente):
+    caixa = ambiente.get_BoundingBox(None)
+    if caixa is None:
+        return []
+    folga = XYZ(FOLGA_PORTAS, FOLGA_PORTAS, FOLGA_PORTAS)
+    filtro = BoundingBoxIntersectsFilter(Outline(caixa.Min - folga, caixa.Max + folga))
+    return FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_Doors) \
+        .WhereElementIsNotElementType().WherePasses(filtro).ToElements()
+
+
+class AtualizadorPlacas(IUpdater):
+
+    def __init__(self, id_addin):
+        self._id = UpdaterId(id_addin, GUID_ATUALIZADOR)
+
+    def Execute(self, dados):
+        # Um erro aqui não pode interromper a transação do usuário: a atualização
+        # desta transação é abandonada e as placas ficam como estavam
+        try:
+            self._atualizar(dados)
+        except Exception:
+            pass
+
+    def _atualizar(self, dados):
+        doc = dados.GetDocument()
+        fase = fase_placas(doc)
+        if fase is None:
+            return
+
+        id_portas = ElementId(BuiltInCategory.OST_Doors).IntegerValue
+        id_ambientes = ElementId(BuiltInCategory.OST_Rooms).IntegerValue
+        portas = {}
+        ids_ambientes = set()
+        for id_elemento in list(dados.GetAddedElementIds()) + list(dados.GetModifiedElementIds()):
+            elemento = doc.GetElement(id_elemento)
+            if elemento is None or elemento.Category is None:
+                continue
+            if elemento.Category.Id.IntegerValue == id_portas:
+                portas[id_elemento.IntegerValue] = elemento
+            elif elemento.Category.Id.IntegerValue == id_ambientes:
+                ids_ambientes.add(id_elemento.IntegerValue)
+
+        for id_ambiente in ids_ambientes:
+            ambiente = doc.GetElement(ElementId(id_ambiente))
+            for porta in portas_do_ambiente(_portas_perto(doc, ambiente), ids_ambientes, fase):
+                portas[porta.Id.IntegerValue] = porta
+
+        # Sem avisos de parâmetro ausente: o atualizador roda em segundo plano
+        parametros = cache_placas()
+        parametros.avisar = False
+        atualizar_placas(portas.values(), fase, EscritorParametros(parametros))
+
+    def GetUpdaterId(self):
+        return self._id
+
+    def GetUpdaterName(self):
+        return "PALHETA FLOW - Placas de portas"
+
+    def GetAdditionalInformation(self):
+        return "Atualiza TEXTO DA PLACA e INVERTER O TEXTO das portas afetadas."
+
+    def GetChangePriority(self):
+        return ChangePriority.DoorsOpeningsWindows
+
+
+def registrar(id_addin):
+    """Registra o atualizador e os gatilhos; retorna o ``UpdaterId``."""
+    atualizador = AtualizadorPlacas(id_addin)
+    id_atualizador = atualizador.GetUpdaterId()
+    if UpdaterRegistry.IsUpdaterRegistered(id_atualizador):
+        return id_atualizador
+
+    UpdaterRegistry.RegisterUpdater(atualizador, True)
+    filtro_portas = ElementCategoryFilter(BuiltInCategory.OST_Doors)
+    filtro_ambientes = ElementCategoryFilter(BuiltInCategory.OST_Rooms)
+    UpdaterRegistry.AddTrigger(id_atualizador, filtro_portas, Element.GetChangeTypeElementAddition())
+    UpdaterRegistry.AddTrigger(id_atualizador, filtro_portas, Element.GetChangeTypeGeometry())
+    UpdaterRegistry.AddTrigger(id_atualizador, filtro_ambientes,
+                               Element.GetChangeTypeParameter(ElementId(BuiltInParameter.ROOM_NAME)))
+    return id_atualizador
+
+
+def remover(id_addin):
+    """Remove o atualizador, se estiver registrado."""
+    id_atualizador = UpdaterId(id_addin, GUID_ATUALIZADOR)
+    if UpdaterRegistry.IsUpdaterRegistered(id_atualizador):
+        UpdaterRegistry.UnregisterUpdater(id_atualizador)
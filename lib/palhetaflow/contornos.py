@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Cache compartilhado dos contornos de ambientes (Room boundaries).
+
+Pisos, Forros, Revestimentos, Rodapé e Tomadas leem os mesmos contornos.
+Cada ambiente é extraído uma única vez com ``GetBoundarySegments`` e guardado
+como tuplas Python simples, indexadas pelo id do ambiente e por um token de
+alteração. O cache fica no AppDomain do Revit, então sobrevive entre os
+cliques dos botões na mesma sessão; entradas de ambientes alterados ou de
+documentos fechados são descartadas.
+"""
+from collections import namedtuple
+
+from pyrevit.coreutils import envvars
+
+CHAVE_CACHE = "PALHETAFLOW_CONTORNOS"
+
+# inicio/fim/meio são tuplas (x, y, z) em pés; ``meio`` só existe para arcos
+# (arco por três pontos) e é None para linhas retas.
+Segmento = namedtuple("Segmento", "inicio fim meio id_elemento")
+
+
+def _ponto(xyz):
+    return (xyz.X, xyz.Y, xyz.Z)
+
+
+def _chave_documento(doc):
+    return "{}|{}".format(doc.PathName or doc.Title, doc.GetHashCode())
+
+
+def _posicao(ambiente):
+    """Ponto de locação e caixa do ambiente, para notar quando ele é movido ou espelhado."""
+    valores = []
+    ponto = getattr(ambiente.Location, "Point", None)
+    if ponto is not None:
+        valores.extend(_ponto(ponto))
+    caixa = ambiente.get_BoundingBox(None)
+    if caixa is not None:
+        valores.extend(_ponto(caixa.Min) + _ponto(caixa.Max))
+    return "|".join("{:.6f}".format(v) for v in valores)
+
+
+def token_ambiente(ambiente):
+    """Muda sempre que o ambiente (ou as paredes que o delimitam) muda de forma ou de lugar.
+
+    ``VersionGuid`` só existe a partir do Revit 2024; antes dele, área e
+    perímetro não mudam quando o ambiente é movido ou espelhado, por isso o
+    token também leva o ponto de locação e a caixa.
+    """
+    versao = getattr(ambiente, "VersionGuid", None)
+    return "{}|{:.6f}|{:.6f}|{}".format(versao, ambiente.Area, ambiente.Perimeter, _posicao(ambiente))
+
+
+def converter_segmentos(segmentos_revit):
+    """Converte uma lista de ``BoundarySegment`` em ``Segmento``."""
+    from Autodesk.Revit.DB import Arc, Line
+
+    segmentos = []
+    for segmento in segmentos_revit:
+        curva = segmento.GetCurve()
+        id_elemento = segmento.ElementId.IntegerValue
+        if isinstance(curva, Line):
+            segmentos.append(Segmento(_ponto(curva.GetEndPoint(0)), _ponto(curva.GetEndPoint(1)), None, id_elemento))
+        elif isinstance(curva, Arc):
+            segmentos.append(Segmento(_ponto(curva.GetEndPoint(0)), _ponto(curva.GetEndPoint(1)),
+                                      _ponto(curva.Evaluate(0.5, True)), id_elemento))
+        else:
+            # Elipses e splines viram trechos retos
+            pontos = list(curva.Tessellate())
+            for i in range(len(pontos) - 1):
+                segmentos.append(Segmento(_ponto(pontos[i]), _ponto(pontos[i + 1]), None, id_elemento))
+    return segmentos
+
+
+def cache_do_documento(doc, chave_cache=CHAVE_CACHE):
+    """Dicionário do documento dentro do cache ``chave_cache`` guardado no AppDomain."""
+    cache = envvars.get_pyrevit_env_var(chave_cache)
+    if cache is None:
+        cache = {}
+        envvars.set_pyrevit_env_var(chave_cache, cache)
+
+    # Descarta os documentos que não estão mais abertos
+    abertos = set(_chave_documento(d) for d in doc.Application.Documents)
+    for chave in list(cache.keys()):
+        if chave not in abertos:
+            del cache[chave]
+
+    return cache.setdefault(_chave_documento(doc), {})
+
+
+def obter_contornos(ambiente):
+    """Contornos do ambiente: lista de laços, cada um uma lista de ``Segmento``."""
+    from Autodesk.Revit.DB import SpatialElementBoundaryOptions
+
+    cache = cache_do_documento(ambiente.Document)
+    token = token_ambiente(ambiente)
+    entrada = cache.get(ambiente.Id.IntegerValue)
+    if entrada and entrada[0] == token:
+        return entrada[1]
+
+    limites = ambiente.GetBoundarySegments(SpatialElementBoundaryOptions()) or []
+    lacos = [converter_segmentos(segmentos) for segmentos in limites]
+    cache[ambiente.Id.IntegerValue] = (token, lacos)
+    return lacos
+
+
+def limpar_cache(doc=None, chave_cache=CHAVE_CACHE):
+    """Esvazia o cache de um documento ou, sem argumento, de todos."""
+    cache = envvars.get_pyrevit_env_var(chave_cache)
+    if not cache:
+        return
+    if doc is None:
+        cache.clear()
+    else:
+        cache.pop(_chave_documento(doc), None)
+
+
+def curva_revit(segmento):
+    """Recria a curva do Revit (Line ou Arc) a partir de um ``Segmento``."""
+    from Autodesk.Revit.DB import Arc, Line, XYZ
+
+    inicio = XYZ(*segmento.inicio)
+    fim = XYZ(*segmento.fim)
+    if segmento.meio is None:
+        return Line.CreateBound(inicio, fim)
+    return Arc.Create(inicio, fim, XYZ(*segmento.meio))
+
+
+def criar_curve_loop(laco):
+    """Monta um ``CurveLoop`` a partir de um laço de ``Segmento``."""
+    from Autodesk.Revit.DB import CurveLoop
+
+    curva_loop = CurveLoop()
+    for segmento in laco:
+        curva_loop.Append(curva_revit(segmento))
+    return curva_loop
@@ -0,0 +1,554 @@
+# -*- coding: utf-8 -*-
+"""Deslocamento (offset) de laços fechados com retas e arcos, em Python puro.
+
+Os laços usam o mesmo formato de ``palhetaflow.contornos``: tuplas
+``(inicio, fim, meio, id_elemento)`` com pontos ``(x, y, z)`` em pés e ``meio``
+preenchido só nos arcos. Também aceita listas simples de pontos através de
+``deslocar_poligono``, para que a matemática possa ser testada e medida sem
+abrir o Revit.
+
+O deslocamento é sempre para a esquerda do sentido do laço: para dentro nos
+laços externos (anti-horários) e para fora dos pilares/ilhas (horários), que é
+o lado do ambiente nos dois casos. Etapas:
+
+1. cada trecho é deslocado isoladamente (reta transladada, arco com novo raio);
+2. vizinhos são aparados/estendidos até a interseção mais próxima do vértice
+   original (meia-esquadria), com chanfro quando o canto fica longe demais;
+3. trechos que se inverteram (lados curtos engolidos pelo deslocamento) são
+   removidos e os cantos recalculados, até o laço ficar estável;
+4. se o laço resultante se cruza ou se encosta (gargalos mais estreitos que o
+   dobro da distância), ele é dividido nas autointerseções e só os pedaços
+   com a orientação original e área não nula são mantidos.
+
+A medição de desempenho roda fora do Revit com
+``python -m palhetaflow.deslocamento_poligono [quantidade] [distancia]``.
+"""
+import math
+import sys
+
+JUNCAO_ESQUADRIA = "esquadria"
+JUNCAO_CHANFRO = "chanfro"
+JUNCAO_TOPO = "topo"
+
+TOLERANCIA = 1e-9
+# Limpeza das autointerseções (pés): cortes, distância das sondas ao trecho,
+# ligação das pontas e área mínima de um laço resultante
+TOLERANCIA_CORTE = 1e-7
+SONDA = 1e-5
+TOLERANCIA_LIGACAO = 1e-5
+AREA_MINIMA = 1e-6
+DOIS_PI = 2 * math.pi
+
+
+def _distancia(a, b):
+    return math.hypot(b[0] - a[0], b[1] - a[1])
+
+
+def circulo_por_tres_pontos(a, b, c):
+    """Centro e raio do círculo que passa por três pontos (None se colineares)."""
+    d = 2 * (a[0] * (b[1] - c[1]) + b[0] * (c[1] - a[1]) + c[0] * (a[1] - b[1]))
+    if abs(d) < TOLERANCIA:
+        return None
+    a2 = a[0] * a[0] + a[1] * a[1]
+    b2 = b[0] * b[0] + b[1] * b[1]
+    c2 = c[0] * c[0] + c[1] * c[1]
+    cx = (a2 * (b[1] - c[1]) + b2 * (c[1] - a[1]) + c2 * (a[1] - b[1])) / d
+    cy = (a2 * (c[0] - b[0]) + b2 * (a[0] - c[0]) + c2 * (b[0] - a[0])) / d
+    return (cx, cy), _distancia((cx, cy), a)
+
+
+class _Reta(object):
+    """Reta deslocada; o parâmetro é a distância a partir do início original."""
+
+    def __init__(self, origem, direcao, comprimento):
+        self.origem = origem
+        self.direcao = direcao
+        self.comprimento = comprimento
+
+    def ponto(self, t):
+        return (self.origem[0] + self.direcao[0] * t, self.origem[1] + self.direcao[1] * t)
+
+    def parametro(self, ponto):
+        return (ponto[0] - self.origem[0]) * self.direcao[0] + (ponto[1] - self.origem[1]) * self.direcao[1]
+
+    def meio(self, t0, t1):
+        return None
+
+
+class _Arco(object):
+    """Arco deslocado; o parâmetro é o ângulo percorrido a partir do início original."""
+
+    def __init__(self, centro, raio, angulo_inicial, sentido, varredura):
+        self.centro = centro
+        self.raio = raio
+        self.angulo_inicial = angulo_inicial
+        self.sentido = sentido  # 1 = anti-horário, -1 = horário
+        self.comprimento = varredura
+
+    def ponto(self, t):
+        angulo = self.angulo_inicial + self.sentido * t
+        return (self.centro[0] + self.raio * math.cos(angulo), self.centro[1] + self.raio * math.sin(angulo))
+
+    def parametro(self, ponto):
+        angulo = math.atan2(ponto[1] - self.centro[1], ponto[0] - self.centro[0])
+        t = ((angulo - self.angulo_inicial) * self.sentido) % DOIS_PI
+        # Ângulos "antes" do início ficam negativos (meio caminho da parte que falta)
+        if t > self.comprimento + (DOIS_PI - self.comprimento) / 2:
+            t -= DOIS_PI
+        return t
+
+    def meio(self, t0, t1):
+        return self.ponto((t0 + t1) / 2)
+
+
+class _Trecho(object):
+    """Trecho deslocado com os parâmetros atuais de início e fim."""
+
+    def __init__(self, curva, segmento):
+        self.curva = curva
+        self.segmento = segmento
+        self.t0 = 0.0
+        self.t1 = curva.comprimento
+
+    def reiniciar(self):
+        self.t0 = 0.0
+        self.t1 = self.curva.comprimento
+
+
+def _deslocar_segmento(segmento, distancia):
+    inicio, fim, meio = segmento[0], segmento[1], segmento[2]
+    if meio is not None:
+        circulo = circulo_por_tres_pontos(inicio, meio, fim)
+        if circulo is not None:
+            centro, raio = circulo
+            # Sentido do arco: sinal do produto vetorial (meio - inicio) x (fim - meio)
+            giro = (meio[0] - inicio[0]) * (fim[1] - meio[1]) - (meio[1] - inicio[1]) * (fim[0] - meio[0])
+            sentido = 1 if giro > 0 else -1
+            # À esquerda de um arco anti-horário fica o centro: o raio diminui
+            novo_raio = raio - sentido * distancia
+            if novo_raio <= TOLERANCIA:
+                return None
+            angulo_inicial = math.atan2(inicio[1] - centro[1], inicio[0] - centro[0])
+            angulo_final = math.atan2(fim[1] - centro[1], fim[0] - centro[0])
+            varredura = ((angulo_final - angulo_inicial) * sentido) % DOIS_PI
+            if varredura < TOLERANCIA:
+                varredura = DOIS_PI
+            return _Trecho(_Arco(centro, novo_raio, angulo_inicial, sentido, varredura), segmento)
+
+    comprimento = _distancia(inicio, fim)
+    if comprimento < TOLERANCIA:
+        return None
+    direcao = ((fim[0] - inicio[0]) / comprimento, (fim[1] - inicio[1]) / comprimento)
+    origem = (inicio[0] - direcao[1] * distancia, inicio[1] + direcao[0] * distancia)
+    return _Trecho(_Reta(origem, direcao, comprimento), segmento)
+
+
+def _intersecoes(curva1, curva2):
+    """Pontos de interseção entre as curvas completas (retas infinitas / círculos)."""
+    if isinstance(curva1, _Reta) and isinstance(curva2, _Reta):
+        denominador = curva1.direcao[0] * curva2.direcao[1] - curva1.direcao[1] * curva2.direcao[0]
+        if abs(denominador) < TOLERANCIA:
+            return []
+        dx = curva2.origem[0] - curva1.origem[0]
+        dy = curva2.origem[1] - curva1.origem[1]
+        t = (dx * curva2.direcao[1] - dy * curva2.direcao[0]) / denominador
+        return [curva1.ponto(t)]
+
+    if isinstance(curva1, _Arco) and isinstance(curva2, _Reta):
+        curva1, curva2 = curva2, curva1
+    if isinstance(curva1, _Reta):
+        # Reta x círculo: t^2 + 2bt + c = 0
+        ox = curva1.origem[0] - curva2.centro[0]
+        oy = curva1.origem[1] - curva2.centro[1]
+        b = ox * curva1.direcao[0] + oy * curva1.direcao[1]
+        c = ox * ox + oy * oy - curva2.raio * curva2.raio
+        discriminante = b * b - c
+        if discriminante < -TOLERANCIA:
+            return []
+        raiz = math.sqrt(max(discriminante, 0.0))
+        return [curva1.ponto(-b - raiz), curva1.ponto(-b + raiz)]
+
+    # Círculo x círculo
+    dx = curva2.centro[0] - curva1.centro[0]
+    dy = curva2.centro[1] - curva1.centro[1]
+    d = math.hypot(dx, dy)
+    if d < TOLERANCIA or d > curva1.raio + curva2.raio + TOLERANCIA \
+            or d < abs(curva1.raio - curva2.raio) - TOLERANCIA:
+        return []
+    a = (curva1.raio * curva1.raio - curva2.raio * curva2.raio + d * d) / (2 * d)
+    h = math.sqrt(max(curva1.raio * curva1.raio - a * a, 0.0))
+    px = curva1.centro[0] + a * dx / d
+    py = curva1.centro[1] + a * dy / d
+    return [(px - h * dy / d, py + h * dx / d), (px + h * dy / d, py - h * dx / d)]
+
+
+def _ajustar_canto(anterior, seguinte, juncao, limite):
+    """Apara/estende ``anterior`` e ``seguinte`` até o canto; retorna True se encontraram.
+
+    Aparar é sempre aceito (o canto fica entre os dois trechos); o limite de
+    meia-esquadria só vale quando algum trecho precisa ser estendido.
+    """
+    # Depois de remover trechos invertidos, os vizinhos não compartilham mais
+    # o vértice original: mede a partir do meio da lacuna e amplia o limite.
+    fim_anterior, inicio_seguinte = anterior.segmento[1], seguinte.segmento[0]
+    vertice = ((fim_anterior[0] + inicio_seguinte[0]) / 2, (fim_anterior[1] + inicio_seguinte[1]) / 2)
+    limite += _distancia(fim_anterior, inicio_seguinte) / 2
+    candidatos = _intersecoes(anterior.curva, seguinte.curva)
+    if not candidatos:
+        return False
+    canto = min(candidatos, key=lambda p: _distancia(p, vertice))
+
+    t1 = anterior.curva.parametro(canto)
+    t0 = seguinte.curva.parametro(canto)
+    estende = t1 > anterior.curva.comprimento + TOLERANCIA or t0 < -TOLERANCIA
+    if estende:
+        # Chanfro e topo não estendem; a meia-esquadria respeita o limite
+        if juncao != JUNCAO_ESQUADRIA or _distancia(canto, vertice) > limite:
+            return False
+    anterior.t1 = t1
+    seguinte.t0 = t0
+    return True
+
+
+def _resolver_cantos(trechos, juncao, limite):
+    cantos = []
+    for trecho in trechos:
+        trecho.reiniciar()
+    total = len(trechos)
+    for i in range(total):
+        cantos.append(_ajustar_canto(trechos[i], trechos[(i + 1) % total], juncao, limite))
+    return cantos
+
+
+def _area_assinada(pontos):
+    area = 0.0
+    for i in range(len(pontos)):
+        x1, y1 = pontos[i][0], pontos[i][1]
+        x2, y2 = pontos[(i + 1) % len(pontos)][0], pontos[(i + 1) % len(pontos)][1]
+        area += x1 * y2 - x2 * y1
+    return area / 2
+
+
+def _pontos_do_laco(laco):
+    pontos = []
+    for segmento in laco:
+        pontos.append(segmento[0])
+        if segmento[2] is not None:
+            pontos.append(segmento[2])
+    return pontos
+
+
+def _reta_entre(inicio, fim):
+    comprimento = _distancia(inicio, fim)
+    if comprimento < TOLERANCIA:
+        return None
+    direcao = ((fim[0] - inicio[0]) / comprimento, (fim[1] - inicio[1]) / comprimento)
+    return _Reta(inicio, direcao, comprimento)
+
+
+def _distancia_curva(curva, ponto):
+    if isinstance(curva, _Reta):
+        dx, dy = ponto[0] - curva.origem[0], ponto[1] - curva.origem[1]
+        return abs(dx * curva.direcao[1] - dy * curva.direcao[0])
+    return abs(_distancia(curva.centro, ponto) - curva.raio)
+
+
+def _tangente(curva, t):
+    if isinstance(curva, _Reta):
+        return curva.direcao
+    angulo = curva.angulo_inicial + curva.sentido * t
+    return (-curva.sentido * math.sin(angulo), curva.sentido * math.cos(angulo))
+
+
+def _caixa_peca(peca):
+    curva, t0, t1 = peca[0], peca[1], peca[2]
+    if isinstance(curva, _Reta):
+        a, b = curva.ponto(t0), curva.ponto(t1)
+        return (min(a[0], b[0]), min(a[1], b[1]), max(a[0], b[0]), max(a[1], b[1]))
+    # Pontas do arco mais os extremos do círculo (0°, 90°...) que ficam dentro dele
+    pontos = [curva.ponto(t0), curva.ponto(t1)]
+    for quarto in range(4):
+        angulo = quarto * math.pi / 2
+        extremo = (curva.centro[0] + curva.raio * math.cos(angulo), curva.centro[1] + curva.raio * math.sin(angulo))
+        if t0 <= curva.parametro(extremo) <= t1:
+            pontos.append(extremo)
+    xs, ys = [p[0] for p in pontos], [p[1] for p in pontos]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def _cortes(pecas):
+    """Parâmetros internos onde cada peça cruza ou toca outra (cruzamentos, "T" e sobreposições)."""
+    total = len(pecas)
+    cortes = [[] for _ in pecas]
+    caixas = [_caixa_peca(p) for p in pecas]
+    ordem = sorted(range(len(pecas)), key=lambda k: caixas[k][0])
+    for posicao, i in enumerate(ordem):
+        for j in ordem[posicao + 1:]:
+            if caixas[j][0] > caixas[i][2] + TOLERANCIA_CORTE:
+                break
+            if caixas[j][1] > caixas[i][3] + TOLERANCIA_CORTE or caixas[j][3] < caixas[i][1] - TOLERANCIA_CORTE:
+                continue
+            (ci, ai, bi), (cj, aj, bj) = pecas[i][:3], pecas[j][:3]
+            # Retas vizinhas no laço só se encontram no canto que dividem
+            if abs(i - j) in (1, total - 1) and isinstance(ci, _Reta) and isinstance(cj, _Reta):
+                continue
+            # Cruzamentos cortam as duas peças; pontas de uma sobre a outra (encostos
+            # em "T" e trechos sobrepostos) cortam só a outra
+            testes = [(ponto, ambas) for ponto in _intersecoes(ci, cj) for ambas in (i, j)]
+            testes += [(cj.ponto(aj), i), (cj.ponto(bj), i), (ci.ponto(ai), j), (ci.ponto(bi), j)]
+            for ponto, k in testes:
+                curva, t0, t1 = pecas[k][:3]
+                if _distancia_curva(curva, ponto) > TOLERANCIA_CORTE:
+                    continue
+                t = curva.parametro(ponto)
+                if t0 + TOLERANCIA_CORTE < t < t1 - TOLERANCIA_CORTE:
+                    outra, u0, u1 = pecas[j][:3] if k == i else pecas[i][:3]
+                    if (_distancia_curva(outra, ponto) <= TOLERANCIA_CORTE and
+                            u0 - TOLERANCIA_CORTE <= outra.parametro(ponto) <= u1 + TOLERANCIA_CORTE):
+                        cortes[k].append(t)
+    return cortes
+
+
+def _enrolamento(ponto, pecas):
+    """Número de voltas das peças em torno do ponto (raio horizontal para +x)."""
+    x, y = ponto
+    total = 0
+    for curva, t0, t1, _ in pecas:
+        if isinstance(curva, _Reta):
+            a, b = curva.ponto(t0), curva.ponto(t1)
+            lado = (b[0] - a[0]) * (y - a[1]) - (x - a[0]) * (b[1] - a[1])
+            if a[1] <= y < b[1] and lado > 0:
+                total += 1
+            elif b[1] <= y < a[1] and lado < 0:
+                total -= 1
+            continue
+        dy = y - curva.centro[1]
+        if abs(dy) >= curva.raio:
+            continue
+        dx = math.sqrt(curva.raio * curva.raio - dy * dy)
+        for px in (curva.centro[0] - dx, curva.centro[0] + dx):
+            if px <= x:
+                continue
+            t = curva.parametro((px, y))
+            if not t0 <= t < t1:
+                continue
+            subida = _tangente(curva, t)[1]
+            if subida > TOLERANCIA:
+                total += 1
+            elif subida < -TOLERANCIA:
+                total -= 1
+    return total
+
+
+def _separar_autointersecoes(pecas, sentido):
+    """Divide o laço bruto nas autointerseções e refaz os laços válidos.
+
+    ``pecas`` são ``(curva, t0, t1, id_elemento)`` na ordem do laço e
+    ``sentido`` é o sinal da área do laço original. Cada peça é cortada onde
+    cruza ou toca outra; só ficam as peças com a região do laço (número de
+    voltas no sentido original) do lado interno e fora dela do outro lado, e
+    elas são religadas pelas pontas. Retorna a lista de laços de peças, ou
+    None se não houver autointerseção.
+    """
+    cortes = _cortes(pecas)
+    if not any(cortes):
+        return None
+
+    divididas = []
+    for peca, ts in zip(pecas, cortes):
+        curva, t0, t1, id_elemento = peca
+        limites = [t0] + sorted(ts) + [t1]
+        for ta, tb in zip(limites, limites[1:]):
+            if tb - ta > TOLERANCIA_CORTE:
+                divididas.append((curva, ta, tb, id_elemento))
+
+    # Peças que sobram na borda da região; repetidas (trechos sobrepostos no mesmo sentido) entram uma vez
+    mantidas = []
+    vistas = set()
+    for peca in divididas:
+        curva, ta, tb, _ = peca
+        meio = curva.ponto((ta + tb) / 2)
+        tangente = _tangente(curva, (ta + tb) / 2)
+        normal = (-tangente[1] * SONDA, tangente[0] * SONDA)
+        esquerda = _enrolamento((meio[0] + normal[0], meio[1] + normal[1]), pecas) * sentido
+        direita = _enrolamento((meio[0] - normal[0], meio[1] - normal[1]), pecas) * sentido
+        if sentido < 0:
+            esquerda, direita = direita, esquerda
+        if esquerda <= 0 or direita > 0:
+            continue
+        inicio, fim = curva.ponto(ta), curva.ponto(tb)
+        chave = tuple(int(round(v / TOLERANCIA_CORTE)) for v in inicio + fim + meio)
+        if chave not in vistas:
+            vistas.add(chave)
+            mantidas.append(peca)
+
+    # Religa as peças pelas pontas
+    lacos = []
+    livres = list(mantidas)
+    while livres:
+        laco = [livres.pop(0)]
+        primeiro = laco[0][0].ponto(laco[0][1])
+        while True:
+            fim = laco[-1][0].ponto(laco[-1][2])
+            if len(laco) > 1 and _distancia(fim, primeiro) <= TOLERANCIA_LIGACAO:
+                break
+            proxima = None
+            for k, peca in enumerate(livres):
+                if _distancia(peca[0].ponto(peca[1]), fim) <= TOLERANCIA_LIGACAO:
+                    proxima = k
+                    break
+            if proxima is None:
+                break
+            laco.append(livres.pop(proxima))
+        lacos.append(_unir_colineares(laco))
+    return lacos
+
+
+def _unir_colineares(laco):
+    """Junta retas consecutivas na mesma direção (pedaços criados pelos cortes)."""
+    def continua(a, b):
+        return (isinstance(a[0], _Reta) and isinstance(b[0], _Reta) and
+                abs(a[0].direcao[0] * b[0].direcao[1] - a[0].direcao[1] * b[0].direcao[0]) < TOLERANCIA_CORTE and
+                a[0].direcao[0] * b[0].direcao[0] + a[0].direcao[1] * b[0].direcao[1] > 0)
+
+    def juntar(a, b):
+        reta = _reta_entre(a[0].ponto(a[1]), b[0].ponto(b[2]))
+        return (reta, 0.0, reta.comprimento, a[3])
+
+    unidas = []
+    for peca in laco:
+        if unidas and continua(unidas[-1], peca):
+            unidas[-1] = juntar(unidas[-1], peca)
+        else:
+            unidas.append(peca)
+    if len(unidas) > 2 and continua(unidas[-1], unidas[0]):
+        unidas[0] = juntar(unidas.pop(), unidas[0])
+    return unidas
+
+
+def deslocar_laco_em_lacos(laco, distancia, juncao=JUNCAO_ESQUADRIA, limite_esquadria=4.0,
+                           comprimento_minimo=0.0):
+    """Desloca um laço fechado de segmentos (retas e arcos) para a esquerda.
+
+    Retorna a lista de laços resultantes, cada um uma lista de segmentos
+    ``(inicio, fim, meio, id_elemento)``. Com ``JUNCAO_ESQUADRIA`` os vizinhos
+    são estendidos até se encontrarem; se o canto ficar a mais de
+    ``limite_esquadria`` vezes a distância do vértice original, vira chanfro
+    (trecho reto ligando as pontas). ``JUNCAO_CHANFRO`` nunca estende e
+    ``JUNCAO_TOPO`` também não cria o trecho de ligação. Quando o laço
+    deslocado se cruza (ex.: um corredor estreito entre duas salas), ele é
+    dividido nas autointerseções em vários laços, e os pedaços com a
+    orientação invertida ou área nula são descartados. Trechos mais curtos
+    que ``comprimento_minimo`` são descartados; laços que colapsam inteiros
+    não aparecem no resultado.
+    """
+    trechos = [_deslocar_segmento(s, distancia) for s in laco]
+    trechos = [t for t in trechos if t is not None]
+    if not trechos:
+        return []
+
+    limite = limite_esquadria * abs(distancia) + TOLERANCIA
+    cantos = [False] * len(trechos)
+    if len(trechos) > 1:
+        # Remove os trechos invertidos e recalcula os cantos até estabilizar
+        while True:
+            cantos = _resolver_cantos(trechos, juncao, limite)
+            invertidos = set(i for i, t in enumerate(trechos) if t.t1 - t.t0 <= TOLERANCIA)
+            if not invertidos:
+                break
+            trechos = [t for i, t in enumerate(trechos) if i not in invertidos]
+            if len(trechos) < 2:
+                return []
+
+    # Laço bruto: trechos aparados e chanfros que ligam as pontas dos vizinhos que não se encontraram
+    pecas = []
+    total = len(trechos)
+    for i, trecho in enumerate(trechos):
+        id_elemento = trecho.segmento[3] if len(trecho.segmento) > 3 else None
+        pecas.append((trecho.curva, trecho.t0, trecho.t1, id_elemento))
+        if total > 1 and not cantos[i] and juncao != JUNCAO_TOPO:
+            seguinte = trechos[(i + 1) % total]
+            chanfro = _reta_entre(trecho.curva.ponto(trecho.t1), seguinte.curva.ponto(seguinte.t0))
+            if chanfro is not None:
+                pecas.append((chanfro, 0.0, chanfro.comprimento, id_elemento))
+
+    area_original = _area_assinada(_pontos_do_laco(laco))
+    if abs(area_original) <= AREA_MINIMA:
+        return []
+    sentido = 1 if area_original > 0 else -1
+    lacos_pecas = _separar_autointersecoes(pecas, sentido) if len(pecas) > 2 else None
+    if lacos_pecas is None:
+        lacos_pecas = [pecas]
+
+    z = laco[0][0][2] if len(laco[0][0]) > 2 else 0.0
+    resultado = []
+    for pecas_laco in lacos_pecas:
+        segmentos = []
+        for curva, t0, t1, id_elemento in pecas_laco:
+            inicio = curva.ponto(t0)
+            fim = curva.ponto(t1)
+            meio = curva.meio(t0, t1)
+            if _distancia(inicio, fim) >= comprimento_minimo or (meio and _distancia(inicio, meio) >= comprimento_minimo):
+                segmentos.append(((inicio[0], inicio[1], z), (fim[0], fim[1], z),
+                                  (meio[0], meio[1], z) if meio else None, id_elemento))
+        # Um laço que troca de orientação (ou fica sem área) foi engolido pelo deslocamento
+        area_nova = _area_assinada(_pontos_do_laco(segmentos)) if segmentos else 0.0
+        if area_nova * sentido > AREA_MINIMA:
+            resultado.append(segmentos)
+    return resultado
+
+
+def deslocar_laco(laco, distancia, juncao=JUNCAO_ESQUADRIA, limite_esquadria=4.0, comprimento_minimo=0.0):
+    """Como ``deslocar_laco_em_lacos``, com os segmentos de todos os laços numa lista só.
+
+    Serve para quem só precisa dos trechos (ex.: eixos de paredes de acabamento).
+    """
+    segmentos = []
+    for resultado in deslocar_laco_em_lacos(laco, distancia, juncao, limite_esquadria, comprimento_minimo):
+        segmentos.extend(resultado)
+    return segmentos
+
+
+def deslocar_poligono(pontos, distancia, juncao=JUNCAO_ESQUADRIA, limite_esquadria=4.0):
+    """Versão para listas simples de pontos ``(x, y)`` (polígono fechado só com retas).
+
+    Retorna uma lista de polígonos, já que o deslocamento pode dividir o original.
+    """
+    total = len(pontos)
+    laco = [((pontos[i][0], pontos[i][1], 0.0), (pontos[(i + 1) % total][0], pontos[(i + 1) % total][1], 0.0), None, i)
+            for i in range(total)]
+    return [[(s[0][0], s[0][1]) for s in resultado]
+            for resultado in deslocar_laco_em_lacos(laco, distancia, juncao, limite_esquadria)]
+
+
+def _poligono_teste(indice):
+    """Ambiente sintético para a medição: retângulo com um recorte em L e um arco."""
+    x0 = (indice % 100) * 40.0
+    y0 = (indice // 100) * 40.0
+    pontos = [(x0, y0), (x0 + 20, y0), (x0 + 20, y0 + 8), (x0 + 12, y0 + 8), (x0 + 12, y0 + 16), (x0, y0 + 16)]
+    laco = [((a[0], a[1], 0.0), (b[0], b[1], 0.0), None, k)
+            for k, (a, b) in enumerate(zip(pontos, pontos[1:] + pontos[:1]))]
+    # Troca a parede do fundo por um arco
+    laco[-1] = (laco[-1][0], laco[-1][1], (x0 - 2, y0 + 8, 0.0), laco[-1][3])
+    return laco
+
+
+def main(argumentos=None):
+    """Mede o deslocamento de ``quantidade`` ambientes sintéticos (padrão 10000).
+
+        python -m palhetaflow.deslocamento_poligono [quantidade] [distancia]
+    """
+    import time
+
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    quantidade = int(argumentos[0]) if argumentos else 10000
+    distancia = float(argumentos[1]) if len(argumentos) > 1 else 0.1
+    lacos = [_poligono_teste(i) for i in range(quantidade)]
+    inicio = time.time()
+    total = sum(len(deslocar_laco_em_lacos(laco, distancia)) for laco in lacos)
+    print("{} laços deslocados ({} resultantes) em {:.2f} s".format(quantidade, total, time.time() - inicio))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""Dados dos forros (Ceilings) sem extrair a geometria sólida.
+
+O contorno em planta vem do esboço do forro (ou da caixa envolvente,
+quando o esboço não está acessível); área, deslocamento e nível vêm dos
+``BuiltInParameter``, que funcionam em qualquer idioma do Revit. O resultado
+fica no mesmo cache de AppDomain usado pelos contornos de ambientes, indexado
+pelo id do forro e por um token de alteração.
+"""
+from collections import namedtuple
+
+from palhetaflow.contornos import cache_do_documento
+
+CHAVE_CACHE = "PALHETAFLOW_FORROS"
+
+# area em pés², deslocamento (altura acima do nível) em pés, caixa como
+# (minx, miny, minz, maxx, maxy, maxz) e contorno como lista de laços (x, y).
+InfoForro = namedtuple("InfoForro", "id_forro id_nivel area deslocamento caixa contorno")
+
+
+def _valor_double(elemento, parametro_id):
+    param = elemento.get_Parameter(parametro_id)
+    if param and param.HasValue:
+        return param.AsDouble()
+    return 0.0
+
+
+def token_forro(forro):
+    """Muda sempre que o forro é editado."""
+    versao = getattr(forro, "VersionGuid", None)
+    if versao is not None:
+        return str(versao)
+    caixa = forro.get_BoundingBox(None)
+    if caixa is None:
+        return None
+    return "{:.6f}|{:.6f}|{:.6f}|{:.6f}|{:.6f}".format(
+        caixa.Min.X, caixa.Min.Y, caixa.Max.X, caixa.Max.Y, caixa.Min.Z)
+
+
+def _mesmo_ponto(a, b, tolerancia):
+    return abs(a[0] - b[0]) <= tolerancia and abs(a[1] - b[1]) <= tolerancia
+
+
+def encadear_polilinhas(polilinhas, tolerancia=1e-3):
+    """Junta as polilinhas ``[(x, y), ...]`` de um laço pelas pontas, ou None se não fechar.
+
+    As curvas de um ``CurveArray`` do esboço não vêm necessariamente em
+    sequência nem no mesmo sentido: cada próxima é a que começa (ou, invertida,
+    termina) onde a anterior acabou. O último ponto de cada polilinha é o
+    primeiro da seguinte e não se repete; o laço precisa voltar ao ponto
+    inicial dentro da ``tolerancia``.
+    """
+    restantes = [list(polilinha) for polilinha in polilinhas if len(polilinha) >= 2]
+    if not restantes:
+        return None
+    atual = restantes.pop(0)
+    inicio = atual[0]
+    laco = atual[:-1]
+    fim = atual[-1]
+    while restantes:
+        for i, polilinha in enumerate(restantes):
+            if _mesmo_ponto(polilinha[0], fim, tolerancia):
+                break
+            if _mesmo_ponto(polilinha[-1], fim, tolerancia):
+                polilinha.reverse()
+                break
+        else:
+            return None
+        polilinha = restantes.pop(i)
+        laco.extend(polilinha[:-1])
+        fim = polilinha[-1]
+    if not _mesmo_ponto(fim, inicio, tolerancia):
+        return None
+    return laco
+
+
+def contorno_do_esboco(elemento):
+    """Laços de pontos XY do esboço de um forro ou piso, ou None se não houver esboço.
+
+    Também retorna None se algum laço do esboço não fechar; quem chama usa a
+    caixa envolvente nesse caso.
+    """
+    sketch_id = getattr(elemento, "SketchId", None)
+    sketch = elemento.Document.GetElement(sketch_id) if sketch_id else None
+    if sketch is None:
+        return None
+    lacos = []
+    for curvas in sketch.Profile:
+        polilinhas = [[(p.X, p.Y) for p in curva.Tessellate()] for curva in curvas]
+        laco = encadear_polilinhas(polilinhas)
+        if laco is None:
+            print("⚠ Esboço do elemento {} com laço aberto; usando a caixa envolvente.".format(elemento.Id.IntegerValue))
+            return None
+        if len(laco) >= 3:
+            lacos.append(laco)
+    return lacos or None
+
+
+def extrair_info_forro(forro):
+    """Lê os dados do forro diretamente do Revit (sem cache)."""
+    from Autodesk.Revit.DB import BuiltInParameter
+
+    bbox = forro.get_BoundingBox(None)
+    if bbox is None:
+        return None
+    caixa = (bbox.Min.X, bbox.Min.Y, bbox.Min.Z, bbox.Max.X, bbox.Max.Y, bbox.Max.Z)
+
+    contorno = contorno_do_esboco(forro)
+    if not contorno:
+        # Versões sem esboço acessível: retângulo da caixa envolvente
+        contorno = [[(caixa[0], caixa[1]), (caixa[3], caixa[1]), (caixa[3], caixa[4]), (caixa[0], caixa[4])]]
+
+    param_nivel = forro.get_Parameter(BuiltInParameter.LEVEL_PARAM)
+    id_nivel = param_nivel.AsElementId().IntegerValue if param_nivel and param_nivel.HasValue else forro.LevelId.IntegerValue
+
+    return InfoForro(
+        forro.Id.IntegerValue,
+        id_nivel,
+        _valor_double(forro, BuiltInParameter.HOST_AREA_COMPUTED),
+        _valor_double(forro, BuiltInParameter.CEILING_HEIGHTABOVELEVEL_PARAM),
+        caixa,
+        contorno,
+    )
+
+
+def obter_info_forro(forro):
+    """``InfoForro`` do forro, reaproveitando o cache enquanto ele não mudar."""
+    cache = cache_do_documento(forro.Document, CHAVE_CACHE)
+    token = token_forro(forro)
+    entrada = cache.get(forro.Id.IntegerValue)
+    if entrada and token is not None and entrada[0] == token:
+        return entrada[1]
+
+    info = extrair_info_forro(forro)
+    cache[forro.Id.IntegerValue] = (token, info)
+    return info
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Funções de geometria plana (XY) em Python puro.
+
+Pontos e vetores são tuplas ``(x, y)`` em pés, para que os cálculos possam
+ser feitos e medidos fora do Revit.
+"""
+import math
+
+
+def subtrair(a, b):
+    return (a[0] - b[0], a[1] - b[1])
+
+
+def somar(a, b):
+    return (a[0] + b[0], a[1] + b[1])
+
+
+def escalar(v, fator):
+    return (v[0] * fator, v[1] * fator)
+
+
+def produto_escalar(a, b):
+    return a[0] * b[0] + a[1] * b[1]
+
+
+def produto_vetorial(a, b):
+    return a[0] * b[1] - a[1] * b[0]
+
+
+def comprimento(v):
+    return math.hypot(v[0], v[1])
+
+
+def normalizar(v):
+    tamanho = comprimento(v)
+    if tamanho == 0:
+        return (0.0, 0.0)
+    return (v[0] / tamanho, v[1] / tamanho)
+
+
+def distancia(a, b):
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+def ponto_mais_proximo_segmento(ponto, a, b):
+    """Ponto do segmento ``a-b`` mais próximo de ``ponto`` e o parâmetro t em [0, 1]."""
+    ab = subtrair(b, a)
+    tamanho2 = produto_escalar(ab, ab)
+    if tamanho2 == 0:
+        return a, 0.0
+    t = max(0.0, min(1.0, produto_escalar(subtrair(ponto, a), ab) / tamanho2))
+    return somar(a, escalar(ab, t)), t
+
+
+def distancia_ponto_segmento(ponto, a, b):
+    """Distância exata entre um ponto e o segmento ``a-b``."""
+    mais_proximo, _ = ponto_mais_proximo_segmento(ponto, a, b)
+    return distancia(ponto, mais_proximo)
+
+
+def avanco_ate_face(ponto, direcao, a, b, meia_espessura, tolerancia=0.0):
+    """Quanto ``ponto`` precisa andar ao longo de ``direcao`` para encostar na face do segmento.
+
+    O segmento ``a-b`` é o eixo de uma parede com espessura ``2 * meia_espessura``.
+    Retorna o avanço (negativo = sentido oposto a ``direcao``) até a face mais
+    próxima, ou None se a direção for paralela à parede ou se o ponto de
+    contato cair fora do comprimento do segmento (com ``tolerancia``).
+    """
+    eixo = normalizar(subtrair(b, a))
+    normal = (-eixo[1], eixo[0])
+    aproximacao = produto_escalar(direcao, normal)
+    if abs(aproximacao) < 1e-9:
+        return None
+
+    afastamento = produto_escalar(subtrair(ponto, a), normal)
+    face = meia_espessura if afastamento >= 0 else -meia_espessura
+    avanco = (face - afastamento) / aproximacao
+
+    contato = somar(ponto, escalar(direcao, avanco))
+    posicao = produto_escalar(subtrair(contato, a), eixo)
+    if posicao < -tolerancia or posicao > distancia(a, b) + tolerancia:
+        return None
+    return avanco
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""Cálculo ponto a ponto de iluminância sobre o plano de trabalho.
+
+Cada luminária é tratada como fonte pontual: ``E = I(gama) * cos(gama) / d²``,
+onde ``gama`` é o ângulo a partir da vertical (nadir). Sem tabela de
+intensidade, a luminária é lambertiana (``I = fluxo / pi * cos(gama)``); com
+tabela, ``curva`` é uma lista ``[(angulo_graus, candelas_por_1000_lm), ...]``
+no estilo dos arquivos IES (distribuição simétrica).
+
+Coordenadas em pés, como no Revit; o resultado sai em lux. Os pontos de cada
+ambiente são calculados em lote (com numpy quando estiver instalado) e o
+módulo roda fora do Revit sobre uma lista exportada:
+
+    python -m palhetaflow.iluminancia luminarias.json
+"""
+import json
+import math
+import sys
+from collections import namedtuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from palhetaflow.geometria2d import distancia_ponto_segmento
+from palhetaflow.layout_luminarias import IndicePoligono, area_poligono
+
+M2_POR_PE2 = 0.09290304
+PE_POR_M = 1 / 0.3048
+
+ALTURA_PLANO_TRABALHO = 0.75 * PE_POR_M
+ESPACAMENTO_MALHA = 0.5 * PE_POR_M
+AFASTAMENTO_PAREDES = 0.5 * PE_POR_M
+FATOR_MANUTENCAO = 0.8
+MAXIMO_PONTOS = 400
+
+# x, y, z em pés (z absoluto), fluxo em lúmens, curva opcional
+Luminaria = namedtuple("Luminaria", "x y z fluxo curva")
+# lacos: lista de laços (x, y); z_plano: cota absoluta do plano de trabalho
+Ambiente = namedtuple("Ambiente", "id nome lacos z_plano luminarias")
+ResultadoIluminancia = namedtuple("ResultadoIluminancia", "media minima maxima uniformidade pontos")
+
+
+def intensidade(curva, angulo, fluxo):
+    """Intensidade (cd) na direção ``angulo`` (graus a partir do nadir)."""
+    if curva is None:
+        if angulo >= 90:
+            return 0.0
+        return fluxo / math.pi * math.cos(math.radians(angulo))
+    if angulo <= curva[0][0]:
+        return curva[0][1] * fluxo / 1000.0
+    for (a0, v0), (a1, v1) in zip(curva, curva[1:]):
+        if angulo <= a1:
+            fator = (angulo - a0) / (a1 - a0) if a1 != a0 else 0.0
+            return (v0 + (v1 - v0) * fator) * fluxo / 1000.0
+    return curva[-1][1] * fluxo / 1000.0
+
+
+def iluminancia_ponto(ponto, z_plano, luminarias):
+    """Iluminância horizontal (lux) em ``ponto`` (x, y) na cota ``z_plano``."""
+    total = 0.0
+    for luminaria in luminarias:
+        altura = luminaria.z - z_plano
+        if altura <= 0:
+            continue
+        d2 = (luminaria.x - ponto[0]) ** 2 + (luminaria.y - ponto[1]) ** 2 + altura * altura
+        d = math.sqrt(d2)
+        cosseno = altura / d
+        angulo = math.degrees(math.acos(min(1.0, cosseno)))
+        total += intensidade(luminaria.curva, angulo, luminaria.fluxo) * cosseno / (d2 * M2_POR_PE2)
+    return total
+
+
+def _iluminancias_numpy(pontos, z_plano, luminarias):
+    xs = numpy.array([p[0] for p in pontos])[:, None]
+    ys = numpy.array([p[1] for p in pontos])[:, None]
+    total = numpy.zeros(len(pontos))
+
+    # Luminárias com a mesma curva são calculadas juntas
+    grupos = {}
+    for luminaria in luminarias:
+        if luminaria.z > z_plano:
+            chave = tuple(map(tuple, luminaria.curva)) if luminaria.curva is not None else None
+            grupos.setdefault(chave, []).append(luminaria)
+
+    for curva, grupo in grupos.items():
+        lx = numpy.array([l.x for l in grupo])[None, :]
+        ly = numpy.array([l.y for l in grupo])[None, :]
+        altura = numpy.array([l.z - z_plano for l in grupo])[None, :]
+        fluxo = numpy.array([l.fluxo for l in grupo])[None, :]
+        d2 = (lx - xs) ** 2 + (ly - ys) ** 2 + altura ** 2
+        cosseno = altura / numpy.sqrt(d2)
+        if curva is None:
+            i = fluxo / math.pi * cosseno
+        else:
+            angulos = numpy.degrees(numpy.arccos(numpy.clip(cosseno, -1.0, 1.0)))
+            i = numpy.interp(angulos, [c[0] for c in curva], [c[1] for c in curva]) * fluxo / 1000.0
+        total += (i * cosseno / (d2 * M2_POR_PE2)).sum(axis=1)
+    return list(total)
+
+
+def malha_calculo(lacos, espacamento=ESPACAMENTO_MALHA, afastamento=AFASTAMENTO_PAREDES, maximo=MAXIMO_PONTOS):
+    """Pontos da malha de cálculo dentro do ambiente, afastados das paredes.
+
+    O espaçamento aumenta se a malha passar de ``maximo`` pontos; ambientes
+    estreitos demais para o afastamento recebem ao menos o ponto central da
+    malha sem afastamento.
+    """
+    area = area_poligono(lacos)
+    if area <= 0:
+        return []
+    espacamento = max(espacamento, math.sqrt(area / float(maximo)))
+    indice = IndicePoligono(lacos)
+    arestas = [(laco[i], laco[(i + 1) % len(laco)]) for laco in lacos for i in range(len(laco))]
+    xs = [p[0] for laco in lacos for p in laco]
+    ys = [p[1] for laco in lacos for p in laco]
+
+    colunas = max(1, int((max(xs) - min(xs)) / espacamento))
+    linhas = max(1, int((max(ys) - min(ys)) / espacamento))
+    x0 = min(xs) + ((max(xs) - min(xs)) - (colunas - 1) * espacamento) / 2
+    y0 = min(ys) + ((max(ys) - min(ys)) - (linhas - 1) * espacamento) / 2
+
+    dentro = [(x0 + j * espacamento, y0 + i * espacamento) for i in range(linhas) for j in range(colunas)]
+    dentro = [p for p in dentro if indice.contem(p)]
+    afastados = [p for p in dentro
+                 if all(distancia_ponto_segmento(p, a, b) >= afastamento for a, b in arestas)]
+    return afastados or dentro
+
+
+def calcular_ambiente(ambiente, fator_manutencao=FATOR_MANUTENCAO, espacamento=ESPACAMENTO_MALHA,
+                      afastamento=AFASTAMENTO_PAREDES, usar_numpy=True):
+    """Iluminância média, mínima, máxima e uniformidade (mín/méd) de um ambiente."""
+    pontos = malha_calculo(ambiente.lacos, espacamento, afastamento)
+    if not pontos:
+        return None
+    if usar_numpy and numpy is not None and ambiente.luminarias:
+        valores = _iluminancias_numpy(pontos, ambiente.z_plano, ambiente.luminarias)
+    else:
+        valores = [iluminancia_ponto(p, ambiente.z_plano, ambiente.luminarias) for p in pontos]
+    valores = [v * fator_manutencao for v in valores]
+    media = sum(valores) / len(valores)
+    minima = min(valores)
+    return ResultadoIluminancia(media, minima, max(valores), minima / media if media > 0 else 0.0, len(pontos))
+
+
+def calcular_projeto(ambientes, fator_manutencao=FATOR_MANUTENCAO, **opcoes):
+    """Lista ``(ambiente, resultado)`` para todos os ambientes."""
+    return [(ambiente, calcular_ambiente(ambiente, fator_manutencao, **opcoes)) for ambiente in ambientes]
+
+
+def salvar_exportacao(caminho, ambientes):
+    """Grava os ambientes e luminárias em JSON para o cálculo fora do Revit."""
+    dados = [{
+        "id": a.id,
+        "nome": a.nome,
+        "lacos": a.lacos,
+        "z_plano": a.z_plano,
+        "luminarias": [l._asdict() for l in a.luminarias],
+    } for a in ambientes]
+    with open(caminho, "w") as arquivo:
+        json.dump({"ambientes": dados}, arquivo)
+
+
+def carregar_exportacao(caminho):
+    """Lê o JSON gravado por ``salvar_exportacao``."""
+    with open(caminho) as arquivo:
+        dados = json.load(arquivo)
+    ambientes = []
+    for a in dados.get("ambientes", []):
+        luminarias = [Luminaria(l["x"], l["y"], l["z"], l["fluxo"], l.get("curva")) for l in a.get("luminarias", [])]
+        lacos = [[tuple(p) for p in laco] for laco in a["lacos"]]
+        ambientes.append(Ambiente(a["id"], a.get("nome", ""), lacos, a["z_plano"], luminarias))
+    return ambientes
+
+
+def main(argumentos=None):
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    if not argumentos:
+        print("Uso: python -m palhetaflow.iluminancia <arquivo.json> [fator_manutencao]")
+        return 1
+    fator = float(argumentos[1]) if len(argumentos) > 1 else FATOR_MANUTENCAO
+    for ambiente, resultado in calcular_projeto(carregar_exportacao(argumentos[0]), fator):
+        if resultado is None:
+            continue
+        print("{}\t{}\t{:.0f}\t{:.0f}\t{:.2f}".format(
+            ambiente.id, ambiente.nome, resultado.media, resultado.minima, resultado.uniformidade))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""Índice espacial em Python puro para consultas de caixas (bounding boxes).
+
+As caixas são tuplas simples ``(min_x, min_y, min_z, max_x, max_y, max_z)``
+para que o índice funcione fora do Revit e possa ser medido em modelos
+sintéticos. Compatível com IronPython 2.
+"""
+import math
+
+from palhetaflow.geometria2d import distancia_ponto_segmento
+
+
+def caixa_do_elemento(elemento, vista=None):
+    """Lê o BoundingBoxXYZ do elemento uma única vez e devolve uma tupla."""
+    bbox = elemento.get_BoundingBox(vista)
+    if bbox is None:
+        return None
+    return (bbox.Min.X, bbox.Min.Y, bbox.Min.Z,
+            bbox.Max.X, bbox.Max.Y, bbox.Max.Z)
+
+
+def caixas_se_tocam(caixa1, caixa2, tolerancia=0.0):
+    """Verifica se duas caixas se sobrepõem ou se tocam (com folga opcional)."""
+    return (caixa1[0] - tolerancia <= caixa2[3] and caixa1[3] + tolerancia >= caixa2[0] and
+            caixa1[1] - tolerancia <= caixa2[4] and caixa1[4] + tolerancia >= caixa2[1] and
+            caixa1[2] - tolerancia <= caixa2[5] and caixa1[5] + tolerancia >= caixa2[2])
+
+
+def expandir_caixa(caixa, folga):
+    """Devolve a caixa aumentada em ``folga`` para todos os lados."""
+    return (caixa[0] - folga, caixa[1] - folga, caixa[2] - folga,
+            caixa[3] + folga, caixa[4] + folga, caixa[5] + folga)
+
+
+def tamanho_celula_sugerido(caixas, minimo=1.0):
+    """Usa a mediana da maior dimensão das caixas como tamanho da célula."""
+    dimensoes = sorted(max(c[3] - c[0], c[4] - c[1], c[5] - c[2]) for c in caixas)
+    if not dimensoes:
+        return minimo
+    return max(minimo, dimensoes[len(dimensoes) // 2])
+
+
+class GradeUniforme(object):
+    """Grade uniforme 3D que guarda cada caixa em todas as células que ela ocupa.
+
+    ``pares()`` substitui o laço O(n²) de comparação de caixas: só são testados
+    os elementos que dividem alguma célula, e cada par é reportado uma única vez.
+    """
+
+    def __init__(self, tamanho_celula):
+        if tamanho_celula <= 0:
+            raise ValueError("O tamanho da célula deve ser positivo.")
+        self.tamanho_celula = float(tamanho_celula)
+        self.celulas = {}
+        self.caixas = {}
+
+    def __len__(self):
+        return len(self.caixas)
+
+    def _indice(self, valor):
+        return int(math.floor(valor / self.tamanho_celula))
+
+    def _faixa(self, caixa):
+        return (self._indice(caixa[0]), self._indice(caixa[1]), self._indice(caixa[2]),
+                self._indice(caixa[3]), self._indice(caixa[4]), self._indice(caixa[5]))
+
+    def _celulas_da_caixa(self, caixa):
+        i0, j0, k0, i1, j1, k1 = self._faixa(caixa)
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                for k in range(k0, k1 + 1):
+                    yield (i, j, k)
+
+    def inserir(self, chave, caixa):
+        """Adiciona uma caixa identificada por ``chave`` ao índice."""
+        self.caixas[chave] = caixa
+        for celula in self._celulas_da_caixa(caixa):
+            self.celulas.setdefault(celula, []).append(chave)
+
+    def consultar(self, caixa, tolerancia=0.0):
+        """Retorna as chaves cujas caixas tocam ``caixa`` (com folga opcional)."""
+        if tolerancia:
+            caixa = expandir_caixa(caixa, tolerancia)
+        encontrados = set()
+        resultado = []
+        for celula in self._celulas_da_caixa(caixa):
+            for chave in self.celulas.get(celula, ()):
+                if chave in encontrados:
+                    continue
+                encontrados.add(chave)
+                if caixas_se_tocam(caixa, self.caixas[chave]):
+                    resultado.append(chave)
+        return resultado
+
+    def pares(self):
+        """Gera os pares ``(chave_a, chave_b)`` de caixas que se tocam.
+
+        O par só é reportado na célula que contém o canto mínimo da interseção
+        das duas caixas, o que evita duplicatas sem precisar de um conjunto.
+        """
+        for celula, chaves in self.celulas.items():
+            total = len(chaves)
+            for a in range(total):
+                caixa_a = self.caixas[chaves[a]]
+                for b in range(a + 1, total):
+                    caixa_b = self.caixas[chaves[b]]
+                    if not caixas_se_tocam(caixa_a, caixa_b):
+                        continue
+                    canto = (self._indice(max(caixa_a[0], caixa_b[0])),
+                             self._indice(max(caixa_a[1], caixa_b[1])),
+                             self._indice(max(caixa_a[2], caixa_b[2])))
+                    if canto == celula:
+                        yield chaves[a], chaves[b]
+
+    def pares_com(self, chaves):
+        """Gera, uma única vez, os pares de caixas que se tocam e envolvem ``chaves``.
+
+        Usado nas execuções incrementais: só os elementos alterados e os seus
+        vizinhos espaciais são reavaliados.
+        """
+        vistos = set()
+        for chave in chaves:
+            for vizinho in self.consultar(self.caixas[chave]):
+                if vizinho == chave:
+                    continue
+                par = frozenset((chave, vizinho))
+                if par not in vistos:
+                    vistos.add(par)
+                    yield chave, vizinho
+
+
+def criar_grade(caixas_por_chave, tamanho_celula=None):
+    """Monta uma ``GradeUniforme`` a partir de um dicionário {chave: caixa}."""
+    if tamanho_celula is None:
+        tamanho_celula = tamanho_celula_sugerido(caixas_por_chave.values())
+    grade = GradeUniforme(tamanho_celula)
+    for chave, caixa in caixas_por_chave.items():
+        grade.inserir(chave, caixa)
+    return grade
+
+
+class IndiceSegmentos(object):
+    """Índice de segmentos em planta (ex.: linhas de localização de paredes).
+
+    Usa uma ``GradeUniforme`` sobre as caixas XY dos segmentos e confirma a
+    proximidade com a distância exata ponto-segmento.
+    """
+
+    def __init__(self, tamanho_celula):
+        self.grade = GradeUniforme(tamanho_celula)
+        self.segmentos = {}
+
+    def inserir(self, chave, inicio, fim):
+        """Adiciona o segmento ``inicio-fim`` (pontos XY) identificado por ``chave``."""
+        self.segmentos[chave] = (inicio, fim)
+        self.grade.inserir(chave, (min(inicio[0], fim[0]), min(inicio[1], fim[1]), 0.0,
+                                   max(inicio[0], fim[0]), max(inicio[1], fim[1]), 0.0))
+
+    def proximos(self, ponto, raio):
+        """Lista ``(distancia, chave)`` dos segmentos a até ``raio`` do ponto, do mais próximo."""
+        caixa = (ponto[0] - raio, ponto[1] - raio, 0.0, ponto[0] + raio, ponto[1] + raio, 0.0)
+        resultado = []
+        for chave in self.grade.consultar(caixa):
+            inicio, fim = self.segmentos[chave]
+            dist = distancia_ponto_segmento(ponto, inicio, fim)
+            if dist <= raio:
+                resultado.append((dist, chave))
+        resultado.sort(key=lambda item: item[0])
+        return resultado
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""Criação de famílias em lote e escrita de parâmetros com handles em cache.
+
+Em vez de um ``NewFamilyInstance`` + ``RotateElement`` por ponto, os pontos são
+convertidos em ``FamilyInstanceCreationData`` (com rotação e nível embutidos)
+e criados com um único ``NewFamilyInstances2`` por nível. Deve ser chamado
+dentro de uma transação aberta.
+
+``EscritorParametros`` só grava valores que mudaram: cada escrita marca o
+elemento como modificado (regeneração, sincronização com o central), então
+rodar de novo um botão sem mudanças no modelo não deve alterar nada.
+"""
+from System.Collections.Generic import List
+from Autodesk.Revit.DB import (BuiltInParameter, FamilyInstanceCreationData, Line, LocationPoint, StorageType,
+                               Structure, XYZ)
+
+
+def dados_criacao(ponto, simbolo, nivel, angulo=0.0):
+    """Monta o ``FamilyInstanceCreationData`` de uma instância não estrutural."""
+    dados = FamilyInstanceCreationData(ponto, simbolo, nivel, Structure.StructuralType.NonStructural)
+    if angulo:
+        dados.RotateAngle = angulo
+        dados.Axis = Line.CreateBound(ponto, ponto + XYZ.BasisZ)
+    return dados
+
+
+def criar_instancias_em_lote(doc, itens, perdidos=None):
+    """Cria as instâncias de ``itens`` = [(ponto, simbolo, nivel, angulo)].
+
+    Faz uma chamada de ``NewFamilyInstances2`` por nível e devolve a lista com
+    os ``ElementId`` criados. Se o Revit recusar um nível, os outros são
+    criados mesmo assim: o erro é avisado e os pontos daquele nível vão para
+    ``perdidos`` (se informado).
+    """
+    por_nivel = {}
+    for ponto, simbolo, nivel, angulo in itens:
+        grupo = por_nivel.get(nivel.Id)
+        if grupo is None:
+            grupo = por_nivel[nivel.Id] = (nivel, [], List[FamilyInstanceCreationData]())
+        grupo[1].append(ponto)
+        grupo[2].Add(dados_criacao(ponto, simbolo, nivel, angulo))
+
+    ids_criados = []
+    for nivel, pontos, dados in por_nivel.values():
+        try:
+            ids_criados.extend(doc.Create.NewFamilyInstances2(dados))
+        except Exception as e:
+            print("⚠ {} instância(s) não criada(s) no nível '{}': {}".format(len(pontos), nivel.Name, e))
+            if perdidos is not None:
+                perdidos.extend(pontos)
+    return ids_criados
+
+
+def _handle_parametro(param):
+    """Handle mais estável do parâmetro: ``BuiltInParameter``, GUID (compartilhado) ou ``Definition``.
+
+    Retorna ``(handle, geral)``; ``geral`` é False para a ``Definition``, que
+    só vale para a família do elemento.
+    """
+    definicao = param.Definition
+    interno = getattr(definicao, "BuiltInParameter", BuiltInParameter.INVALID)
+    if interno != BuiltInParameter.INVALID:
+        return interno, True
+    if param.IsShared:
+        return param.GUID, True
+    return definicao, False
+
+
+class CacheParametros(object):
+    """Resolve cada parâmetro lógico para um handle uma única vez por execução.
+
+    ``alternativas`` associa o nome lógico a uma sequência de candidatos:
+    ``BuiltInParameter``, ``Guid`` de parâmetro compartilhado ou nomes de
+    exibição (um por idioma). Sem alternativas, o candidato é o próprio nome.
+    Os handles diretos são testados primeiro com ``get_Parameter``; um nome só
+    é procurado com ``LookupParameter`` na primeira vez que aparece um
+    elemento de cada tipo. O handle encontrado vale para todos os elementos
+    quando é interno ou GUID; a ``Definition`` de um parâmetro da família fica
+    guardada por ``(nome, tipo do elemento)``, assim cada consulta é direta,
+    qualquer que seja o número de famílias. Cada parâmetro ausente gera um
+    único aviso.
+    """
+
+    def __init__(self, alternativas=None, avisar=True):
+        self._alternativas = dict(alternativas or {})
+        self._handles = {}
+        self._por_tipo = {}
+        self.avisar = avisar
+        self.ausentes = {}
+
+    def _candidatos(self, nome):
+        return self._alternativas.get(nome) or (nome,)
+
+    def _procurar(self, elemento, nome, handles):
+        for candidato in self._candidatos(nome):
+            if isinstance(candidato, str):
+                param = elemento.LookupParameter(candidato)
+                if param:
+                    handle, geral = _handle_parametro(param)
+                    if geral:
+                        handles.append(handle)
+                        return param, None
+                    return param, handle
+        return None, None
+
+    def obter(self, elemento, nome):
+        handles = self._handles.get(nome)
+        if handles is None:
+            handles = self._handles[nome] = [c for c in self._candidatos(nome) if not isinstance(c, str)]
+        for handle in handles:
+            param = elemento.get_Parameter(handle)
+            if param:
+                return param
+
+        # Tipo já visto: a Definition guardada (ou a ausência) vale para todos os elementos dele
+        chave = (nome, elemento.GetTypeId().IntegerValue)
+        if chave in self._por_tipo:
+            handle = self._por_tipo[chave]
+            param = elemento.get_Parameter(handle) if handle is not None else None
+        else:
+            param, self._por_tipo[chave] = self._procurar(elemento, nome, handles)
+        if param:
+            return param
+
+        if self.avisar and nome not in self.ausentes:
+            print("⚠ Parâmetro '{}' não encontrado no elemento {}; os elementos sem ele serão ignorados.".format(
+                nome, elemento.Id.IntegerValue))
+        self.ausentes[nome] = self.ausentes.get(nome, 0) + 1
+        return None
+
+    def definir(self, elemento, nome, valor):
+        """Define o valor se o parâmetro existir e for editável; retorna True se escreveu."""
+        param = self.obter(elemento, nome)
+        if param and not param.IsReadOnly:
+            param.Set(valor)
+            return True
+        return False
+
+
+class EscritorParametros(object):
+    """Escreve parâmetros e move elementos só quando o valor muda, contando o resultado.
+
+    ``escritos`` conta as alterações feitas, ``inalterados`` os valores que já
+    estavam certos e ``falhas`` os parâmetros ausentes, somente leitura ou que
+    o Revit recusou.
+    """
+
+    def __init__(self, cache=None, tolerancia=1e-6):
+        self.cache = cache or CacheParametros()
+        self.tolerancia = tolerancia
+        self.escritos = 0
+        self.inalterados = 0
+        self.falhas = 0
+
+    def _igual(self, param, valor):
+        tipo = param.StorageType
+        if tipo == StorageType.String:
+            return (param.AsString() or "") == (valor or "")
+        if tipo == StorageType.Integer:
+            return param.AsInteger() == int(valor)
+        if tipo == StorageType.Double:
+            return abs(param.AsDouble() - float(valor)) <= self.tolerancia
+        if tipo == StorageType.ElementId:
+            return param.AsElementId().IntegerValue == valor.IntegerValue
+        return False
+
+    def escrever(self, param, valor):
+        """Grava ``valor`` em ``param`` se for diferente do atual; retorna True se escreveu."""
+        if param is None or param.IsReadOnly:
+            self.falhas += 1
+            return False
+        try:
+            if param.HasValue and self._igual(param, valor):
+                self.inalterados += 1
+                return False
+            if param.Set(valor):
+                self.escritos += 1
+                return True
+        except Exception:
+            pass
+        self.falhas += 1
+        return False
+
+    def definir(self, elemento, nome, valor):
+        """Como ``escrever``, localizando o parâmetro pelo nome com o cache de definições."""
+        return self.escrever(self.cache.obter(elemento, nome), valor)
+
+    def mover(self, elemento, destino):
+        """Leva o ponto de localização do elemento até ``destino`` em planta (a cota é mantida)."""
+        localizacao = elemento.Location
+        if destino is None or not isinstance(localizacao, LocationPoint):
+            self.falhas += 1
+            return False
+        atual = localizacao.Point
+        deslocamento = XYZ(destino.X - atual.X, destino.Y - atual.Y, 0)
+        if deslocamento.GetLength() <= self.tolerancia:
+            self.inalterados += 1
+            return False
+        try:
+            if localizacao.Move(deslocamento):
+                self.escritos += 1
+                return True
+        except Exception:
+            pass
+        self.falhas += 1
+        return False
+
+    def resumo(self):
+        return "{} alterado(s), {} inalterado(s), {} falha(s)".format(self.escritos, self.inalterados, self.falhas)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Detecção de interferências entre dispositivos e obstáculos.
+
+Os obstáculos (pilares, portas, janelas...) são carregados uma única vez numa
+``ArvoreR`` e cada dispositivo é consultado uma única vez. O resultado é uma
+lista de ``Interferencia`` para revisão, em vez de uma exclusão silenciosa.
+"""
+from collections import namedtuple
+
+from palhetaflow.arvore_r import ArvoreR
+
+CM_POR_PE = 30.48
+
+# sobreposicao: menor penetração entre as caixas nos três eixos, em pés.
+# Valores negativos indicam que as caixas não se tocam, mas estão a uma
+# distância menor que a tolerância.
+Interferencia = namedtuple(
+    "Interferencia", "id_dispositivo id_obstaculo categoria_obstaculo sobreposicao")
+
+
+def sobreposicao_caixas(caixa1, caixa2):
+    """Menor sobreposição entre as caixas nos três eixos (negativa se afastadas)."""
+    return min(min(caixa1[3], caixa2[3]) - max(caixa1[0], caixa2[0]),
+               min(caixa1[4], caixa2[4]) - max(caixa1[1], caixa2[1]),
+               min(caixa1[5], caixa2[5]) - max(caixa1[2], caixa2[2]))
+
+
+class MotorInterferencias(object):
+    """Consulta dispositivos contra um conjunto fixo de obstáculos.
+
+    ``obstaculos`` é uma lista de ``(id, categoria, caixa)``; a tolerância
+    (folga mínima exigida) é informada em centímetros.
+    """
+
+    def __init__(self, obstaculos, tolerancia_cm=0.0):
+        self.tolerancia = tolerancia_cm / CM_POR_PE
+        self.arvore = ArvoreR((caixa, (id_obstaculo, categoria, caixa))
+                              for id_obstaculo, categoria, caixa in obstaculos)
+
+    def verificar(self, id_dispositivo, caixa):
+        """Interferências de um único dispositivo, da maior para a menor sobreposição."""
+        encontradas = [
+            Interferencia(id_dispositivo, id_obstaculo, categoria,
+                          sobreposicao_caixas(caixa, caixa_obstaculo))
+            for id_obstaculo, categoria, caixa_obstaculo
+            in self.arvore.consultar(caixa, self.tolerancia)
+        ]
+        encontradas.sort(key=lambda i: -i.sobreposicao)
+        return encontradas
+
+    def verificar_todos(self, dispositivos):
+        """Verifica uma lista de ``(id, caixa)`` e devolve todas as interferências."""
+        resultado = []
+        for id_dispositivo, caixa in dispositivos:
+            resultado.extend(self.verificar(id_dispositivo, caixa))
+        return resultado
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Operações com intervalos 1D ao longo de paredes e segmentos de contorno.
+
+Um intervalo é uma tupla ``(inicio, fim)`` em pés, medida a partir da origem
+da linha. Usado para achar trechos livres de portas, janelas e pilares.
+"""
+
+
+def unir_intervalos(intervalos):
+    """Ordena e junta os intervalos que se sobrepõem ou se tocam."""
+    resultado = []
+    for inicio, fim in sorted(intervalos):
+        if fim < inicio:
+            inicio, fim = fim, inicio
+        if resultado and inicio <= resultado[-1][1]:
+            if fim > resultado[-1][1]:
+                resultado[-1] = (resultado[-1][0], fim)
+        else:
+            resultado.append((inicio, fim))
+    return resultado
+
+
+def intervalos_livres(bloqueados, inicio, fim):
+    """Trechos de ``[inicio, fim]`` que não estão em nenhum intervalo bloqueado."""
+    livres = []
+    cursor = inicio
+    for bloqueio_inicio, bloqueio_fim in unir_intervalos(bloqueados):
+        if bloqueio_fim <= cursor:
+            continue
+        if bloqueio_inicio >= fim:
+            break
+        if bloqueio_inicio > cursor:
+            livres.append((cursor, bloqueio_inicio))
+        cursor = max(cursor, bloqueio_fim)
+    if cursor < fim:
+        livres.append((cursor, fim))
+    return livres
+
+
+def posicao_livre_mais_proxima(livres, posicao, meia_largura, raio=None):
+    """Centro mais próximo de ``posicao`` onde cabe um item de largura ``2 * meia_largura``.
+
+    Retorna None se não houver trecho livre que comporte o item dentro do
+    ``raio`` de busca (quando informado).
+    """
+    melhor = None
+    for livre_inicio, livre_fim in livres:
+        minimo = livre_inicio + meia_largura
+        maximo = livre_fim - meia_largura
+        if minimo > maximo:
+            continue
+        candidato = min(max(posicao, minimo), maximo)
+        distancia = abs(candidato - posicao)
+        if raio is not None and distancia > raio:
+            continue
+        if melhor is None or distancia < abs(melhor - posicao):
+            melhor = candidato
+    return melhor
+
+
+def intervalo_projetado(caixa, origem, direcao):
+    """Projeta os quatro cantos XY de uma caixa sobre a reta ``origem + t * direcao``.
+
+    ``origem`` e ``direcao`` são pares (x, y); ``direcao`` deve ser unitária.
+    """
+    projecoes = [(x - origem[0]) * direcao[0] + (y - origem[1]) * direcao[1]
+                 for x in (caixa[0], caixa[3])
+                 for y in (caixa[1], caixa[4])]
+    return min(projecoes), max(projecoes)
+
+
+def distribuir_pontos(livres, espacamento, meia_largura=0.0):
+    """Posições equidistantes dentro de cada trecho livre.
+
+    Cada item tem largura ``2 * meia_largura`` e precisa caber inteiro no
+    trecho: os centros vão de ``inicio + meia_largura`` a ``fim -
+    meia_largura``, com pontos nas duas pontas e no meio, divididos em
+    partes iguais de pelo menos ``espacamento``. Trechos mais curtos que o
+    item (uma sobra entre dois batentes, por exemplo) são ignorados; os
+    menores que o espaçamento recebem um único ponto no centro.
+    """
+    posicoes = []
+    for inicio, fim in livres:
+        inicio, fim = inicio + meia_largura, fim - meia_largura
+        comprimento = fim - inicio
+        if comprimento < 0:
+            continue
+        quantidade = int(comprimento / espacamento) if espacamento > 0 else 0
+        if quantidade == 0:
+            posicoes.append((inicio + fim) / 2.0)
+            continue
+        for i in range(quantidade + 1):
+            posicoes.append(inicio + comprimento * float(i) / quantidade)
+    return posicoes
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""Distribuição de luminárias sobre o polígono real do forro, em Python puro.
+
+A grade é alinhada à direção dominante das arestas do forro (forros
+girados continuam com as fileiras paralelas às paredes), só os pontos
+dentro do polígono são mantidos e os pontos a menos de uma folga das vigas
+são descartados. Como não há chamadas ao Revit, o layout de centenas de
+forros pode ser calculado e medido antes de qualquer família ser inserida.
+
+Polígonos são listas de laços; cada laço é uma lista de pontos ``(x, y)`` em
+pés. Laços internos (furos) seguem a regra par-ímpar.
+"""
+import math
+
+from palhetaflow.geometria2d import distancia_ponto_segmento
+from palhetaflow.indice_espacial import IndiceSegmentos
+
+
+def area_poligono(lacos):
+    """Área líquida (laços internos descontados pela orientação absoluta do maior)."""
+    areas = []
+    for laco in lacos:
+        area = 0.0
+        for i in range(len(laco)):
+            x1, y1 = laco[i]
+            x2, y2 = laco[(i + 1) % len(laco)]
+            area += x1 * y2 - x2 * y1
+        areas.append(abs(area) / 2)
+    if not areas:
+        return 0.0
+    maior = max(areas)
+    return maior - (sum(areas) - maior)
+
+
+def direcao_dominante(lacos):
+    """Ângulo (radianos, em [0, pi/2)) da direção predominante das arestas.
+
+    Cada aresta vota com o seu comprimento no ângulo multiplicado por 4, de
+    modo que arestas perpendiculares reforçam a mesma grade.
+    """
+    soma_cos = soma_sen = 0.0
+    for laco in lacos:
+        for i in range(len(laco)):
+            x1, y1 = laco[i]
+            x2, y2 = laco[(i + 1) % len(laco)]
+            comprimento = math.hypot(x2 - x1, y2 - y1)
+            angulo = math.atan2(y2 - y1, x2 - x1)
+            soma_cos += comprimento * math.cos(4 * angulo)
+            soma_sen += comprimento * math.sin(4 * angulo)
+    if soma_cos == 0 and soma_sen == 0:
+        return 0.0
+    return (math.atan2(soma_sen, soma_cos) / 4) % (math.pi / 2)
+
+
+class IndicePoligono(object):
+    """Teste ponto-no-polígono com as arestas separadas em faixas horizontais.
+
+    Cada consulta percorre só as arestas da faixa do ponto em vez de todas as
+    arestas do forro.
+    """
+
+    def __init__(self, lacos, faixas=None):
+        self.arestas = []
+        for laco in lacos:
+            for i in range(len(laco)):
+                a, b = laco[i], laco[(i + 1) % len(laco)]
+                if a[1] != b[1]:
+                    self.arestas.append((a, b))
+
+        ys = [p[1] for laco in lacos for p in laco] or [0.0]
+        self.y_min, self.y_max = min(ys), max(ys)
+        self.total_faixas = faixas or max(1, int(math.sqrt(len(self.arestas))))
+        self.altura_faixa = (self.y_max - self.y_min) / self.total_faixas or 1.0
+        self.faixas = [[] for _ in range(self.total_faixas)]
+        for aresta in self.arestas:
+            y0 = min(aresta[0][1], aresta[1][1])
+            y1 = max(aresta[0][1], aresta[1][1])
+            for k in range(self._faixa(y0), self._faixa(y1) + 1):
+                self.faixas[k].append(aresta)
+
+    def _faixa(self, y):
+        k = int((y - self.y_min) / self.altura_faixa)
+        return min(max(k, 0), self.total_faixas - 1)
+
+    def contem(self, ponto):
+        x, y = ponto
+        if y < self.y_min or y > self.y_max:
+            return False
+        dentro = False
+        for a, b in self.faixas[self._faixa(y)]:
+            if (a[1] > y) != (b[1] > y):
+                x_cruzamento = a[0] + (y - a[1]) * (b[0] - a[0]) / (b[1] - a[1])
+                if x < x_cruzamento:
+                    dentro = not dentro
+        return dentro
+
+
+def _girar(ponto, cosseno, seno):
+    return (ponto[0] * cosseno - ponto[1] * seno, ponto[0] * seno + ponto[1] * cosseno)
+
+
+def _grade_local(caixa, espacamento):
+    """Pontos de uma grade centrada na caixa local ``(xmin, ymin, xmax, ymax)``."""
+    largura = caixa[2] - caixa[0]
+    altura = caixa[3] - caixa[1]
+    colunas = max(1, int(largura / espacamento))
+    linhas = max(1, int(altura / espacamento))
+    x0 = caixa[0] + (largura - (colunas - 1) * espacamento) / 2
+    y0 = caixa[1] + (altura - (linhas - 1) * espacamento) / 2
+    return [(x0 + j * espacamento, y0 + i * espacamento) for i in range(linhas) for j in range(colunas)]
+
+
+class Obstaculos(object):
+    """Vigas em planta: segmentos com meia largura, indexados para consulta por ponto."""
+
+    def __init__(self, vigas, folga=0.0):
+        """``vigas`` é uma lista de ``(inicio, fim, meia_largura)`` com pontos XY."""
+        self.folga = folga
+        self.meias_larguras = {}
+        alcance = max([v[2] for v in vigas] or [0.0]) + folga
+        self.alcance = alcance
+        self.indice = IndiceSegmentos(max(alcance * 4, 1.0))
+        for i, (inicio, fim, meia_largura) in enumerate(vigas):
+            self.indice.inserir(i, (inicio[0], inicio[1]), (fim[0], fim[1]))
+            self.meias_larguras[i] = meia_largura
+
+    def bloqueia(self, ponto):
+        if not self.meias_larguras:
+            return False
+        for dist, chave in self.indice.proximos(ponto, self.alcance):
+            if dist <= self.meias_larguras[chave] + self.folga:
+                return True
+        return False
+
+
+def distribuir_luminarias(lacos, quantidade, obstaculos=None, afastamento_borda=0.0, tentativas=6):
+    """Pontos ``(x, y)`` das luminárias dentro do polígono do forro.
+
+    A grade é alinhada à direção dominante e o espaçamento parte de
+    ``sqrt(área / quantidade)``; se os recortes (polígono, borda e vigas)
+    deixarem menos pontos que ``quantidade``, o espaçamento é reduzido e a
+    grade recalculada, até ``tentativas`` vezes.
+    """
+    area = area_poligono(lacos)
+    if quantidade <= 0 or area <= 0:
+        return []
+
+    angulo = direcao_dominante(lacos)
+    cosseno, seno = math.cos(angulo), math.sin(angulo)
+    # Coordenadas locais: eixo x paralelo à direção dominante
+    locais = [[_girar(p, cosseno, -seno) for p in laco] for laco in lacos]
+    xs = [p[0] for laco in locais for p in laco]
+    ys = [p[1] for laco in locais for p in laco]
+    caixa = (min(xs), min(ys), max(xs), max(ys))
+
+    indice = IndicePoligono(locais)
+    arestas = [(laco[i], laco[(i + 1) % len(laco)]) for laco in locais for i in range(len(laco))]
+
+    def valido(ponto_local, ponto_global):
+        if not indice.contem(ponto_local):
+            return False
+        if afastamento_borda > 0 and any(
+                distancia_ponto_segmento(ponto_local, a, b) < afastamento_borda for a, b in arestas):
+            return False
+        return obstaculos is None or not obstaculos.bloqueia(ponto_global)
+
+    espacamento = math.sqrt(area / quantidade)
+    melhor = []
+    for _ in range(tentativas):
+        pontos = []
+        for ponto_local in _grade_local(caixa, espacamento):
+            ponto_global = _girar(ponto_local, cosseno, seno)
+            if valido(ponto_local, ponto_global):
+                pontos.append(ponto_global)
+        if len(pontos) > len(melhor):
+            melhor = pontos
+        if len(pontos) >= quantidade:
+            break
+        espacamento *= math.sqrt(float(max(len(pontos), 1)) / quantidade) if pontos else 0.75
+    return melhor
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Ordem de leitura e numeração de ambientes em Python puro.
+
+Os centros dos ambientes são agrupados em linhas antes de ordenar: ordenar
+direto por ``(Y, X)`` embaralha a leitura quando ambientes da mesma fileira
+diferem alguns centímetros em Y. Depois de ordenados por Y, um ponto abre uma
+nova linha quando fica mais de ``tolerancia`` acima do primeiro ponto da linha
+atual; dentro de cada linha a ordem é da esquerda para a direita (ou em
+serpentina, alternando o sentido a cada linha). Tudo é uma ordenação mais uma
+passada, ``O(n log n)``.
+
+Itens são tuplas ``(chave, x, y)`` com coordenadas em pés.
+"""
+from collections import OrderedDict
+
+PREFIXO_TEMPORARIO = "~"
+
+
+def agrupar_linhas(itens, tolerancia):
+    """Listas de itens por linha, de baixo para cima."""
+    linhas = []
+    atual = []
+    y_linha = None
+    for item in sorted(itens, key=lambda i: (i[2], i[1])):
+        if atual and item[2] - y_linha > tolerancia:
+            linhas.append(atual)
+            atual = []
+        if not atual:
+            y_linha = item[2]
+        atual.append(item)
+    if atual:
+        linhas.append(atual)
+    return linhas
+
+
+def ordenar_em_linhas(itens, tolerancia, serpentina=False):
+    """Chaves na ordem de leitura: linhas de baixo para cima, esquerda para a direita.
+
+    Com ``serpentina`` as linhas pares (segunda, quarta...) vão da direita
+    para a esquerda.
+    """
+    ordem = []
+    for indice, linha in enumerate(agrupar_linhas(itens, tolerancia)):
+        linha.sort(key=lambda i: i[1], reverse=serpentina and indice % 2 == 1)
+        ordem.extend(item[0] for item in linha)
+    return ordem
+
+
+def numerar(grupos, por_pavimento=False, inicio=1):
+    """``{chave: número}`` para os grupos de chaves já ordenados (um grupo por pavimento).
+
+    Sem ``por_pavimento`` a numeração é contínua (1, 2, 3...) passando pelos
+    grupos na ordem. Com ``por_pavimento`` o número leva o índice do grupo
+    como prefixo (101, 102... no primeiro, 201... no segundo). A sequência
+    tem a mesma largura em todos os pavimentos (a do maior, com pelo menos
+    dois dígitos): com larguras diferentes, o 1º pavimento com 100 ambientes
+    ou mais geraria "1001", o mesmo número do 1º ambiente do 10º pavimento.
+
+    O dicionário é ordenado (``OrderedDict``) na ordem de leitura.
+    """
+    numeros = OrderedDict()
+    contador = inicio
+    largura = max([2] + [len(str(len(chaves))) for chaves in grupos])
+    for indice, chaves in enumerate(grupos):
+        if por_pavimento:
+            for posicao, chave in enumerate(chaves):
+                numeros[chave] = "{}{}".format(indice + 1, str(posicao + 1).zfill(largura))
+        else:
+            for chave in chaves:
+                numeros[chave] = str(contador)
+                contador += 1
+    return numeros
+
+
+def plano_escrita(atuais, novos):
+    """``[(chave, temporário, final)]`` dos itens cujo número muda, na ordem de ``novos``.
+
+    A escrita em duas fases (primeiro um número temporário único, depois o
+    final) evita que dois ambientes fiquem com o mesmo número no meio da
+    troca, o que geraria avisos de número duplicado. A ordem é a de leitura
+    (a de ``numerar``); ordenar pelo texto do número poria "10" antes de "9".
+    """
+    plano = []
+    for chave, final in novos.items():
+        if (atuais.get(chave) or "") != final:
+            plano.append((chave, "{}{}".format(PREFIXO_TEMPORARIO, chave), final))
+    return plano
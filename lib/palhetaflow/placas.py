@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""Texto das placas de portas a partir do ambiente de destino.
+
+Regras usadas pelo botão "Nomes" e pelo atualizador automático: a placa
+mostra o nome do ambiente para onde a porta abre (``ToRoom`` na última fase
+do projeto) ou "SAÍDA" quando não há ambiente, e o texto é invertido quando a
+porta não está espelhada. Fora ``cache_placas``, o módulo só usa atributos
+dos elementos (``ToRoom``, ``Mirrored``, ``LookupParameter``) e um resolvedor
+de parâmetros recebido como argumento, então funciona com documentos e portas
+simulados fora do Revit.
+"""
+
+PARAMETRO_TEXTO = "TEXTO DA PLACA"
+PARAMETRO_INVERTER = "INVERTER O TEXTO"
+PARAMETRO_NOME_AMBIENTE = "Nome"
+TEXTO_SAIDA = "SAÍDA"
+
+
+def fase_placas(doc):
+    """Fase usada para resolver os ambientes (a última do projeto), ou None."""
+    fases = list(doc.Phases)
+    return fases[-1] if fases else None
+
+
+def cache_placas():
+    """``CacheParametros`` com o nome do ambiente resolvido pelo ``ROOM_NAME`` (qualquer idioma)."""
+    from Autodesk.Revit.DB import BuiltInParameter
+    from palhetaflow.instancias import CacheParametros
+
+    return CacheParametros({PARAMETRO_NOME_AMBIENTE: (BuiltInParameter.ROOM_NAME, PARAMETRO_NOME_AMBIENTE)})
+
+
+def nome_ambiente(ambiente, parametros=None):
+    """Nome do ambiente pelo parâmetro "Nome".
+
+    ``parametros`` é um resolvedor com ``obter(elemento, nome)`` (como o de
+    ``cache_placas``); sem ele, usa ``LookupParameter``.
+    """
+    if parametros is not None:
+        param = parametros.obter(ambiente, PARAMETRO_NOME_AMBIENTE)
+    else:
+        param = ambiente.LookupParameter(PARAMETRO_NOME_AMBIENTE)
+    return param.AsString() if param else None
+
+
+def ambiente_destino(porta, fase):
+    """Ambiente para onde a porta abre na ``fase``, ou None."""
+    try:
+        return porta.ToRoom[fase]
+    except Exception:
+        return None
+
+
+def texto_placa(porta, fase, parametros=None):
+    ambiente = ambiente_destino(porta, fase)
+    if ambiente is None:
+        return TEXTO_SAIDA
+    return nome_ambiente(ambiente, parametros) or TEXTO_SAIDA
+
+
+def inverter_texto(porta):
+    """0 se a porta está espelhada, 1 caso contrário."""
+    return 0 if porta.Mirrored else 1
+
+
+def valores_placa(porta, fase, parametros=None):
+    """``{nome_parametro: valor}`` que a placa da porta deve ter."""
+    return {
+        PARAMETRO_TEXTO: texto_placa(porta, fase, parametros),
+        PARAMETRO_INVERTER: inverter_texto(porta),
+    }
+
+
+def portas_do_ambiente(portas, ids_ambientes, fase):
+    """Portas cujo ambiente de destino está em ``ids_ambientes`` (inteiros)."""
+    afetadas = []
+    for porta in portas:
+        ambiente = ambiente_destino(porta, fase)
+        if ambiente is not None and ambiente.Id.IntegerValue in ids_ambientes:
+            afetadas.append(porta)
+    return afetadas
+
+
+def atualizar_placas(portas, fase, escritor):
+    """Aplica ``valores_placa`` às portas com o ``EscritorParametros`` informado.
+
+    Os parâmetros são resolvidos pelo cache do escritor. Portas sem o
+    parâmetro da família são ignoradas, como no botão "Nomes".
+    """
+    for porta in portas:
+        for nome, valor in sorted(valores_placa(porta, fase, escritor.cache).items()):
+            param = escritor.cache.obter(porta, nome)
+            if param:
+                escritor.escrever(param, valor)
+    return escritor
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Registro por documento do que cada botão já processou.
+
+Os dados ficam num arquivo JSON na pasta de dados do pyRevit, com o nome do
+documento ativo, e servem para as execuções incrementais.
+"""
+import json
+import os
+
+from pyrevit import script
+
+
+def caminho_registro(nome):
+    """Caminho do arquivo de registro ``nome`` para o documento ativo."""
+    return script.get_document_data_file(nome, "json")
+
+
+def carregar_registro(nome):
+    """Lê o registro salvo; retorna None se não existir ou estiver corrompido."""
+    caminho = caminho_registro(nome)
+    if not os.path.exists(caminho):
+        return None
+    try:
+        with open(caminho, "r") as arquivo:
+            return json.load(arquivo)
+    except (IOError, ValueError):
+        return None
+
+
+def salvar_registro(nome, dados):
+    """Grava o registro ``nome`` do documento ativo."""
+    with open(caminho_registro(nome), "w") as arquivo:
+        json.dump(dados, arquivo)
+
+
+def versao_elemento(elemento):
+    """Identifica a versão atual do elemento.
+
+    Usa ``Element.VersionGuid`` (Revit 2024+), que muda a cada alteração do
+    elemento. Nas versões anteriores, usa o tipo e o bounding box arredondado.
+    """
+    versao = getattr(elemento, "VersionGuid", None)
+    if versao is not None:
+        return str(versao)
+
+    bbox = elemento.get_BoundingBox(None)
+    if bbox is None:
+        return str(elemento.GetTypeId().IntegerValue)
+    return "{}|{:.4f},{:.4f},{:.4f},{:.4f},{:.4f},{:.4f}".format(
+        elemento.GetTypeId().IntegerValue,
+        bbox.Min.X, bbox.Min.Y, bbox.Min.Z,
+        bbox.Max.X, bbox.Max.Y, bbox.Max.Z)
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""Gerador de eixos de paredes de acabamento (revestimento e rodapé).
+
+Trabalha sobre os laços do cache de contornos (``palhetaflow.contornos``):
+1. junta os segmentos retos consecutivos colineares que se tocam;
+2. desloca o laço para dentro do ambiente com ``palhetaflow.deslocamento_poligono``
+   (retas e arcos, cantos em meia-esquadria e limpeza de auto-interseções).
+Só depois disso as paredes são criadas, o que evita dezenas de paredes
+minúsculas por lado do ambiente. Python puro, sem chamadas ao Revit.
+"""
+import math
+
+from palhetaflow.deslocamento_poligono import JUNCAO_ESQUADRIA, circulo_por_tres_pontos, deslocar_laco
+from palhetaflow.indice_espacial import IndiceSegmentos
+from palhetaflow.intervalos import intervalos_livres
+
+
+def _vetor(a, b):
+    return (b[0] - a[0], b[1] - a[1])
+
+
+def _tamanho(v):
+    return math.hypot(v[0], v[1])
+
+
+def _e_reto(segmento):
+    return segmento[2] is None
+
+
+def sao_colineares(segmento1, segmento2, tolerancia_angulo=1e-3, tolerancia_distancia=1e-3):
+    """Dois segmentos retos em sequência (fim de 1 = início de 2) e na mesma direção."""
+    if not (_e_reto(segmento1) and _e_reto(segmento2)):
+        return False
+    fim1, inicio2 = segmento1[1], segmento2[0]
+    if _tamanho(_vetor(fim1, inicio2)) > tolerancia_distancia:
+        return False
+    d1 = _vetor(segmento1[0], segmento1[1])
+    d2 = _vetor(segmento2[0], segmento2[1])
+    tamanho1, tamanho2 = _tamanho(d1), _tamanho(d2)
+    if tamanho1 == 0 or tamanho2 == 0:
+        return True
+    seno = (d1[0] * d2[1] - d1[1] * d2[0]) / (tamanho1 * tamanho2)
+    cosseno = (d1[0] * d2[0] + d1[1] * d2[1]) / (tamanho1 * tamanho2)
+    return abs(seno) <= tolerancia_angulo and cosseno > 0
+
+
+def mesclar_colineares(laco, tolerancia_angulo=1e-3, tolerancia_distancia=1e-3):
+    """Junta os segmentos consecutivos colineares de um laço fechado.
+
+    Os segmentos são tuplas ``(inicio, fim, meio, id_elemento)``; o segmento
+    resultante fica com o ``id_elemento`` do primeiro trecho.
+    """
+    resultado = []
+    for segmento in laco:
+        if resultado and sao_colineares(resultado[-1], segmento, tolerancia_angulo, tolerancia_distancia):
+            anterior = resultado[-1]
+            resultado[-1] = (anterior[0], segmento[1], None, anterior[3])
+        else:
+            resultado.append(tuple(segmento))
+
+    # O laço é fechado: o último trecho pode continuar no primeiro
+    if len(resultado) > 1 and sao_colineares(resultado[-1], resultado[0], tolerancia_angulo, tolerancia_distancia):
+        ultimo = resultado.pop()
+        resultado[0] = (ultimo[0], resultado[0][1], None, ultimo[3])
+    return resultado
+
+
+def gerar_eixos_acabamento(lacos, distancia, juncao=JUNCAO_ESQUADRIA, comprimento_minimo=0.0,
+                           tolerancia_angulo=1e-3, tolerancia_distancia=1e-3):
+    """Eixos das paredes de acabamento para todos os laços de um ambiente.
+
+    Retorna tuplas ``(inicio, fim, meio, id_elemento)``, no mesmo formato dos
+    segmentos de ``palhetaflow.contornos``.
+    """
+    eixos = []
+    for laco in lacos:
+        mesclado = mesclar_colineares(laco, tolerancia_angulo, tolerancia_distancia)
+        eixos.extend(deslocar_laco(mesclado, distancia, juncao, comprimento_minimo=comprimento_minimo))
+    return eixos
+
+
+def chave_segmento(segmento, precisao=0.01, precisao_angulo=1e-3):
+    """Chave do trecho de parede coberto por um segmento, igual nas duas faces da parede.
+
+    Dois ambientes dos dois lados de uma parede recebem segmentos em faces
+    diferentes (afastadas pela espessura) e em sentidos opostos. A chave é o
+    ``id_elemento`` mais o intervalo do segmento projetado ao longo da
+    parede: para retas, a projeção numa direção de sentido fixo (o
+    afastamento entre as faces é perpendicular a ela e some); para arcos, o
+    centro e os ângulos das pontas, que são os mesmos nas duas faces.
+    """
+    inicio, fim, meio, id_elemento = segmento[0], segmento[1], segmento[2], segmento[3]
+    if meio is None:
+        dx, dy = fim[0] - inicio[0], fim[1] - inicio[1]
+        tamanho = math.hypot(dx, dy)
+        if tamanho == 0:
+            return None
+        dx, dy = dx / tamanho, dy / tamanho
+        # Mesmo sentido para as duas faces: x positivo (ou y positivo nas verticais)
+        if dx < -1e-9 or (abs(dx) <= 1e-9 and dy < 0):
+            dx, dy = -dx, -dy
+        extremos = sorted(int(round((p[0] * dx + p[1] * dy) / precisao)) for p in (inicio, fim))
+        return (id_elemento, None) + tuple(extremos)
+
+    circulo = circulo_por_tres_pontos(inicio, meio, fim)
+    if circulo is None:
+        return None
+    (cx, cy), _ = circulo
+    angulos = sorted(int(round((math.atan2(p[1] - cy, p[0] - cx) % (2 * math.pi)) / precisao_angulo))
+                     for p in (inicio, fim))
+    return (id_elemento, (int(round(cx / precisao)), int(round(cy / precisao)))) + tuple(angulos)
+
+
+def trechos_dos_elementos(lacos, ids_elementos):
+    """Segmentos dos laços cujo ``id_elemento`` está em ``ids_elementos`` (inteiros)."""
+    return [segmento for laco in lacos for segmento in laco if segmento[3] in ids_elementos]
+
+
+def trechos_compartilhados(lacos, vistos, precisao=0.01, ignorar=()):
+    """Segmentos dos laços que já apareceram em outro ambiente.
+
+    ``vistos`` é um conjunto de chaves compartilhado entre os ambientes
+    processados; as chaves novas deste ambiente são acrescentadas a ele.
+    Segmentos cujo ``id_elemento`` está em ``ignorar`` (separadores de
+    ambiente, que não recebem acabamento em nenhum dos lados) ficam fora da
+    comparação.
+    """
+    compartilhados = []
+    novos = set()
+    for laco in lacos:
+        for segmento in laco:
+            if segmento[3] in ignorar:
+                continue
+            chave = chave_segmento(segmento, precisao)
+            if chave is None:
+                continue
+            if chave in vistos:
+                compartilhados.append(segmento)
+            else:
+                novos.add(chave)
+    vistos.update(novos)
+    return compartilhados
+
+
+class IndiceBloqueios(object):
+    """Trechos em planta que não devem receber acabamento (vãos de portas, separadores, limites já atendidos).
+
+    Cada bloqueio é ``(inicio, fim, alcance)``: o segmento ``inicio-fim`` (XY)
+    corta os eixos paralelos que passam a até ``alcance`` dele.
+    """
+
+    def __init__(self, bloqueios, tamanho_celula=None):
+        self.alcance_max = max([b[2] for b in bloqueios] or [0.0])
+        self.indice = IndiceSegmentos(tamanho_celula or max(self.alcance_max * 4, 1.0))
+        self.alcances = {}
+        for i, (inicio, fim, alcance) in enumerate(bloqueios):
+            self.indice.inserir(i, (inicio[0], inicio[1]), (fim[0], fim[1]))
+            self.alcances[i] = alcance
+
+    def __len__(self):
+        return len(self.alcances)
+
+    def intervalos(self, inicio, fim, tolerancia_angulo=1e-3):
+        """Intervalos bloqueados ao longo do eixo reto ``inicio-fim`` (distância a partir do início)."""
+        direcao = _vetor(inicio, fim)
+        tamanho = _tamanho(direcao)
+        if tamanho == 0 or not self.alcances:
+            return []
+        direcao = (direcao[0] / tamanho, direcao[1] / tamanho)
+        caixa = (min(inicio[0], fim[0]) - self.alcance_max, min(inicio[1], fim[1]) - self.alcance_max, 0.0,
+                 max(inicio[0], fim[0]) + self.alcance_max, max(inicio[1], fim[1]) + self.alcance_max, 0.0)
+
+        bloqueados = []
+        for chave in self.indice.grade.consultar(caixa):
+            a, b = self.indice.segmentos[chave]
+            trecho = _vetor(a, b)
+            tamanho_trecho = _tamanho(trecho)
+            if tamanho_trecho == 0:
+                continue
+            # Só bloqueia eixos paralelos ao trecho e dentro do alcance
+            if abs(direcao[0] * trecho[1] - direcao[1] * trecho[0]) / tamanho_trecho > tolerancia_angulo:
+                continue
+            meio = ((a[0] + b[0]) / 2 - inicio[0], (a[1] + b[1]) / 2 - inicio[1])
+            if abs(direcao[0] * meio[1] - direcao[1] * meio[0]) > self.alcances[chave]:
+                continue
+            ta = (a[0] - inicio[0]) * direcao[0] + (a[1] - inicio[1]) * direcao[1]
+            tb = (b[0] - inicio[0]) * direcao[0] + (b[1] - inicio[1]) * direcao[1]
+            bloqueados.append((min(ta, tb), max(ta, tb)))
+        return bloqueados
+
+
+def recortar_eixos(eixos, indices_bloqueio, comprimento_minimo=0.0):
+    """Corta dos eixos retos os trechos bloqueados; cada sobra vira um trecho contínuo.
+
+    Arcos passam sem corte. Retorna a nova lista de eixos no mesmo formato.
+    """
+    resultado = []
+    for eixo in eixos:
+        inicio, fim, meio, id_elemento = eixo[0], eixo[1], eixo[2], eixo[3]
+        if meio is not None:
+            resultado.append(eixo)
+            continue
+
+        bloqueados = []
+        for indice in indices_bloqueio:
+            bloqueados.extend(indice.intervalos(inicio, fim))
+        if not bloqueados:
+            resultado.append(eixo)
+            continue
+
+        tamanho = _tamanho(_vetor(inicio, fim))
+        for t0, t1 in intervalos_livres(bloqueados, 0.0, tamanho):
+            if t1 - t0 < max(comprimento_minimo, 1e-9):
+                continue
+            fator0, fator1 = t0 / tamanho, t1 / tamanho
+            resultado.append((
+                tuple(inicio[k] + (fim[k] - inicio[k]) * fator0 for k in range(len(inicio))),
+                tuple(inicio[k] + (fim[k] - inicio[k]) * fator1 for k in range(len(inicio))),
+                None, id_elemento))
+    return resultado
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Posição de rótulos dentro de polígonos (polo de inacessibilidade) em Python puro.
+
+O centro da caixa envolvente cai fora de ambientes em L ou em U. Em vez dele
+é usado o ponto interno mais distante das bordas, encontrado como no
+algoritmo "polylabel": a caixa é dividida em células quadradas, e uma fila de
+prioridade sempre subdivide a célula que ainda pode conter um ponto melhor
+(distância do centro + meia diagonal). A busca para quando nenhuma célula
+pode melhorar o resultado em mais que ``precisao``.
+
+Polígonos são listas de laços ``(x, y)`` em pés; laços internos são furos.
+"""
+import heapq
+import math
+
+RAIZ_2 = math.sqrt(2)
+
+
+def _arestas(lacos):
+    """Arestas pré-calculadas como ``(ax, ay, dx, dy, comprimento²)``."""
+    arestas = []
+    for laco in lacos:
+        for i in range(len(laco)):
+            (ax, ay), (bx, by) = laco[i], laco[(i + 1) % len(laco)]
+            arestas.append((ax, ay, bx - ax, by - ay, (bx - ax) ** 2 + (by - ay) ** 2))
+    return arestas
+
+
+def _distancia_assinada(x, y, arestas):
+    """Distância de ``(x, y)`` às bordas: positiva dentro do polígono, negativa fora.
+
+    A distância e o teste par-ímpar saem da mesma passada pelas arestas.
+    """
+    dentro = False
+    menor = float("inf")
+    for ax, ay, dx, dy, l2 in arestas:
+        if (ay > y) != (ay + dy > y) and x < ax + (y - ay) * dx / dy:
+            dentro = not dentro
+        t = ((x - ax) * dx + (y - ay) * dy) / l2 if l2 else 0.0
+        if t < 0.0:
+            t = 0.0
+        elif t > 1.0:
+            t = 1.0
+        d2 = (ax + t * dx - x) ** 2 + (ay + t * dy - y) ** 2
+        if d2 < menor:
+            menor = d2
+    menor = math.sqrt(menor)
+    return menor if dentro else -menor
+
+
+def _centroide(lacos):
+    """Centroide do maior laço (ou None se degenerado)."""
+    melhor = None
+    for laco in lacos:
+        area = cx = cy = 0.0
+        for i in range(len(laco)):
+            x1, y1 = laco[i]
+            x2, y2 = laco[(i + 1) % len(laco)]
+            cruz = x1 * y2 - x2 * y1
+            area += cruz
+            cx += (x1 + x2) * cruz
+            cy += (y1 + y2) * cruz
+        if area and (melhor is None or abs(area) > melhor[0]):
+            melhor = (abs(area), (cx / (3 * area), cy / (3 * area)))
+    return melhor[1] if melhor else None
+
+
+def polo_inacessibilidade(lacos, precisao=0.05):
+    """``(x, y, distancia)`` do ponto interno mais afastado das bordas.
+
+    ``precisao`` (pés) é o quanto a distância encontrada pode ficar abaixo
+    da ótima. Retorna None para polígonos vazios.
+    """
+    lacos = [laco for laco in lacos if len(laco) >= 3]
+    if not lacos:
+        return None
+    xs = [p[0] for laco in lacos for p in laco]
+    ys = [p[1] for laco in lacos for p in laco]
+    x_min, y_min, x_max, y_max = min(xs), min(ys), max(xs), max(ys)
+    tamanho = min(x_max - x_min, y_max - y_min)
+    if tamanho <= 0:
+        return (x_min, y_min, 0.0)
+
+    arestas = _arestas(lacos)
+
+    def celula(x, y, meia):
+        d = _distancia_assinada(x, y, arestas)
+        # Heap mínimo: a chave é o potencial (d + meia diagonal) negativo
+        return (-(d + meia * RAIZ_2), x, y, meia, d)
+
+    fila = []
+    meia = tamanho / 2
+    x = x_min
+    while x < x_max:
+        y = y_min
+        while y < y_max:
+            heapq.heappush(fila, celula(x + meia, y + meia, meia))
+            y += tamanho
+        x += tamanho
+
+    # Palpites iniciais: centroide e centro da caixa
+    melhor = celula((x_min + x_max) / 2, (y_min + y_max) / 2, 0)
+    centroide = _centroide(lacos)
+    if centroide is not None:
+        candidato = celula(centroide[0], centroide[1], 0)
+        if candidato[4] > melhor[4]:
+            melhor = candidato
+
+    while fila:
+        atual = heapq.heappop(fila)
+        if atual[4] > melhor[4]:
+            melhor = atual
+        # Nenhum ponto desta célula pode melhorar mais que a precisão
+        if -atual[0] - melhor[4] <= precisao:
+            continue
+        _, cx, cy, meia, _ = atual
+        meia /= 2
+        for dx in (-meia, meia):
+            for dy in (-meia, meia):
+                heapq.heappush(fila, celula(cx + dx, cy + dy, meia))
+
+    return (melhor[1], melhor[2], melhor[4])
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""Preparação dos pontos de terreno (Toposolid) em Python puro.
+
+A triangulação das faces superiores repete cada vértice uma vez por
+triângulo. Antes de recriar o terreno os pontos passam por duas etapas:
+
+1. solda: vértices a menos de ``tolerancia`` em planta viram um só (grade hash);
+2. dizimação: em cada célula da grade onde os pontos cabem num plano com erro
+   vertical até ``tolerancia_z``, só o ponto mais próximo do centro da célula
+   é mantido. Células da borda (com vizinha vazia) e células acidentadas
+   ficam intactas, o que preserva o contorno e a forma do terreno.
+
+No nivelamento do terreno inteiro os pontos já chegam na cota final, então
+toda célula interna é plana e vira um ponto; isso mantém o terreno recriado
+bem abaixo do limite de pontos do Toposolid.
+
+Também planeja a terraplenagem local (só os pontos sob a plataforma e na
+faixa de transição), usada para editar o terreno no lugar, e os pontos que
+precisam ser acrescentados ao longo do contorno e da borda da faixa para que
+a plataforma não dependa só dos vértices existentes.
+
+Pontos são tuplas ``(x, y, z)`` em pés.
+"""
+import math
+from collections import namedtuple
+
+from palhetaflow.deslocamento_poligono import deslocar_poligono
+from palhetaflow.geometria2d import distancia_ponto_segmento
+from palhetaflow.indice_espacial import GradeUniforme
+from palhetaflow.layout_luminarias import IndicePoligono
+
+ResultadoPreparo = namedtuple("ResultadoPreparo", "pontos total_original duplicados dizimados")
+
+
+def _celula(x, y, tamanho):
+    return (int(math.floor(x / tamanho)), int(math.floor(y / tamanho)))
+
+
+def soldar_vertices(pontos, tolerancia=0.01):
+    """Remove os vértices repetidos (em planta) mantendo o primeiro de cada grupo.
+
+    Cada ponto é comparado só com os pontos das 9 células vizinhas da grade,
+    o que mantém a solda linear no número de pontos.
+    """
+    grade = {}
+    unicos = []
+    tolerancia2 = tolerancia * tolerancia
+    for ponto in pontos:
+        i, j = _celula(ponto[0], ponto[1], tolerancia)
+        repetido = False
+        for di in (-1, 0, 1):
+            for dj in (-1, 0, 1):
+                for outro in grade.get((i + di, j + dj), ()):
+                    if (outro[0] - ponto[0]) ** 2 + (outro[1] - ponto[1]) ** 2 <= tolerancia2:
+                        repetido = True
+                        break
+                if repetido:
+                    break
+            if repetido:
+                break
+        if not repetido:
+            grade.setdefault((i, j), []).append(ponto)
+            unicos.append(ponto)
+    return unicos
+
+
+def ajustar_plano(pontos):
+    """Plano ``z = a*x + b*y + c`` por mínimos quadrados (None se degenerado)."""
+    n = float(len(pontos))
+    mx = sum(p[0] for p in pontos) / n
+    my = sum(p[1] for p in pontos) / n
+    mz = sum(p[2] for p in pontos) / n
+    sxx = sxy = syy = sxz = syz = 0.0
+    for x, y, z in pontos:
+        dx, dy, dz = x - mx, y - my, z - mz
+        sxx += dx * dx
+        sxy += dx * dy
+        syy += dy * dy
+        sxz += dx * dz
+        syz += dy * dz
+    determinante = sxx * syy - sxy * sxy
+    if abs(determinante) < 1e-12:
+        return None
+    a = (sxz * syy - syz * sxy) / determinante
+    b = (syz * sxx - sxz * sxy) / determinante
+    return a, b, mz - a * mx - b * my
+
+
+def dizimar(pontos, tamanho_celula, tolerancia_z):
+    """Mantém um ponto por célula plana, preservando bordas e relevo acidentado."""
+    celulas = {}
+    for ponto in pontos:
+        celulas.setdefault(_celula(ponto[0], ponto[1], tamanho_celula), []).append(ponto)
+
+    resultado = []
+    for (i, j), grupo in celulas.items():
+        borda = any((i + di, j + dj) not in celulas
+                    for di in (-1, 0, 1) for dj in (-1, 0, 1) if di or dj)
+        if borda or len(grupo) < 4:
+            resultado.extend(grupo)
+            continue
+
+        plano = ajustar_plano(grupo)
+        if plano is None:
+            resultado.extend(grupo)
+            continue
+        a, b, c = plano
+        if max(abs(a * x + b * y + c - z) for x, y, z in grupo) > tolerancia_z:
+            resultado.extend(grupo)
+            continue
+
+        centro = ((i + 0.5) * tamanho_celula, (j + 0.5) * tamanho_celula)
+        resultado.append(min(grupo, key=lambda p: (p[0] - centro[0]) ** 2 + (p[1] - centro[1]) ** 2))
+    return resultado
+
+
+def preparar_pontos(pontos, tolerancia_solda=0.01, tamanho_celula=None, tolerancia_z=0.03):
+    """Solda e dizima os pontos do terreno; retorna um ``ResultadoPreparo``.
+
+    Sem ``tamanho_celula`` só a solda é feita.
+    """
+    total = len(pontos)
+    soldados = soldar_vertices(pontos, tolerancia_solda)
+    finais = dizimar(soldados, tamanho_celula, tolerancia_z) if tamanho_celula else soldados
+    return ResultadoPreparo(finais, total, total - len(soldados), len(soldados) - len(finais))
+
+
+def _distancia_ao_contorno(ponto, lacos):
+    menor = None
+    for laco in lacos:
+        for i in range(len(laco)):
+            dist = distancia_ponto_segmento(ponto, laco[i], laco[(i + 1) % len(laco)])
+            if menor is None or dist < menor:
+                menor = dist
+    return menor
+
+
+def _amostrar_laco(laco, espacamento):
+    """Vértices do laço mais pontos a cada ``espacamento`` ao longo das arestas."""
+    pontos = []
+    for i in range(len(laco)):
+        (ax, ay), (bx, by) = laco[i][:2], laco[(i + 1) % len(laco)][:2]
+        divisoes = max(1, int(math.ceil(math.hypot(bx - ax, by - ay) / espacamento)))
+        for k in range(divisoes):
+            t = float(k) / divisoes
+            pontos.append((ax + (bx - ax) * t, ay + (by - ay) * t))
+    return pontos
+
+
+def _area_assinada(laco):
+    return sum(laco[i][0] * laco[(i + 1) % len(laco)][1] - laco[(i + 1) % len(laco)][0] * laco[i][1]
+               for i in range(len(laco))) / 2
+
+
+def pontos_de_borda(lacos, faixa_transicao, espacamento):
+    """``(contorno, borda_faixa)``: pontos ``(x, y)`` a acrescentar no terreno.
+
+    Só com os vértices existentes a borda da plataforma e o fim da transição
+    seguem os triângulos do terreno, não o contorno do piso. Os primeiros
+    pontos ficam sobre o contorno; os outros sobre o contorno deslocado de
+    ``faixa_transicao`` para longe do piso (para fora do laço externo e para
+    dentro dos furos), a cada ``espacamento`` pés no máximo.
+    """
+    contorno = []
+    borda_faixa = []
+    for k, laco in enumerate(lacos):
+        if len(laco) < 3:
+            continue
+        contorno.extend(_amostrar_laco(laco, espacamento))
+        if faixa_transicao <= 0:
+            continue
+        outros = [outro for j, outro in enumerate(lacos) if j != k and len(outro) >= 3]
+        furo = bool(outros) and IndicePoligono(outros).contem(laco[0])
+        # O deslocamento é para a esquerda do laço: para fora nos anti-horários com distância negativa
+        sentido = 1 if _area_assinada(laco) > 0 else -1
+        distancia = faixa_transicao * sentido * (1 if furo else -1)
+        for deslocado in deslocar_poligono([p[:2] for p in laco], distancia):
+            borda_faixa.extend(_amostrar_laco(deslocado, espacamento))
+    return contorno, borda_faixa
+
+
+def indexar_pontos(pontos, tamanho_celula):
+    """``GradeUniforme`` com os pontos ``{chave: (x, y, z)}`` do terreno (caixas sem área em planta)."""
+    grade = GradeUniforme(tamanho_celula)
+    for chave, (x, y, _) in pontos.items():
+        grade.inserir(chave, (x, y, 0.0, x, y, 0.0))
+    return grade
+
+
+def planejar_terraplenagem(pontos, grade, lacos, cota, faixa_transicao=0.0):
+    """Novas cotas dos pontos afetados por uma plataforma na ``cota`` com contorno ``lacos``.
+
+    Dentro do contorno o ponto vai para a ``cota``; na faixa de transição em
+    volta dele a cota é interpolada (curva suave) entre a plataforma e o
+    terreno original. Só os pontos das células da grade que tocam o contorno
+    ampliado são avaliados. Faixas negativas contam como zero. Retorna
+    ``{chave: z_novo}``.
+    """
+    faixa_transicao = max(faixa_transicao, 0.0)
+    xs = [p[0] for laco in lacos for p in laco]
+    ys = [p[1] for laco in lacos for p in laco]
+    if not xs:
+        return {}
+    caixa = (min(xs) - faixa_transicao, min(ys) - faixa_transicao, 0.0,
+             max(xs) + faixa_transicao, max(ys) + faixa_transicao, 0.0)
+
+    indice = IndicePoligono(lacos)
+    novos = {}
+    for chave in grade.consultar(caixa):
+        x, y, z = pontos[chave]
+        if indice.contem((x, y)):
+            peso = 1.0
+        elif faixa_transicao > 0:
+            dist = _distancia_ao_contorno((x, y), lacos)
+            if dist >= faixa_transicao:
+                continue
+            t = 1.0 - dist / faixa_transicao
+            peso = t * t * (3 - 2 * t)
+        else:
+            continue
+        z_novo = z + (cota - z) * peso
+        if abs(z_novo - z) > 1e-6:
+            novos[chave] = z_novo
+    return novos
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""Consulta de cotas do terreno sobre a malha de triângulos (TIN) do Toposolid.
+
+As faces superiores do Toposolid são trianguladas uma única vez e os
+triângulos vão para uma grade uniforme em planta. Cada consulta testa só os
+triângulos da célula do ponto e interpola a cota com coordenadas
+baricêntricas. A malha fica no cache de AppDomain (uma por Toposolid, enquanto
+ele não mudar), e ``MalhaTerreno`` é Python puro para poder ser testada e
+medida fora do Revit.
+
+Triângulos são tuplas de três pontos ``(x, y, z)`` em pés.
+"""
+import math
+
+from palhetaflow.layout_luminarias import IndicePoligono, area_poligono
+
+CHAVE_CACHE = "PALHETAFLOW_TIN"
+PE3_POR_M3 = 35.3146667
+
+
+def _area_assinada(a, b, c):
+    return ((b[0] - a[0]) * (c[1] - a[1]) - (c[0] - a[0]) * (b[1] - a[1])) / 2
+
+
+def _recortar_acima(poligono, alturas):
+    """Parte do polígono (vértices com alturas lineares) onde a altura é >= 0."""
+    resultado = []
+    total = len(poligono)
+    for i in range(total):
+        p, q = poligono[i], poligono[(i + 1) % total]
+        hp, hq = alturas[i], alturas[(i + 1) % total]
+        if hp >= 0:
+            resultado.append((p, hp))
+        if (hp >= 0) != (hq >= 0):
+            t = hp / (hp - hq)
+            resultado.append(((p[0] + (q[0] - p[0]) * t, p[1] + (q[1] - p[1]) * t), 0.0))
+    return resultado
+
+
+def _integral_altura(vertices):
+    """Integral de uma altura linear sobre um polígono convexo ``[(ponto, altura), ...]``."""
+    volume = 0.0
+    for i in range(1, len(vertices) - 1):
+        (a, ha), (b, hb), (c, hc) = vertices[0], vertices[i], vertices[i + 1]
+        volume += abs(_area_assinada(a, b, c)) * (ha + hb + hc) / 3
+    return volume
+
+
+class MalhaTerreno(object):
+    """Malha de triângulos com índice em grade para consultas de cota."""
+
+    def __init__(self, triangulos, tamanho_celula=None):
+        self.triangulos = [t for t in triangulos if abs(_area_assinada(*t)) > 1e-12]
+        if tamanho_celula is None:
+            area_total = sum(abs(_area_assinada(*t)) for t in self.triangulos)
+            tamanho_celula = max(math.sqrt(area_total / max(len(self.triangulos), 1)) * 2, 1e-3)
+        self.tamanho_celula = float(tamanho_celula)
+        self.celulas = {}
+        for indice, (a, b, c) in enumerate(self.triangulos):
+            i0, j0 = self._celula(min(a[0], b[0], c[0]), min(a[1], b[1], c[1]))
+            i1, j1 = self._celula(max(a[0], b[0], c[0]), max(a[1], b[1], c[1]))
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    self.celulas.setdefault((i, j), []).append(indice)
+
+    def __len__(self):
+        return len(self.triangulos)
+
+    def _celula(self, x, y):
+        return (int(math.floor(x / self.tamanho_celula)), int(math.floor(y / self.tamanho_celula)))
+
+    def cota_em(self, ponto):
+        """Cota do terreno em ``ponto`` (x, y), ou None fora da malha."""
+        x, y = ponto[0], ponto[1]
+        for indice in self.celulas.get(self._celula(x, y), ()):
+            a, b, c = self.triangulos[indice]
+            area = _area_assinada(a, b, c)
+            wa = _area_assinada((x, y), b, c) / area
+            wb = _area_assinada(a, (x, y), c) / area
+            wc = 1.0 - wa - wb
+            if wa >= -1e-9 and wb >= -1e-9 and wc >= -1e-9:
+                return wa * a[2] + wb * b[2] + wc * c[2]
+        return None
+
+    def cotas_em(self, pontos):
+        """Cotas para uma lista de pontos (None para os pontos fora da malha)."""
+        cota_em = self.cota_em
+        return [cota_em(p) for p in pontos]
+
+    def volume_corte_aterro(self, cota):
+        """``(corte, aterro)`` em pés³ entre a malha inteira e o plano horizontal ``cota``.
+
+        Cálculo exato: cada triângulo é dividido pela linha onde cruza o plano.
+        """
+        corte = aterro = 0.0
+        for a, b, c in self.triangulos:
+            poligono = [(a[0], a[1]), (b[0], b[1]), (c[0], c[1])]
+            alturas = [a[2] - cota, b[2] - cota, c[2] - cota]
+            corte += _integral_altura(_recortar_acima(poligono, alturas))
+            aterro += _integral_altura(_recortar_acima(poligono, [-h for h in alturas]))
+        return corte, aterro
+
+    def volume_corte_aterro_contorno(self, lacos, cota, espacamento=1.0):
+        """``(corte, aterro)`` em pés³ dentro do contorno ``lacos``, por amostragem em grade.
+
+        Cada ponto da grade (``espacamento`` em pés) dentro do contorno e sobre a
+        malha representa uma área ``espacamento²``; a área total é corrigida
+        para a área real do contorno.
+        """
+        xs = [p[0] for laco in lacos for p in laco]
+        ys = [p[1] for laco in lacos for p in laco]
+        if not xs:
+            return 0.0, 0.0
+        indice = IndicePoligono(lacos)
+        pontos = []
+        y = min(ys) + espacamento / 2
+        while y < max(ys):
+            x = min(xs) + espacamento / 2
+            while x < max(xs):
+                if indice.contem((x, y)):
+                    pontos.append((x, y))
+                x += espacamento
+            y += espacamento
+        if not pontos:
+            return 0.0, 0.0
+
+        area_ponto = area_poligono(lacos) / len(pontos)
+        corte = aterro = 0.0
+        for z in self.cotas_em(pontos):
+            if z is None:
+                continue
+            if z > cota:
+                corte += (z - cota) * area_ponto
+            else:
+                aterro += (cota - z) * area_ponto
+        return corte, aterro
+
+
+def face_superior(face):
+    """Face cuja normal no centro do domínio aponta para cima."""
+    from Autodesk.Revit.DB import UV
+
+    caixa = face.GetBoundingBox()
+    centro = UV((caixa.Min.U + caixa.Max.U) / 2, (caixa.Min.V + caixa.Max.V) / 2)
+    return face.ComputeNormal(centro).Z > 1e-6
+
+
+def triangulos_do_toposolid(toposolid):
+    """Triângulos das faces superiores do Toposolid, orientados no sentido anti-horário."""
+    from Autodesk.Revit.DB import Options, Solid
+
+    triangulos = []
+    for objeto in toposolid.get_Geometry(Options()):
+        if not isinstance(objeto, Solid):
+            continue
+        for face in objeto.Faces:
+            if not face_superior(face):
+                continue
+            malha = face.Triangulate()
+            for i in range(malha.NumTriangles):
+                triangulo = malha.get_Triangle(i)
+                a, b, c = [(triangulo.get_Vertex(k).X, triangulo.get_Vertex(k).Y, triangulo.get_Vertex(k).Z)
+                           for k in range(3)]
+                if _area_assinada(a, b, c) < 0:
+                    b, c = c, b
+                triangulos.append((a, b, c))
+    return triangulos
+
+
+def obter_malha(toposolid):
+    """``MalhaTerreno`` do Toposolid, triangulada uma vez e reaproveitada pelo cache."""
+    from palhetaflow.contornos import cache_do_documento
+
+    cache = cache_do_documento(toposolid.Document, CHAVE_CACHE)
+    token = str(getattr(toposolid, "VersionGuid", None))
+    entrada = cache.get(toposolid.Id.IntegerValue)
+    if entrada and entrada[0] == token and token != "None":
+        return entrada[1]
+
+    malha = MalhaTerreno(triangulos_do_toposolid(toposolid))
+    cache[toposolid.Id.IntegerValue] = (token, malha)
+    return malha
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Planejador de uniões de geometria (Join Geometry) em Python puro.
+
+Compara o grafo de uniões desejado com as uniões que já existem no modelo e
+gera somente as operações necessárias: unir, desunir e inverter a ordem.
+Os elementos são identificados por inteiros (``ElementId.IntegerValue``).
+"""
+
+
+class PlanoUnioes(object):
+    """Operações que precisam ser aplicadas ao modelo."""
+
+    def __init__(self):
+        self.unir = []       # (cortador, cortado) ou (a, b) quando não há prioridade
+        self.desunir = []    # (a, b)
+        self.inverter = []   # (cortador, cortado) já unidos na ordem errada
+        self.mantidas = 0    # uniões que já estavam corretas
+
+    def total_escritas(self):
+        return len(self.unir) + len(self.desunir) + len(self.inverter)
+
+
+def ordenar_par(id_a, id_b, prioridades):
+    """Devolve ``(cortador, cortado)`` pela prioridade de corte, ou None se empatar."""
+    prioridade_a = prioridades.get(id_a)
+    prioridade_b = prioridades.get(id_b)
+    if prioridade_a is None or prioridade_b is None or prioridade_a == prioridade_b:
+        return None
+    if prioridade_a > prioridade_b:
+        return id_a, id_b
+    return id_b, id_a
+
+
+def chave_par(id_a, id_b):
+    """Texto ``"menor-maior"`` que identifica um par sem depender da ordem (chave de JSON)."""
+    return "{}-{}".format(min(id_a, id_b), max(id_a, id_b))
+
+
+def planejar_unioes(pares_desejados, unioes_existentes, prioridades, esta_cortando, manter=None):
+    """Monta o ``PlanoUnioes`` que leva o modelo ao grafo de uniões desejado.
+
+    - ``pares_desejados``: pares (a, b) que devem estar unidos.
+    - ``unioes_existentes``: conjunto de ``frozenset((a, b))`` já unidos no modelo,
+      restrito aos elementos que o planejador gerencia.
+    - ``prioridades``: {id: prioridade}; o maior valor corta o menor.
+    - ``esta_cortando(cortador, cortado)``: consulta a ordem atual de uma união
+      existente (``JoinGeometryUtils.IsCuttingElementInJoin``). Só é chamada
+      para pares unidos que têm prioridade definida.
+    - ``manter(a, b)``: opcional; uniões existentes fora do grafo desejado para
+      as quais retorna True são mantidas em vez de desfeitas (ex.: caixas que
+      só não se tocam por ruído numérico).
+    """
+    plano = PlanoUnioes()
+    desejados = set()
+
+    for id_a, id_b in pares_desejados:
+        chave = frozenset((id_a, id_b))
+        if chave in desejados:
+            continue
+        desejados.add(chave)
+
+        ordem = ordenar_par(id_a, id_b, prioridades)
+        if chave not in unioes_existentes:
+            plano.unir.append(ordem or (id_a, id_b))
+        elif ordem and not esta_cortando(ordem[0], ordem[1]):
+            plano.inverter.append(ordem)
+        else:
+            plano.mantidas += 1
+
+    for chave in unioes_existentes:
+        if chave in desejados:
+            continue
+        par = tuple(chave)
+        if manter is not None and manter(par[0], par[1]):
+            plano.mantidas += 1
+        else:
+            plano.desunir.append(par)
+
+    return plano
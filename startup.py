@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+"""Executado pelo pyRevit ao carregar a extensão.
+
+Registra o atualizador das placas de portas quando a opção estiver ligada
+(Shift+clique no botão "Nomes").
+"""
+from pyrevit import script
+
+from palhetaflow.atualizador_placas import OPCAO_ATIVO, SECAO_CONFIG, registrar
+
+config = script.get_config(SECAO_CONFIG)
+if config.get_option(OPCAO_ATIVO, False):
+    try:
+        registrar(__revit__.Application.ActiveAddInId)
+    except Exception as e:
+        print("Não foi possível registrar o atualizador das placas: {}".format(e))